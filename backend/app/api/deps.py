@@ -1,11 +1,19 @@
-from uuid import UUID
+import asyncio
+import time
+from collections.abc import Generator
+from datetime import timedelta
+from uuid import UUID, uuid4
 
-from fastapi import Depends, HTTPException, Query, status
+from fastapi import Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app import models
-from app.core.db import get_db
+from app.core import metrics, rate_limit
+from app.core.config import get_settings
+from app.core.db import STICKY_COOKIE, get_db, get_read_session, get_session
 from app.core.security import get_current_user
+from app.services import idempotency, outbox
 
 
 async def get_current_workspace(
@@ -40,6 +48,154 @@ async def get_current_workspace(
     return workspace
 
 
+def get_read_db(
+    request: Request,
+    current_user: models.User = Depends(get_current_user),
+) -> Generator[Session, None, None]:
+    """
+    Dependency that provides a session for read-only endpoints.
+    GET requests are routed to the read replica when it is safe to do so.
+    """
+    if request.method == "GET":
+        db = get_read_session(current_user.id, request.cookies.get(STICKY_COOKIE))
+    else:
+        db = get_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def idempotent_request(
+    request: Request,
+    current_user: models.User = Depends(get_current_user),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+) -> None:
+    """
+    Make a mutation safe to retry when the client sends an Idempotency-Key header.
+
+    The first request claims the key and its response is stored by the
+    idempotency middleware. Retries replay the stored response; concurrent
+    duplicates wait for the first request to finish.
+    """
+    if not idempotency_key:
+        return
+
+    if len(idempotency_key) > 255:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Idempotency-Key must be at most 255 characters",
+        )
+
+    settings = get_settings()
+    request_hash = idempotency.request_fingerprint(
+        request.method, request.url.path, request.url.query, await request.body()
+    )
+    ttl = timedelta(hours=settings.idempotency_ttl_hours)
+    lease = timedelta(seconds=settings.idempotency_lease_seconds)
+    deadline = time.monotonic() + settings.idempotency_wait_seconds
+
+    db = get_session()
+    try:
+        while True:
+            record = idempotency.claim(
+                db, current_user.id, idempotency_key, request_hash, ttl, lease
+            )
+            if record is None:
+                request.state.idempotency_claim = (current_user.id, idempotency_key)
+                return
+
+            if record.request_hash != request_hash:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key was already used for a different request",
+                )
+
+            if record.status == "completed":
+                raise idempotency.IdempotentReplay(record.response_status, record.response_body)
+
+            if time.monotonic() >= deadline:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still in progress",
+                )
+
+            await asyncio.sleep(0.1)
+    finally:
+        db.close()
+
+
+async def _request_workspace_id(request: Request) -> UUID | None:
+    """Workspace ID from the query string or a JSON body, if the request names one."""
+    value = request.query_params.get("workspace_id")
+    if value is None and request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        if isinstance(body, dict):
+            value = body.get("workspace_id")
+
+    try:
+        return UUID(str(value)) if value else None
+    except ValueError:
+        return None
+
+
+def rate_limited(group: str, require_workspace: bool = False):
+    """
+    Dependency factory enforcing a route group's limits (USER_RATE_LIMITS and
+    WORKSPACE_RATE_LIMITS) per user and per workspace, answering 429 with Retry-After.
+
+    A workspace's bucket is only charged once membership is confirmed, so nobody
+    can drain another workspace's limit (which the dispatcher shares for sends).
+    """
+
+    async def check_rate_limit(
+        request: Request,
+        current_user: models.User = Depends(get_current_user),
+        db: Session = Depends(get_db),
+    ) -> None:
+        workspace_id = await _request_workspace_id(request)
+        if workspace_id is None:
+            if require_workspace:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="workspace_id is required",
+                )
+        else:
+            membership = (
+                db.query(models.WorkspaceMember)
+                .filter_by(workspace_id=workspace_id, user_id=current_user.id)
+                .first()
+            )
+            if not membership:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="You don't have access to this workspace",
+                )
+
+        if not get_settings().rate_limit_enabled:
+            return
+
+        keys = [("user", str(current_user.id))]
+        if workspace_id is not None:
+            keys.append(("workspace", str(workspace_id)))
+
+        # Both buckets are charged or neither is; the postgres backend blocks on the DB
+        rejected = await run_in_threadpool(rate_limit.check_all, group, keys)
+        if rejected:
+            scope, retry_after = rejected
+            metrics.increment(f"rate_limit.{group}.{scope}.rejected")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded for {scope}, retry in {retry_after}s",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+    return check_rate_limit
+
+
 def log_activity(
     db: Session,
     workspace_id: UUID,
@@ -49,14 +205,18 @@ def log_activity(
 ) -> models.ActivityLog:
     """
     Helper function to log an activity event.
+
+    The event is also queued for webhook subscribers. The caller commits it
+    together with the change it describes, so subscribers only see changes that
+    happened and every change has its event.
     """
     activity = models.ActivityLog(
+        id=uuid4(),
         workspace_id=workspace_id,
         user_id=user_id,
         type=activity_type,
         payload=payload,
     )
     db.add(activity)
-    db.commit()
-    db.refresh(activity)
+    outbox.publish(db, workspace_id, activity_type, activity.id, payload)
     return activity
@@ -0,0 +1,22 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag derived from the given version parts."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already covers `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip() for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
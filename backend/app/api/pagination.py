@@ -0,0 +1,41 @@
+import base64
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def keyset_page(query: Query, model, cursor: str | None, limit: int) -> tuple[list, str | None]:
+    """
+    One page of `query`, newest first by (created_at, id), starting after
+    `cursor`. Returns the rows and the cursor of the next page, if any.
+    Unlike OFFSET, each page costs the same however deep the client pages.
+    """
+    if cursor:
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(*decode_cursor(cursor)))
+
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(last.created_at, last.id)
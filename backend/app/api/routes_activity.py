@@ -2,8 +2,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session, joinedload
 
 from app import models
-from app.api.deps import get_current_workspace
-from app.core.db import get_db
+from app.api.deps import get_current_workspace, get_read_db
 from app.schemas import ActivityLogResponse
 
 router = APIRouter()
@@ -12,7 +11,7 @@ router = APIRouter()
 @router.get("", response_model=list[ActivityLogResponse])
 async def list_activity(
     workspace: models.Workspace = Depends(get_current_workspace),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
 ) -> list[ActivityLogResponse]:
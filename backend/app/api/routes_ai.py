@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from app import models
+from app.api.deps import rate_limited
 from app.core.openai_client import rewrite_text
 from app.core.security import get_current_user
 from app.schemas import RewriteRequest, RewriteResponse
@@ -8,7 +9,11 @@ from app.schemas import RewriteRequest, RewriteResponse
 router = APIRouter()
 
 
-@router.post("/rewrite", response_model=RewriteResponse)
+@router.post(
+    "/rewrite",
+    response_model=RewriteResponse,
+    dependencies=[Depends(rate_limited("ai", require_workspace=True))],
+)
 async def rewrite_email_text(
     data: RewriteRequest,
     current_user: models.User = Depends(get_current_user),
@@ -18,6 +23,8 @@ async def rewrite_email_text(
 
     Supported tones: friendly, professional, punchy
     Supported purposes: cold_outreach, follow_up
+
+    Usage counts against the limits of the user and of `workspace_id`.
     """
     valid_tones = ["friendly", "professional", "punchy"]
     valid_purposes = ["cold_outreach", "follow_up"]
@@ -1,37 +1,71 @@
+from functools import partial
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, func, select
 from sqlalchemy.orm import Session
 
 from app import models
-from app.api.deps import get_current_workspace, log_activity
-from app.core.db import get_db
+from app.api.deps import (
+    get_current_workspace,
+    get_read_db,
+    idempotent_request,
+    log_activity,
+)
+from app.api.etags import is_not_modified, make_etag, not_modified
+from app.api.pagination import decode_cursor, encode_cursor, keyset_page
+from app.core.db import STICKY_COOKIE, get_db, get_read_session
 from app.core.security import get_current_user
-from app.schemas import ContactCreate, ContactResponse, ContactUpdate
+from app.services import contact_status, counters, suppression, timeline
+from app.services.export import export_response
+from app.schemas import (
+    BulkDeleteResponse,
+    BulkStatusUpdateResponse,
+    ContactBulkDelete,
+    ContactCreate,
+    ContactResponse,
+    ContactUpdate,
+    OutboundEmailPage,
+    TimelinePage,
+)
 
 router = APIRouter()
 
 
+def contact_search_clause(search: str):
+    """Case-insensitive match on email, name, or company."""
+    search_term = f"%{search}%"
+    return (
+        (models.Contact.email.ilike(search_term))
+        | (models.Contact.first_name.ilike(search_term))
+        | (models.Contact.last_name.ilike(search_term))
+        | (models.Contact.company.ilike(search_term))
+    )
+
+
 @router.get("", response_model=list[ContactResponse])
 async def list_contacts(
+    request: Request,
+    response: Response,
     workspace: models.Workspace = Depends(get_current_workspace),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     search: str | None = Query(None, description="Search by email, name, or company"),
     status_filter: str | None = Query(None, alias="status", description="Filter by status"),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
 ) -> list[ContactResponse]:
     """List contacts in a workspace with optional filtering."""
+    (version,) = counters.get_collection_versions(db, workspace.id, "contacts")
+    etag = make_etag("contacts", workspace.id, version, request.url.query)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
     query = db.query(models.Contact).filter_by(workspace_id=workspace.id)
 
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (models.Contact.email.ilike(search_term))
-            | (models.Contact.first_name.ilike(search_term))
-            | (models.Contact.last_name.ilike(search_term))
-            | (models.Contact.company.ilike(search_term))
-        )
+        query = query.filter(contact_search_clause(search))
 
     if status_filter:
         query = query.filter_by(status=status_filter)
@@ -41,7 +75,12 @@ async def list_contacts(
     return contacts
 
 
-@router.post("", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=ContactResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(idempotent_request)],
+)
 async def create_contact(
     data: ContactCreate,
     db: Session = Depends(get_db),
@@ -84,6 +123,8 @@ async def create_contact(
     )
     db.add(contact)
     db.flush()
+    counters.contact_status_changed(db, data.workspace_id, None, contact.status)
+    counters.bump_collection(db, data.workspace_id, "contacts")
 
     # Log activity
     log_activity(
@@ -104,11 +145,151 @@ async def create_contact(
     return contact
 
 
+@router.post("/bulk-delete", response_model=BulkDeleteResponse)
+async def bulk_delete_contacts(
+    data: ContactBulkDelete,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> BulkDeleteResponse:
+    """
+    Delete contacts by ID list and/or filter in a single statement.
+    Enrollments and emails are removed by the database cascade.
+    """
+    if not data.ids and not data.status and not data.search:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide ids or at least one filter",
+        )
+
+    conditions = [models.Contact.workspace_id == workspace.id]
+    if data.ids:
+        conditions.append(models.Contact.id.in_(data.ids))
+    if data.status:
+        conditions.append(models.Contact.status == data.status)
+    if data.search:
+        conditions.append(contact_search_clause(data.search))
+
+    # Active enrollments disappear with the contacts, so adjust their counters first
+    active_enrollments = (
+        db.query(models.SequenceEnrollment.sequence_id, func.count())
+        .join(models.Contact)
+        .filter(*conditions, models.SequenceEnrollment.status == "active")
+        .group_by(models.SequenceEnrollment.sequence_id)
+        .all()
+    )
+    for sequence_id, count in active_enrollments:
+        counters.increment(db, workspace.id, counters.ACTIVE_ENROLLMENTS, str(sequence_id), -count)
+
+    deleted = (
+        delete(models.Contact).where(*conditions).returning(models.Contact.status).cte("deleted")
+    )
+    deleted_by_status = db.execute(
+        select(deleted.c.status, func.count()).group_by(deleted.c.status)
+    ).all()
+
+    total = 0
+    for old_status, count in deleted_by_status:
+        counters.increment(db, workspace.id, counters.CONTACTS_BY_STATUS, old_status, -count)
+        suppression.contacts_changed(db, workspace.id, old_status, None)
+        total += count
+    if total:
+        counters.bump_collection(db, workspace.id, "contacts")
+
+    log_activity(
+        db=db,
+        workspace_id=workspace.id,
+        user_id=current_user.id,
+        activity_type="contact.bulk_deleted",
+        payload={
+            "count": total,
+            "filter": data.model_dump(mode="json", exclude_none=True, exclude={"ids"}),
+            "id_count": len(data.ids) if data.ids else None,
+        },
+    )
+    db.commit()
+
+    return BulkDeleteResponse(deleted=total)
+
+
+@router.post("/bulk-status", response_model=BulkStatusUpdateResponse)
+async def bulk_update_contact_status(
+    request: Request,
+    new_status: str = Query(..., alias="status", description="active, bounced or unsubscribed"),
+    match: str = Query("email", pattern="^(email|id)$", description="Match lines by email or id"),
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> BulkStatusUpdateResponse:
+    """
+    Set the status of many contacts at once, e.g. from a bounce or unsubscribe file.
+
+    The body is newline-delimited emails (or contact IDs with match=id) and is read
+    as it streams in. Active enrollments of bounced or unsubscribed contacts are
+    stopped in the same transaction.
+    """
+    if new_status not in contact_status.CONTACT_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid status. Must be one of: {', '.join(contact_status.CONTACT_STATUSES)}",
+        )
+
+    keys, invalid = await contact_status.read_keys(request.stream(), match)
+    result = contact_status.bulk_update_status(db, workspace.id, keys, match, new_status)
+
+    log_activity(
+        db=db,
+        workspace_id=workspace.id,
+        user_id=current_user.id,
+        activity_type="contact.bulk_status_updated",
+        payload={"status": new_status, "received": len(keys), **result},
+    )
+    db.commit()
+
+    return BulkStatusUpdateResponse(received=len(keys), invalid=invalid, **result)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_contacts(
+    request: Request,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    current_user: models.User = Depends(get_current_user),
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    gzip: bool = Query(False, description="Gzip the export"),
+    status_filter: str | None = Query(None, alias="status", description="Filter by status"),
+) -> StreamingResponse:
+    """Export all contacts in a workspace as CSV or NDJSON, streamed from the database."""
+    statement = (
+        select(
+            models.Contact.id,
+            models.Contact.email,
+            models.Contact.first_name,
+            models.Contact.last_name,
+            models.Contact.company,
+            models.Contact.title,
+            models.Contact.status,
+            models.Contact.created_at,
+        )
+        .where(models.Contact.workspace_id == workspace.id)
+        .order_by(models.Contact.created_at)
+    )
+
+    if status_filter:
+        statement = statement.where(models.Contact.status == status_filter)
+
+    session_factory = partial(
+        get_read_session, current_user.id, request.cookies.get(STICKY_COOKIE)
+    )
+    return export_response(session_factory, statement, "contacts", export_format, gzip)
+
+
 @router.get("/{contact_id}", response_model=ContactResponse)
 async def get_contact(
     contact_id: UUID,
+    request: Request,
+    response: Response,
     workspace: models.Workspace = Depends(get_current_workspace),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> ContactResponse:
     """Get a specific contact."""
     contact = (
@@ -123,9 +304,77 @@ async def get_contact(
             detail="Contact not found",
         )
 
+    etag = make_etag("contact", contact.id, contact.updated_at.isoformat())
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
     return contact
 
 
+@router.get("/{contact_id}/emails", response_model=OutboundEmailPage)
+async def list_contact_emails(
+    contact_id: UUID,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_read_db),
+    status_filter: str | None = Query(None, alias="status", description="queued, sent or failed"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=100),
+) -> OutboundEmailPage:
+    """Emails sent to a contact, newest first."""
+    contact = (
+        db.query(models.Contact.id)
+        .filter_by(id=contact_id, workspace_id=workspace.id)
+        .first()
+    )
+
+    if not contact:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Contact not found",
+        )
+
+    query = db.query(models.OutboundEmail).filter_by(contact_id=contact_id)
+    if status_filter:
+        query = query.filter_by(status=status_filter)
+
+    emails, next_cursor = keyset_page(query, models.OutboundEmail, cursor, limit)
+
+    return {"items": emails, "next_cursor": next_cursor}
+
+
+@router.get("/{contact_id}/timeline", response_model=TimelinePage)
+async def get_contact_timeline(
+    contact_id: UUID,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_read_db),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=100),
+) -> TimelinePage:
+    """A contact's emails, enrollments and activity in one stream, newest first."""
+    contact = (
+        db.query(models.Contact.id)
+        .filter_by(id=contact_id, workspace_id=workspace.id)
+        .first()
+    )
+
+    if not contact:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Contact not found",
+        )
+
+    after = decode_cursor(cursor) if cursor else None
+    events = timeline.contact_timeline(db, workspace.id, contact_id, after, limit + 1)
+
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = encode_cursor(events[-1].occurred_at, events[-1].id)
+
+    return {"items": events, "next_cursor": next_cursor}
+
+
 @router.put("/{contact_id}", response_model=ContactResponse)
 async def update_contact(
     contact_id: UUID,
@@ -148,9 +397,15 @@ async def update_contact(
         )
 
     # Update fields if provided
+    old_status, old_email = contact.status, contact.email
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(contact, field, value)
+    counters.contact_status_changed(db, workspace.id, old_status, contact.status)
+    counters.bump_collection(db, workspace.id, "contacts")
+    # A suppressed contact's new address must be suppressed, and its old one released
+    if contact.status != old_status or contact.email != old_email:
+        suppression.contacts_changed(db, workspace.id, old_status, contact.status)
 
     db.commit()
     db.refresh(contact)
@@ -178,17 +433,27 @@ async def delete_contact(
             detail="Contact not found",
         )
 
-    # Log activity before deletion
+    counters.contact_status_changed(db, workspace.id, contact.status, None)
+    suppression.contacts_changed(db, workspace.id, contact.status, None)
+    active_sequence_ids = (
+        db.query(models.SequenceEnrollment.sequence_id)
+        .filter_by(contact_id=contact.id, status="active")
+        .all()
+    )
+    for (sequence_id,) in active_sequence_ids:
+        counters.increment(db, workspace.id, counters.ACTIVE_ENROLLMENTS, str(sequence_id), -1)
+    counters.bump_collection(db, workspace.id, "contacts")
+    db.delete(contact)
+    db.flush()
+
     log_activity(
         db=db,
         workspace_id=workspace.id,
         user_id=current_user.id,
         activity_type="contact.deleted",
         payload={
-            "contact_id": str(contact.id),
+            "contact_id": str(contact_id),
             "contact_email": contact.email,
         },
     )
-
-    db.delete(contact)
     db.commit()
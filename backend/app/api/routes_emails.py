@@ -1,19 +1,75 @@
 from datetime import datetime, timezone
+from functools import partial
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app import models
-from app.api.deps import log_activity
-from app.core.db import get_db
-from app.core.email import send_email
+from app.api.deps import (
+    get_current_workspace,
+    get_read_db,
+    idempotent_request,
+    log_activity,
+    rate_limited,
+)
+from app.api.pagination import keyset_page
+from app.core.db import STICKY_COOKIE, get_db, get_read_session
+from app.core.email import make_message_id, send_email
 from app.core.security import get_current_user
-from app.schemas import OutboundEmailResponse, SendTestEmailRequest
+from app.services import counters, sequence_analytics
+from app.services.suppression import suppression_index
+from app.services.export import export_response
+from app.schemas import (
+    EmailEngagementResponse,
+    OutboundEmailPage,
+    OutboundEmailResponse,
+    SendTestEmailRequest,
+)
 
 router = APIRouter()
 
 
-@router.post("/send-test", response_model=OutboundEmailResponse, status_code=status.HTTP_201_CREATED)
+@router.get("", response_model=OutboundEmailPage)
+async def list_emails(
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_read_db),
+    status_filter: str | None = Query(None, alias="status", description="queued, sent or failed"),
+    sequence_id: UUID | None = Query(None),
+    step_id: UUID | None = Query(None),
+    since: datetime | None = Query(None, description="Created at or after"),
+    until: datetime | None = Query(None, description="Created before"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=100),
+) -> OutboundEmailPage:
+    """Outbound email history of a workspace, newest first."""
+    query = db.query(models.OutboundEmail).filter_by(workspace_id=workspace.id)
+
+    if status_filter:
+        query = query.filter_by(status=status_filter)
+    if sequence_id:
+        query = query.filter_by(sequence_id=sequence_id)
+    if step_id:
+        query = query.filter_by(step_id=step_id)
+    if since:
+        query = query.filter(models.OutboundEmail.created_at >= since)
+    if until:
+        query = query.filter(models.OutboundEmail.created_at < until)
+
+    emails, next_cursor = keyset_page(query, models.OutboundEmail, cursor, limit)
+
+    return {"items": emails, "next_cursor": next_cursor}
+
+
+@router.post(
+    "/send-test",
+    response_model=OutboundEmailResponse,
+    status_code=status.HTTP_201_CREATED,
+    # Idempotency first, so replaying a completed send doesn't spend rate limit tokens
+    dependencies=[Depends(idempotent_request), Depends(rate_limited("send"))],
+)
 async def send_test_email(
     data: SendTestEmailRequest,
     db: Session = Depends(get_db),
@@ -36,6 +92,12 @@ async def send_test_email(
             detail="You don't have access to this workspace",
         )
 
+    if suppression_index.is_suppressed(db, data.workspace_id, data.contact_email):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="This address is bounced, unsubscribed or suppressed",
+        )
+
     # Find or create contact
     contact = (
         db.query(models.Contact)
@@ -50,6 +112,8 @@ async def send_test_email(
         )
         db.add(contact)
         db.flush()
+        counters.contact_status_changed(db, data.workspace_id, None, contact.status)
+        counters.bump_collection(db, data.workspace_id, "contacts")
 
     # Create outbound email record
     outbound_email = models.OutboundEmail(
@@ -67,6 +131,7 @@ async def send_test_email(
         to_email=data.contact_email,
         subject=data.subject,
         body=data.body,
+        message_id=make_message_id(outbound_email.id),
     )
 
     if success:
@@ -75,6 +140,8 @@ async def send_test_email(
     else:
         outbound_email.status = "failed"
         outbound_email.error_message = "Failed to send email via SMTP"
+    counters.email_status_changed(db, data.workspace_id, outbound_email.status)
+    sequence_analytics.record_email_status(db, outbound_email)
 
     # Log activity
     log_activity(
@@ -93,3 +160,84 @@ async def send_test_email(
     db.refresh(outbound_email)
 
     return outbound_email
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_emails(
+    request: Request,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    current_user: models.User = Depends(get_current_user),
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    gzip: bool = Query(False, description="Gzip the export"),
+    status_filter: str | None = Query(None, alias="status", description="Filter by status"),
+) -> StreamingResponse:
+    """Export outbound emails in a workspace as CSV or NDJSON, streamed from the database."""
+    statement = (
+        select(
+            models.OutboundEmail.id,
+            models.OutboundEmail.contact_id,
+            models.Contact.email.label("contact_email"),
+            models.OutboundEmail.sequence_id,
+            models.OutboundEmail.step_id,
+            models.OutboundEmail.subject,
+            models.OutboundEmail.body,
+            models.OutboundEmail.status,
+            models.OutboundEmail.sent_at,
+            models.OutboundEmail.error_message,
+            models.OutboundEmail.created_at,
+        )
+        .join(models.Contact, models.Contact.id == models.OutboundEmail.contact_id)
+        .where(models.OutboundEmail.workspace_id == workspace.id)
+        .order_by(models.OutboundEmail.created_at)
+    )
+
+    if status_filter:
+        statement = statement.where(models.OutboundEmail.status == status_filter)
+
+    session_factory = partial(
+        get_read_session, current_user.id, request.cookies.get(STICKY_COOKIE)
+    )
+    return export_response(session_factory, statement, "emails", export_format, gzip)
+
+
+@router.get("/{email_id}/engagement", response_model=EmailEngagementResponse)
+async def get_email_engagement(
+    email_id: UUID,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_read_db),
+) -> EmailEngagementResponse:
+    """
+    Opens and clicks of an outbound email. Counts are written in batches, so
+    they can trail the actual hits by a few seconds.
+    """
+    email = (
+        db.query(models.OutboundEmail.id)
+        .filter_by(id=email_id, workspace_id=workspace.id)
+        .first()
+    )
+
+    if not email:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Email not found",
+        )
+
+    engagement = db.get(models.EmailEngagement, email_id)
+    if engagement is None:
+        return EmailEngagementResponse(
+            outbound_email_id=email_id,
+            opens=0,
+            clicks=0,
+            first_opened_at=None,
+            first_clicked_at=None,
+            last_event_at=None,
+        )
+
+    return EmailEngagementResponse(
+        outbound_email_id=engagement.outbound_email_id,
+        opens=engagement.opens,
+        clicks=engagement.clicks,
+        first_opened_at=engagement.first_opened_at,
+        first_clicked_at=engagement.first_clicked_at,
+        last_event_at=engagement.last_event_at,
+    )
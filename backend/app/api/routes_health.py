@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
-from app.schemas import HealthResponse
+from app.core import metrics
+from app.schemas import HealthResponse, MetricsResponse
 
 router = APIRouter()
 
@@ -9,3 +10,9 @@ router = APIRouter()
 async def health_check() -> HealthResponse:
     """Health check endpoint."""
     return HealthResponse(status="ok")
+
+
+@router.get("/metrics", response_model=MetricsResponse)
+async def get_metrics() -> MetricsResponse:
+    """In-process counters and timers for this worker."""
+    return MetricsResponse(**metrics.snapshot())
@@ -0,0 +1,84 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app import models
+from app.api.deps import get_current_workspace, get_read_db
+from app.core.db import get_db
+from app.schemas import JobResponse
+from app.services import jobs
+
+router = APIRouter()
+
+
+def get_job(
+    db: Session, job_id: UUID, workspace: models.Workspace, for_update: bool = False
+) -> models.Job:
+    query = db.query(models.Job).filter_by(id=job_id, workspace_id=workspace.id)
+    if for_update:
+        query = query.with_for_update()
+    job = query.first()
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+
+    return job
+
+
+@router.get("", response_model=list[JobResponse])
+async def list_jobs(
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_read_db),
+    status_filter: str | None = Query(None, alias="status", description="Filter by status"),
+    limit: int = Query(50, ge=1, le=100),
+) -> list[JobResponse]:
+    """Recent background jobs in a workspace, newest first."""
+    query = db.query(models.Job).filter_by(workspace_id=workspace.id)
+
+    if status_filter:
+        query = query.filter_by(status=status_filter)
+
+    return query.order_by(models.Job.created_at.desc()).limit(limit).all()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job_status(
+    job_id: UUID,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_db),
+) -> JobResponse:
+    """Status, progress and result of a job. Poll this after a 202."""
+    # Read from the primary: progress is written continuously and a lagging
+    # replica would make it appear to jump backwards
+    return get_job(db, job_id, workspace)
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(
+    job_id: UUID,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_db),
+) -> JobResponse:
+    """
+    Cancel a job. A queued job is cancelled immediately; a running one stops
+    at its next progress update, keeping the work it already committed.
+    """
+    # Locked so a concurrent claim can't start it between the check and the cancel;
+    # a claim already in progress is waited for, and the job is then seen as running
+    job = get_job(db, job_id, workspace, for_update=True)
+
+    if job.status in jobs.TERMINAL_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job already {job.status}",
+        )
+
+    jobs.cancel(db, job)
+    db.commit()
+    db.refresh(job)
+
+    return job
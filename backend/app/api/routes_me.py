@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app import models
-from app.core.db import get_db
+from app.api.deps import get_read_db
 from app.core.security import get_current_user
 from app.schemas import MeResponse, UserResponse, WorkspaceWithRole
 
@@ -11,7 +11,7 @@ router = APIRouter()
 
 @router.get("", response_model=MeResponse)
 async def get_me(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ) -> MeResponse:
     """Get current user info and their workspaces."""
@@ -29,6 +29,10 @@ async def get_me(
             WorkspaceWithRole(
                 id=workspace.id,
                 name=workspace.name,
+                timezone=workspace.timezone,
+                send_window_start=workspace.send_window_start,
+                send_window_end=workspace.send_window_end,
+                send_on_weekends=workspace.send_on_weekends,
                 created_at=workspace.created_at,
                 role=membership.role,
             )
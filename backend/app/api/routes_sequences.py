@@ -1,19 +1,41 @@
-from datetime import datetime, timedelta, timezone
-from uuid import UUID
+from datetime import date, datetime, timedelta, timezone
+from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import delete
 from sqlalchemy.orm import Session, joinedload
 
 from app import models
-from app.api.deps import get_current_workspace, log_activity
+from app.api.deps import (
+    get_current_workspace,
+    get_read_db,
+    idempotent_request,
+    log_activity,
+)
+from app.api.etags import is_not_modified, make_etag, not_modified
 from app.core.db import get_db
 from app.core.security import get_current_user
+from app.services import (
+    bulk_enroll,
+    counters,
+    jobs,
+    send_schedule,
+    sequence_analytics,
+    sequence_cache,
+    sequence_steps,
+)
 from app.schemas import (
+    BulkDeleteResponse,
     EnrollmentCreate,
     EnrollmentResponse,
+    JobResponse,
+    SequenceAnalyticsResponse,
+    SequenceBulkDelete,
+    SequenceClone,
     SequenceCreate,
     SequenceResponse,
     SequenceStepCreate,
+    SequenceStepOrder,
     SequenceStepResponse,
     SequenceStepUpdate,
     SequenceUpdate,
@@ -28,10 +50,18 @@ router = APIRouter()
 
 @router.get("", response_model=list[SequenceResponse])
 async def list_sequences(
+    request: Request,
+    response: Response,
     workspace: models.Workspace = Depends(get_current_workspace),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> list[SequenceResponse]:
     """List all sequences in a workspace."""
+    (version,) = counters.get_collection_versions(db, workspace.id, "sequences")
+    etag = make_etag("sequences", workspace.id, version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
     sequences = (
         db.query(models.Sequence)
         .filter_by(workspace_id=workspace.id)
@@ -68,6 +98,7 @@ async def create_sequence(
     )
     db.add(sequence)
     db.flush()
+    counters.bump_collection(db, data.workspace_id, "sequences")
 
     log_activity(
         db=db,
@@ -86,16 +117,156 @@ async def create_sequence(
     return sequence
 
 
+@router.post(
+    "/{sequence_id}/clone",
+    response_model=SequenceWithSteps,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(idempotent_request)],
+)
+async def clone_sequence(
+    sequence_id: UUID,
+    data: SequenceClone | None = None,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> SequenceWithSteps:
+    """Copy a sequence and all of its steps. Enrollments and stats are not copied."""
+    source = (
+        db.query(models.Sequence)
+        .filter_by(id=sequence_id, workspace_id=workspace.id)
+        .first()
+    )
+
+    if not source:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sequence not found",
+        )
+
+    sequence = models.Sequence(
+        workspace_id=workspace.id,
+        name=(data and data.name) or f"{source.name} (copy)",
+        description=source.description,
+        is_active=source.is_active,
+    )
+    db.add(sequence)
+    db.flush()
+    sequence_steps.copy_steps(db, source.id, sequence.id)
+    counters.bump_collection(db, workspace.id, "sequences")
+
+    log_activity(
+        db=db,
+        workspace_id=workspace.id,
+        user_id=current_user.id,
+        activity_type="sequence.created",
+        payload={
+            "sequence_id": str(sequence.id),
+            "sequence_name": sequence.name,
+            "cloned_from": str(source.id),
+        },
+    )
+
+    db.commit()
+    db.refresh(sequence)
+
+    return sequence
+
+
+@router.post("/bulk-delete", response_model=BulkDeleteResponse)
+async def bulk_delete_sequences(
+    data: SequenceBulkDelete,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> BulkDeleteResponse:
+    """
+    Delete sequences by ID list and/or filter in a single statement.
+    Steps and enrollments are removed by the database cascade.
+    """
+    if not data.ids and data.is_active is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide ids or at least one filter",
+        )
+
+    statement = delete(models.Sequence).where(models.Sequence.workspace_id == workspace.id)
+    if data.ids:
+        statement = statement.where(models.Sequence.id.in_(data.ids))
+    if data.is_active is not None:
+        statement = statement.where(models.Sequence.is_active == data.is_active)
+
+    deleted_ids = db.execute(statement.returning(models.Sequence.id)).scalars().all()
+
+    if deleted_ids:
+        counters.bump_collection(db, workspace.id, "sequences")
+        db.query(models.WorkspaceCounter).filter(
+            models.WorkspaceCounter.workspace_id == workspace.id,
+            models.WorkspaceCounter.metric == counters.ACTIVE_ENROLLMENTS,
+            models.WorkspaceCounter.dimension.in_([str(seq_id) for seq_id in deleted_ids]),
+        ).delete(synchronize_session=False)
+
+    log_activity(
+        db=db,
+        workspace_id=workspace.id,
+        user_id=current_user.id,
+        activity_type="sequence.bulk_deleted",
+        payload={
+            "count": len(deleted_ids),
+            "sequence_ids": [str(sequence_id) for sequence_id in deleted_ids],
+        },
+    )
+    db.commit()
+
+    for sequence_id in deleted_ids:
+        sequence_cache.evict(sequence_id)
+
+    return BulkDeleteResponse(deleted=len(deleted_ids))
+
+
 @router.get("/{sequence_id}", response_model=SequenceWithSteps)
 async def get_sequence(
     sequence_id: UUID,
+    request: Request,
+    response: Response,
     workspace: models.Workspace = Depends(get_current_workspace),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> SequenceWithSteps:
     """Get a sequence with its steps."""
+    version = sequence_cache.get_version(db, sequence_id, workspace.id)
+
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sequence not found",
+        )
+
+    etag = make_etag("sequence", sequence_id, version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    sequence = sequence_cache.get_compiled_sequence(db, sequence_id, workspace.id, version)
+
+    if not sequence:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sequence not found",
+        )
+
+    response.headers["ETag"] = etag
+    return sequence
+
+
+@router.get("/{sequence_id}/analytics", response_model=SequenceAnalyticsResponse)
+async def get_sequence_analytics(
+    sequence_id: UUID,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_read_db),
+    start: date | None = Query(None, description="First day (UTC), defaults to 30 days ago"),
+    end: date | None = Query(None, description="Last day (UTC), defaults to today"),
+) -> SequenceAnalyticsResponse:
+    """Get funnel stats for a sequence from the daily rollup."""
     sequence = (
-        db.query(models.Sequence)
-        .options(joinedload(models.Sequence.steps))
+        db.query(models.Sequence.id)
         .filter_by(id=sequence_id, workspace_id=workspace.id)
         .first()
     )
@@ -106,7 +277,16 @@ async def get_sequence(
             detail="Sequence not found",
         )
 
-    return sequence
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=30)
+
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be on or before end",
+        )
+
+    return sequence_analytics.get_sequence_analytics(db, sequence_id, start, end)
 
 
 @router.put("/{sequence_id}", response_model=SequenceResponse)
@@ -132,6 +312,8 @@ async def update_sequence(
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(sequence, field, value)
+    sequence_cache.bump_version(db, sequence.id)
+    counters.bump_collection(db, workspace.id, "sequences")
 
     db.commit()
     db.refresh(sequence)
@@ -159,19 +341,27 @@ async def delete_sequence(
             detail="Sequence not found",
         )
 
+    db.query(models.WorkspaceCounter).filter_by(
+        workspace_id=workspace.id,
+        metric=counters.ACTIVE_ENROLLMENTS,
+        dimension=str(sequence.id),
+    ).delete(synchronize_session=False)
+    counters.bump_collection(db, workspace.id, "sequences")
+    db.delete(sequence)
+    db.flush()
+
     log_activity(
         db=db,
         workspace_id=workspace.id,
         user_id=current_user.id,
         activity_type="sequence.deleted",
         payload={
-            "sequence_id": str(sequence.id),
+            "sequence_id": str(sequence_id),
             "sequence_name": sequence.name,
         },
     )
-
-    db.delete(sequence)
     db.commit()
+    sequence_cache.evict(sequence_id)
 
 
 # ============ Steps ============
@@ -205,12 +395,69 @@ async def add_step(
         delay_days=data.delay_days,
     )
     db.add(step)
+    sequence_cache.bump_version(db, sequence_id)
     db.commit()
     db.refresh(step)
 
     return step
 
 
+# Declared before /steps/{step_id} so "order" isn't parsed as a step id
+@router.put("/{sequence_id}/steps/order", response_model=list[SequenceStepResponse])
+async def reorder_steps(
+    sequence_id: UUID,
+    data: SequenceStepOrder,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_db),
+) -> list[SequenceStepResponse]:
+    """
+    Set the order of all steps at once; they are renumbered 1..N. Refused while
+    an active enrollment is part way through the sequence.
+    """
+    # Locking the sequence serializes this with step edits, which bump its version
+    sequence = (
+        db.query(models.Sequence)
+        .filter_by(id=sequence_id, workspace_id=workspace.id)
+        .with_for_update()
+        .first()
+    )
+
+    if not sequence:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sequence not found",
+        )
+
+    current = {
+        step_id
+        for (step_id,) in db.query(models.SequenceStep.id).filter_by(sequence_id=sequence_id)
+    }
+    if len(data.step_ids) != len(current) or set(data.step_ids) != current:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="step_ids must list every step of the sequence exactly once",
+        )
+
+    started = sequence_steps.lock_started_enrollments(db, sequence_id)
+    if started:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{started} active enrollment(s) have already been sent steps of this "
+            "sequence; steps can't be reordered until they finish or are stopped",
+        )
+
+    sequence_steps.reorder(db, sequence_id, data.step_ids)
+    sequence_cache.bump_version(db, sequence_id)
+    db.commit()
+
+    return (
+        db.query(models.SequenceStep)
+        .filter_by(sequence_id=sequence_id)
+        .order_by(models.SequenceStep.step_order)
+        .all()
+    )
+
+
 @router.put("/{sequence_id}/steps/{step_id}", response_model=SequenceStepResponse)
 async def update_step(
     sequence_id: UUID,
@@ -240,6 +487,7 @@ async def update_step(
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(step, field, value)
+    sequence_cache.bump_version(db, sequence_id)
 
     db.commit()
     db.refresh(step)
@@ -273,13 +521,19 @@ async def delete_step(
         )
 
     db.delete(step)
+    sequence_cache.bump_version(db, sequence_id)
     db.commit()
 
 
 # ============ Enrollments ============
 
 
-@router.post("/{sequence_id}/enroll", response_model=EnrollmentResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/{sequence_id}/enroll",
+    response_model=EnrollmentResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(idempotent_request)],
+)
 async def enroll_contact(
     sequence_id: UUID,
     data: EnrollmentCreate,
@@ -289,11 +543,7 @@ async def enroll_contact(
 ) -> EnrollmentResponse:
     """Enroll a contact into a sequence."""
     # Verify sequence exists and belongs to workspace
-    sequence = (
-        db.query(models.Sequence)
-        .filter_by(id=sequence_id, workspace_id=workspace.id)
-        .first()
-    )
+    sequence = sequence_cache.get_compiled_sequence(db, sequence_id, workspace.id)
 
     if not sequence:
         raise HTTPException(
@@ -328,24 +578,29 @@ async def enroll_contact(
         )
 
     # Get first step to schedule
-    first_step = (
-        db.query(models.SequenceStep)
-        .filter_by(sequence_id=sequence_id)
-        .order_by(models.SequenceStep.step_order)
-        .first()
-    )
+    first_step = sequence.first_step
 
+    enrollment_id = uuid4()
     next_scheduled = None
     if first_step:
-        next_scheduled = datetime.now(timezone.utc) + timedelta(days=first_step.delay_days)
+        # Spread over the workspace's send window so bulk enrollments don't come due at once
+        next_scheduled = send_schedule.schedule(
+            datetime.now(timezone.utc) + timedelta(days=first_step.delay_days),
+            send_schedule.SendWindow.for_workspace(workspace),
+            enrollment_id,
+        )
 
     enrollment = models.SequenceEnrollment(
+        id=enrollment_id,
         sequence_id=sequence_id,
         contact_id=data.contact_id,
         next_scheduled_at=next_scheduled,
     )
     db.add(enrollment)
     db.flush()
+    counters.increment(db, workspace.id, counters.ACTIVE_ENROLLMENTS, str(sequence_id))
+    counters.bump_collection(db, workspace.id, "enrollments")
+    sequence_analytics.record(db, sequence_id, None, "enrolled")
 
     log_activity(
         db=db,
@@ -367,11 +622,54 @@ async def enroll_contact(
     return enrollment
 
 
+@router.post(
+    "/{sequence_id}/enroll-all",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(idempotent_request)],
+)
+async def enroll_all_contacts(
+    sequence_id: UUID,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> JobResponse:
+    """
+    Enroll every active contact not yet in the sequence. Runs as a background
+    job; poll GET /jobs/{id} for progress.
+    """
+    sequence = (
+        db.query(models.Sequence.id)
+        .filter_by(id=sequence_id, workspace_id=workspace.id)
+        .first()
+    )
+
+    if not sequence:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sequence not found",
+        )
+
+    job = jobs.enqueue(
+        db,
+        workspace.id,
+        bulk_enroll.JOB_TYPE,
+        {"sequence_id": str(sequence_id)},
+        user_id=current_user.id,
+    )
+    db.commit()
+    db.refresh(job)
+
+    return job
+
+
 @router.get("/{sequence_id}/enrollments", response_model=list[EnrollmentResponse])
 async def list_enrollments(
     sequence_id: UUID,
+    request: Request,
+    response: Response,
     workspace: models.Workspace = Depends(get_current_workspace),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> list[EnrollmentResponse]:
     """List all enrollments for a sequence."""
     # Verify sequence exists
@@ -387,6 +685,13 @@ async def list_enrollments(
             detail="Sequence not found",
         )
 
+    # Enrollments embed their contact, so contact changes invalidate the list too
+    versions = counters.get_collection_versions(db, workspace.id, "enrollments", "contacts")
+    etag = make_etag("enrollments", sequence_id, *versions)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
     enrollments = (
         db.query(models.SequenceEnrollment)
         .options(joinedload(models.SequenceEnrollment.contact))
@@ -424,6 +729,11 @@ async def stop_enrollment(
             detail="Enrollment not found",
         )
 
+    if enrollment.status == "active":
+        counters.increment(db, workspace.id, counters.ACTIVE_ENROLLMENTS, str(sequence_id), -1)
+        sequence_analytics.record(db, sequence_id, None, "stopped")
+        counters.bump_collection(db, workspace.id, "enrollments")
+
     enrollment.status = "stopped"
     enrollment.next_scheduled_at = None
 
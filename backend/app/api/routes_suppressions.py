@@ -0,0 +1,89 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app import models
+from app.api.deps import get_current_workspace, get_read_db, log_activity
+from app.core.db import get_db
+from app.core.security import get_current_user
+from app.schemas import SuppressionAddResponse, SuppressionCreate, SuppressionResponse
+from app.services import suppression
+
+router = APIRouter()
+
+
+@router.get("", response_model=list[SuppressionResponse])
+async def list_suppressions(
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_read_db),
+    email: str | None = Query(None, description="Look up a single address"),
+    limit: int = Query(100, ge=1, le=1000),
+) -> list[SuppressionResponse]:
+    """Addresses on the workspace's suppression list, newest first."""
+    query = db.query(models.Suppression).filter_by(workspace_id=workspace.id)
+
+    if email:
+        query = query.filter_by(email=email.strip().lower())
+
+    return query.order_by(models.Suppression.created_at.desc()).limit(limit).all()
+
+
+@router.post("", response_model=SuppressionAddResponse, status_code=status.HTTP_201_CREATED)
+async def add_suppressions(
+    data: SuppressionCreate,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> SuppressionAddResponse:
+    """
+    Never email these addresses from this workspace, whether or not they are
+    contacts. Addresses already on the list are left as they are.
+    """
+    added = suppression.suppress(db, workspace.id, data.emails, data.reason)
+
+    log_activity(
+        db=db,
+        workspace_id=workspace.id,
+        user_id=current_user.id,
+        activity_type="suppression.added",
+        payload={"reason": data.reason, "received": len(data.emails), "added": len(added)},
+    )
+    db.commit()
+
+    return SuppressionAddResponse(received=len(data.emails), added=len(added))
+
+
+@router.delete("/{suppression_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_suppression(
+    suppression_id: UUID,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> None:
+    """
+    Take an address off the workspace's suppression list. It stays suppressed
+    while a contact with that address is bounced or unsubscribed.
+    """
+    entry = (
+        db.query(models.Suppression)
+        .filter_by(id=suppression_id, workspace_id=workspace.id)
+        .first()
+    )
+
+    if not entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Suppression not found",
+        )
+
+    db.delete(entry)
+    suppression.mark_changed(db, workspace.id)
+    log_activity(
+        db=db,
+        workspace_id=workspace.id,
+        user_id=current_user.id,
+        activity_type="suppression.removed",
+        payload={"email": entry.email, "reason": entry.reason},
+    )
+    db.commit()
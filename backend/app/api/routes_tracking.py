@@ -0,0 +1,40 @@
+import base64
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import RedirectResponse, Response
+
+from app.core import metrics
+from app.services import tracking
+
+router = APIRouter()
+
+# 1x1 transparent GIF
+PIXEL = base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7")
+NO_STORE = {"Cache-Control": "no-store, max-age=0"}
+
+# These endpoints are public (hit by mail clients) and deliberately take no
+# dependencies: no auth, no database session. Hits are buffered and written in
+# batches by tracking.tracking_buffer.
+
+
+@router.get("/o/{token}.gif", include_in_schema=False)
+async def track_open(token: str) -> Response:
+    """Open pixel. Always returns the image, even for unknown tokens."""
+    decoded = tracking.read_token(token, tracking.OPEN)
+    if decoded is not None:
+        tracking.tracking_buffer.add(decoded[0], tracking.OPEN)
+        metrics.increment("tracking.opens")
+    return Response(content=PIXEL, media_type="image/gif", headers=NO_STORE)
+
+
+@router.get("/c/{token}", include_in_schema=False)
+async def track_click(token: str) -> RedirectResponse:
+    """Record a click and redirect to the link's original target."""
+    decoded = tracking.read_token(token, tracking.CLICK)
+    if decoded is None or not decoded[1].startswith(("http://", "https://")):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Link not found")
+
+    email_id, url = decoded
+    tracking.tracking_buffer.add(email_id, tracking.CLICK)
+    metrics.increment("tracking.clicks")
+    return RedirectResponse(url, status_code=status.HTTP_302_FOUND, headers=NO_STORE)
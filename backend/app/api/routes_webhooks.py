@@ -0,0 +1,144 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app import models
+from app.api.deps import get_current_workspace
+from app.core.db import get_db
+from app.schemas import (
+    WebhookCreate,
+    WebhookCreatedResponse,
+    WebhookDeadLetterResponse,
+    WebhookReplayRequest,
+    WebhookResponse,
+)
+from app.services import outbox, webhooks
+
+router = APIRouter()
+
+
+def get_subscription(
+    db: Session, subscription_id: UUID, workspace: models.Workspace
+) -> models.WebhookSubscription:
+    subscription = (
+        db.query(models.WebhookSubscription)
+        .filter_by(id=subscription_id, workspace_id=workspace.id)
+        .first()
+    )
+
+    if not subscription:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Webhook not found",
+        )
+
+    return subscription
+
+
+@router.get("", response_model=list[WebhookResponse])
+async def list_webhooks(
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_db),
+) -> list[WebhookResponse]:
+    """List webhook subscriptions in a workspace."""
+    return (
+        db.query(models.WebhookSubscription)
+        .filter_by(workspace_id=workspace.id)
+        .order_by(models.WebhookSubscription.created_at)
+        .all()
+    )
+
+
+@router.post("", response_model=WebhookCreatedResponse, status_code=status.HTTP_201_CREATED)
+async def create_webhook(
+    data: WebhookCreate,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_db),
+) -> WebhookCreatedResponse:
+    """
+    Subscribe an endpoint to workspace events. Deliveries start with events
+    created from now on and are signed with the returned secret.
+    """
+    reason = await run_in_threadpool(webhooks.blocked_reason, data.url)
+    if reason:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=reason,
+        )
+
+    subscription = models.WebhookSubscription(
+        workspace_id=workspace.id,
+        url=data.url,
+        secret=webhooks.new_secret(),
+        event_types=data.event_types,
+        # Start at the current end of the stream rather than replaying history
+        cursor_txid=outbox.visible_txid(db) - 1,
+        cursor_event_id=2**63 - 1,
+    )
+    db.add(subscription)
+    db.commit()
+    db.refresh(subscription)
+
+    return subscription
+
+
+@router.delete("/{subscription_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_webhook(
+    subscription_id: UUID,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_db),
+) -> None:
+    """Delete a webhook subscription."""
+    subscription = get_subscription(db, subscription_id, workspace)
+    db.delete(subscription)
+    db.commit()
+
+
+@router.post("/{subscription_id}/replay", response_model=WebhookResponse)
+async def replay_webhook(
+    subscription_id: UUID,
+    data: WebhookReplayRequest,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_db),
+) -> WebhookResponse:
+    """
+    Redeliver events starting from `from_event_id` (e.g. a dead letter's
+    first_event_id), and everything after it, in the original order.
+    """
+    subscription = get_subscription(db, subscription_id, workspace)
+    event = (
+        db.query(models.OutboxEvent)
+        .filter_by(id=data.from_event_id, workspace_id=workspace.id)
+        .first()
+    )
+
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found; it may be older than the outbox retention",
+        )
+
+    webhooks.replay_from(db, subscription, event)
+    db.commit()
+    db.refresh(subscription)
+
+    return subscription
+
+
+@router.get("/{subscription_id}/dead-letters", response_model=list[WebhookDeadLetterResponse])
+async def list_dead_letters(
+    subscription_id: UUID,
+    workspace: models.Workspace = Depends(get_current_workspace),
+    db: Session = Depends(get_db),
+) -> list[WebhookDeadLetterResponse]:
+    """Batches that were given up on after repeated delivery failures."""
+    subscription = get_subscription(db, subscription_id, workspace)
+    return (
+        db.query(models.WebhookDeadLetter)
+        .filter_by(subscription_id=subscription.id)
+        .order_by(models.WebhookDeadLetter.created_at.desc())
+        .limit(100)
+        .all()
+    )
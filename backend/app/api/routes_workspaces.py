@@ -1,13 +1,24 @@
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
 from app import models
-from app.api.deps import log_activity
+from app.api.deps import get_read_db, log_activity
+from app.api.etags import is_not_modified, make_etag, not_modified
 from app.core.db import get_db
 from app.core.security import get_current_user
-from app.schemas import WorkspaceCreate, WorkspaceResponse, WorkspaceUpdate
+from app.schemas import (
+    SendForecastBucket,
+    SendForecastResponse,
+    WorkspaceCreate,
+    WorkspaceResponse,
+    WorkspaceStatsResponse,
+    WorkspaceUpdate,
+)
+from app.services import counters, send_schedule
 
 router = APIRouter()
 
@@ -66,6 +77,8 @@ async def create_workspace(
 @router.get("/{workspace_id}", response_model=WorkspaceResponse)
 async def get_workspace(
     workspace_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ) -> WorkspaceResponse:
@@ -91,9 +104,83 @@ async def get_workspace(
             detail="Workspace not found",
         )
 
+    etag = make_etag(
+        "workspace",
+        workspace.id,
+        workspace.name,
+        workspace.timezone,
+        workspace.send_window_start.isoformat(),
+        workspace.send_window_end.isoformat(),
+        workspace.send_on_weekends,
+    )
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
     return workspace
 
 
+@router.get("/{workspace_id}/stats", response_model=WorkspaceStatsResponse)
+async def get_workspace_stats(
+    workspace_id: UUID,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user),
+) -> WorkspaceStatsResponse:
+    """Get dashboard counters for a workspace, read from the rollup table."""
+    membership = (
+        db.query(models.WorkspaceMember)
+        .filter_by(workspace_id=workspace_id, user_id=current_user.id)
+        .first()
+    )
+
+    if not membership:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have access to this workspace",
+        )
+
+    return WorkspaceStatsResponse(**counters.get_workspace_stats(db, workspace_id))
+
+
+@router.get("/{workspace_id}/send-forecast", response_model=SendForecastResponse)
+async def get_send_forecast(
+    workspace_id: UUID,
+    hours: int = Query(24, ge=1, le=168, description="How far ahead to project"),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user),
+) -> SendForecastResponse:
+    """
+    Projected sequence sends per minute, from each active enrollment's next
+    scheduled step. Useful for checking that send windows flatten peaks.
+    """
+    membership = (
+        db.query(models.WorkspaceMember)
+        .filter_by(workspace_id=workspace_id, user_id=current_user.id)
+        .first()
+    )
+
+    if not membership:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have access to this workspace",
+        )
+
+    start = datetime.now(timezone.utc)
+    end = start + timedelta(hours=hours)
+    buckets = [
+        SendForecastBucket(minute=minute, sends=sends)
+        for minute, sends in send_schedule.forecast(db, workspace_id, start, end)
+    ]
+
+    return SendForecastResponse(
+        start=start,
+        end=end,
+        total=sum(bucket.sends for bucket in buckets),
+        peak_per_minute=max((bucket.sends for bucket in buckets), default=0),
+        buckets=buckets,
+    )
+
+
 @router.put("/{workspace_id}", response_model=WorkspaceResponse)
 async def update_workspace(
     workspace_id: UUID,
@@ -125,6 +212,31 @@ async def update_workspace(
     if data.name is not None:
         workspace.name = data.name
 
+    if data.timezone is not None:
+        try:
+            ZoneInfo(data.timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown timezone: {data.timezone}",
+            )
+        workspace.timezone = data.timezone
+
+    if data.send_window_start is not None:
+        workspace.send_window_start = data.send_window_start.replace(tzinfo=None)
+
+    if data.send_window_end is not None:
+        workspace.send_window_end = data.send_window_end.replace(tzinfo=None)
+
+    if data.send_on_weekends is not None:
+        workspace.send_on_weekends = data.send_on_weekends
+
+    if workspace.send_window_start >= workspace.send_window_end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The send window must start before it ends",
+        )
+
     db.commit()
     db.refresh(workspace)
 
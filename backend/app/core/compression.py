@@ -0,0 +1,242 @@
+"""
+Response compression as a plain ASGI middleware.
+
+Negotiates zstd, brotli or gzip from Accept-Encoding. Complete bodies below
+`minimum_size` go out as they are; streamed bodies are compressed chunk by chunk
+and flushed after each one, so exports still reach the client incrementally.
+brotli and zstd are used when their packages are installed
+(`pip install inboxpilot-api[compression]`); gzip always is.
+"""
+
+import asyncio
+import zlib
+from collections.abc import Callable
+
+from app.core import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Complete bodies at least this large are compressed in a thread rather than
+# blocking the event loop (a 1 MB JSON list takes ~20 ms at gzip level 4)
+OFFLOAD_SIZE = 256 * 1024
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+
+class GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliStream:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return self._compressor.compress(data) + self._compressor.flush(flush_block)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encodings() -> dict[str, Callable[[int], object]]:
+    """Encodings this process can produce, in order of preference."""
+    encodings: dict[str, Callable[[int], object]] = {}
+    if zstandard is not None:
+        encodings["zstd"] = ZstdStream
+    if brotli is not None:
+        encodings["br"] = BrotliStream
+    encodings["gzip"] = GzipStream
+    return encodings
+
+
+def compress(encoding: str, level: int, body: bytes) -> bytes:
+    """One-shot compression of a complete body."""
+    if encoding == "gzip":
+        return zlib.compress(body, level, wbits=31)
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return zstandard.ZstdCompressor(level=level).compress(body)
+
+
+def choose_encoding(accept_encoding: str, offered: list[str]) -> str | None:
+    """The first of `offered` the client accepts (q > 0), honouring '*'."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip()] = quality
+
+    for encoding in offered:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        levels: dict[str, int] | None = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": 4, "br": 4, "zstd": 3, **(levels or {})}
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+
+        encoding = choose_encoding(accept_encoding, list(self.encodings))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingSender(
+            send, encoding, self.levels[encoding], self.encodings[encoding], self.minimum_size
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingSender:
+    """Wraps `send` for one response, deciding at the first body chunk whether to compress."""
+
+    def __init__(self, send, encoding: str, level: int, stream_factory, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.level = level
+        self.stream_factory = stream_factory
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.stream = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def _compressible(self) -> bool:
+        status = self.start_message["status"]
+        if status < 200 or status in (204, 304):
+            return False
+        content_type = ""
+        for name, value in self.start_message["headers"]:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.decode("latin-1").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _headers(self, content_length: int | None) -> list:
+        headers = [
+            (name, value)
+            for name, value in self.start_message["headers"]
+            if name not in (b"content-length", b"vary")
+        ]
+        vary = [value for name, value in self.start_message["headers"] if name == b"vary"]
+        vary.append(b"Accept-Encoding")
+        headers.append((b"vary", b", ".join(vary)))
+        headers.append((b"content-encoding", self.encoding.encode()))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode()))
+        return headers
+
+    def _record(self) -> None:
+        metrics.increment(f"compression.{self.encoding}.bytes_in", self.bytes_in)
+        metrics.increment(f"compression.{self.encoding}.bytes_out", self.bytes_out)
+
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is None:
+            # First body chunk: decide how this response goes out
+            if not self._compressible() or (not more_body and len(body) < self.minimum_size):
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            if not more_body:
+                if len(body) >= OFFLOAD_SIZE:
+                    compressed = await asyncio.get_running_loop().run_in_executor(
+                        None, compress, self.encoding, self.level, body
+                    )
+                else:
+                    compressed = compress(self.encoding, self.level, body)
+                self.bytes_in, self.bytes_out = len(body), len(compressed)
+                self._record()
+                await self._send({**self.start_message, "headers": self._headers(len(compressed))})
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+
+            self.stream = self.stream_factory(self.level)
+            await self._send({**self.start_message, "headers": self._headers(None)})
+
+        chunk = self.stream.compress(body) if body else b""
+        if not more_body:
+            chunk += self.stream.finish()
+        self.bytes_in += len(body)
+        self.bytes_out += len(chunk)
+        if not more_body:
+            self._record()
+
+        if chunk or not more_body:
+            await self._send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
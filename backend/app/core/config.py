@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings
 
 
@@ -6,6 +8,88 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str
+    database_replica_url: str | None = None
+    replica_sticky_seconds: float = 5.0
+    replica_max_lag_seconds: float = 10.0
+    replica_lag_check_interval_seconds: float = 5.0
+
+    # Connection pool
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_pool_warmup: int = 0  # Connections to open at startup
+    db_null_pool: bool = False  # Let an external pooler (PgBouncer) own pooling
+    db_pgbouncer_mode: bool = False  # Safe for PgBouncer transaction pooling
+    db_statement_timeout_ms: int | None = None
+    db_lock_timeout_ms: int | None = None
+
+    # Idempotency keys
+    idempotency_ttl_hours: int = 24  # How long completed responses are replayed
+    idempotency_lease_seconds: float = 120.0  # In-progress claims of dead requests free up after
+    idempotency_wait_seconds: float = 10.0
+
+    # Rate limiting, per route group: '<count>/<second|minute|hour|day>'
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "local"  # 'local' (per process) | 'postgres' (shared)
+    user_rate_limits: dict[str, str] = {"ai": "20/minute", "send": "30/minute"}
+    workspace_rate_limits: dict[str, str] = {"ai": "100/minute", "send": "120/minute"}
+
+    # Sequence dispatcher
+    dispatcher_shards: int = 64  # Fixed for the life of a deployment; changing it remaps workspaces
+    dispatcher_heartbeat_seconds: float = 5.0
+    dispatcher_lease_timeout_seconds: float = 30.0  # Silent workers are evicted after this
+    dispatcher_batch_size: int = 100
+    dispatcher_max_send_attempts: int = 3  # Failed sends of a step before the enrollment stops
+    dispatcher_lock_url: str | None = None  # Direct Postgres URL if DATABASE_URL is PgBouncer
+
+    # Open and click tracking
+    tracking_enabled: bool = True
+    tracking_base_url: str = "http://localhost:8000"  # Public URL of this API
+    tracking_secret: str | None = None  # Signs tracking links; derived from Clerk's if unset
+    tracking_flush_seconds: float = 5.0
+
+    # Reply detection: the mailbox replies arrive in (the worker can also read a maildir)
+    reply_imap_host: str | None = None
+    reply_imap_port: int = 993
+    reply_imap_ssl: bool = True
+    reply_imap_username: str | None = None
+    reply_imap_password: str | None = None
+    reply_imap_mailbox: str = "INBOX"
+
+    # Webhooks
+    webhook_batch_size: int = 100  # Events per delivery
+    webhook_concurrency: int = 8  # Endpoints delivered to in parallel per worker
+    webhook_timeout_seconds: float = 10.0
+    webhook_lease_seconds: float = 120.0  # Must outlast a delivery round; then others take over
+    webhook_max_attempts: int = 8  # Then the batch is dead-lettered and skipped
+    webhook_backoff_base_seconds: float = 10.0
+    webhook_backoff_max_seconds: float = 3600.0
+    webhook_allow_private_urls: bool = False  # Local development only: skips the address check
+    outbox_retention_days: int = 7
+
+    # Response compression (brotli and zstd need the `compression` extra)
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024  # Smaller bodies aren't worth the CPU
+    compression_gzip_level: int = 4  # 6 saves ~10% more bytes for ~40% more CPU on JSON lists
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
+
+    # Per-request profiling; off unless a sample rate or token is set
+    profiling_sample_rate: float = 0.0  # Share of requests profiled
+    profiling_token: str | None = None  # Requests sending `X-Profile: <token>` are profiled
+    profiling_dir: str = "/tmp/inboxpilot-profiles"  # Collapsed-stack files go here
+    profiling_interval_ms: float = 2.0
+    profiling_max_seconds: float = 30.0
+
+    # Background jobs
+    job_concurrency: dict[str, int] = {"sequences.bulk_enroll": 2}  # Running at once, per type
+    job_default_concurrency: int = 4
+    job_max_attempts: int = 3
+    job_backoff_base_seconds: float = 30.0
+    job_backoff_max_seconds: float = 3600.0
+    job_heartbeat_timeout_seconds: float = 300.0  # Running jobs silent this long are requeued
 
     # OpenAI
     openai_api_key: str
@@ -29,4 +113,15 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Build settings from the environment on first use."""
+    return Settings()
+
+
+def __getattr__(name: str):
+    # `from app.core.config import settings` keeps working, but only the modules
+    # that actually need settings pay for loading them.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,19 +1,201 @@
+import hashlib
+import hmac
+import threading
+import time
 from collections.abc import Generator
+from functools import lru_cache
+from uuid import UUID
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event, make_url, text
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from .config import get_settings
+
+
+def create_db_engine(url: str) -> Engine:
+    """
+    Create an engine with the pool and timeout settings from config.
+
+    In PgBouncer mode (transaction pooling) session state can't be relied on, so
+    timeouts are applied per transaction with SET LOCAL instead of as startup
+    options, and server-side prepared statements are disabled.
+    """
+    settings = get_settings()
+    connect_args: dict = {}
+    kwargs: dict = {"pool_pre_ping": settings.db_pool_pre_ping}
+
+    if settings.db_null_pool:
+        kwargs["poolclass"] = NullPool
+    else:
+        kwargs.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+
+    timeouts = {
+        "statement_timeout": settings.db_statement_timeout_ms,
+        "lock_timeout": settings.db_lock_timeout_ms,
+    }
+    timeouts = {name: ms for name, ms in timeouts.items() if ms}
+
+    if settings.db_pgbouncer_mode:
+        # psycopg2 never prepares server-side; psycopg 3 does unless told not to
+        if make_url(url).get_driver_name() == "psycopg":
+            connect_args["prepare_threshold"] = None
+    elif timeouts:
+        connect_args["options"] = " ".join(f"-c {name}={ms}" for name, ms in timeouts.items())
+
+    db_engine = create_engine(url, connect_args=connect_args, **kwargs)
+
+    if settings.db_pgbouncer_mode and timeouts:
+
+        @event.listens_for(db_engine, "begin")
+        def set_local_timeouts(conn) -> None:
+            for name, ms in timeouts.items():
+                conn.exec_driver_sql(f"SET LOCAL {name} = {int(ms)}")
+
+    return db_engine
+
+
+def warm_pool(db_engine: Engine, size: int) -> None:
+    """Open `size` connections up front so the first requests don't pay connection setup."""
+    if size <= 0 or isinstance(db_engine.pool, NullPool):
+        return
+
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(db_engine.connect())
+    finally:
+        for conn in connections:
+            conn.close()
 
-from .config import settings
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
+# Engines are created on first use so importing the models (e.g. from a worker or
+# Alembic) doesn't build settings or a connection pool.
+SessionLocal = sessionmaker(autoflush=False, autocommit=False)
+ReplicaSessionLocal = sessionmaker(autoflush=False, autocommit=False)
+
+
+@lru_cache
+def get_engine() -> Engine:
+    """Return the primary engine, creating it on first use."""
+    db_engine = create_db_engine(get_settings().database_url)
+    SessionLocal.configure(bind=db_engine)
+    return db_engine
+
+
+@lru_cache
+def get_replica_engine() -> Engine | None:
+    """Return the read replica engine, or None when DATABASE_REPLICA_URL is unset."""
+    replica_url = get_settings().database_replica_url
+    if not replica_url:
+        return None
+    db_engine = create_db_engine(replica_url)
+    ReplicaSessionLocal.configure(bind=db_engine)
+    return db_engine
+
+
+def get_session() -> Session:
+    """Open a session on the primary."""
+    get_engine()
+    return SessionLocal()
+
+# Replay lag in seconds; 0 when the replica has replayed everything it has received,
+# so an idle primary doesn't make the replica look stale.
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+# Read-your-writes stickiness travels with the client, so it holds whichever
+# worker serves the next read: `<user_id>.<until_ms>.<signature>`
+STICKY_COOKIE = "inboxpilot_primary_until"
+
+_replica_state = {"checked_at": 0.0, "healthy": False}
+_replica_lock = threading.Lock()
+
 
 def get_db() -> Generator[Session, None, None]:
     """Dependency that provides a database session."""
-    db = SessionLocal()
+    db = get_session()
     try:
         yield db
     finally:
         db.close()
+
+
+@lru_cache
+def _sticky_key() -> bytes:
+    return hmac.new(get_settings().clerk_secret_key.encode(), b"replica-sticky", "sha256").digest()
+
+
+def _sign(payload: str) -> str:
+    return hmac.new(_sticky_key(), payload.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def sticky_token(user_id: UUID) -> str:
+    """Signed token pinning a user's reads to the primary for the read-your-writes window."""
+    until_ms = int((time.time() + get_settings().replica_sticky_seconds) * 1000)
+    payload = f"{user_id}.{until_ms}"
+    return f"{payload}.{_sign(payload)}"
+
+
+def _is_sticky(user_id: UUID | None, token: str | None) -> bool:
+    if user_id is None or not token:
+        return False
+    try:
+        token_user_id, until_ms, signature = token.split(".")
+        until = int(until_ms) / 1000
+    except ValueError:
+        return False
+    if token_user_id != str(user_id) or until <= time.time():
+        return False
+    return hmac.compare_digest(signature, _sign(f"{token_user_id}.{until_ms}"))
+
+
+def _replica_is_fresh(replica_engine: Engine) -> bool:
+    """Check replica lag, caching the result for REPLICA_LAG_CHECK_INTERVAL_SECONDS."""
+    settings = get_settings()
+    now = time.monotonic()
+    if now - _replica_state["checked_at"] < settings.replica_lag_check_interval_seconds:
+        return _replica_state["healthy"]
+
+    with _replica_lock:
+        if now - _replica_state["checked_at"] < settings.replica_lag_check_interval_seconds:
+            return _replica_state["healthy"]
+
+        try:
+            with replica_engine.connect() as conn:
+                lag = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+            healthy = lag <= settings.replica_max_lag_seconds
+        except Exception as e:
+            print(f"Replica lag check failed: {e}")
+            healthy = False
+
+        _replica_state["healthy"] = healthy
+        _replica_state["checked_at"] = now
+        return healthy
+
+
+def get_read_session(user_id: UUID | None = None, sticky: str | None = None) -> Session:
+    """
+    Open a session for a read-only request.
+
+    Uses the replica unless none is configured, `sticky` (the client's
+    STICKY_COOKIE) shows the user wrote within the stickiness window, or the
+    replica is lagging beyond REPLICA_MAX_LAG_SECONDS.
+    """
+    replica_engine = get_replica_engine()
+    if (
+        replica_engine is None
+        or _is_sticky(user_id, sticky)
+        or not _replica_is_fresh(replica_engine)
+    ):
+        return get_session()
+    return ReplicaSessionLocal()
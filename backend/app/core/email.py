@@ -1,11 +1,39 @@
+import re
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from email.utils import make_msgid
+from uuid import UUID
 
-from app.core.config import settings
+from app.core.config import get_settings
 
+# Matches the Message-IDs from make_message_id() wherever a reply quotes them
+OUTBOUND_MESSAGE_ID = re.compile(r"<([0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12})\.outbound@", re.I)
 
-def send_email(to_email: str, subject: str, body: str) -> bool:
+
+def make_message_id(outbound_email_id: UUID) -> str:
+    """Message-ID for an outbound email, so replies can be traced back to it."""
+    domain = get_settings().from_email.rpartition("@")[2] or "localhost"
+    return f"<{outbound_email_id}.outbound@{domain}>"
+
+
+def referenced_outbound_emails(*headers: str | None) -> set[UUID]:
+    """IDs of outbound emails quoted in In-Reply-To / References style headers."""
+    return {
+        UUID(match)
+        for header in headers
+        if header
+        for match in OUTBOUND_MESSAGE_ID.findall(str(header))
+    }
+
+
+def send_email(
+    to_email: str,
+    subject: str,
+    body: str,
+    html: str | None = None,
+    message_id: str | None = None,
+) -> bool:
     """
     Send an email using SMTP.
     In development, this sends to MailHog for easy testing.
@@ -14,16 +42,22 @@ def send_email(to_email: str, subject: str, body: str) -> bool:
         to_email: Recipient email address
         subject: Email subject
         body: Email body (plain text)
+        html: Optional HTML alternative of the body
+        message_id: Message-ID header (see make_message_id); generated if omitted
 
     Returns:
         True if email was sent successfully, False otherwise
     """
-    msg = MIMEMultipart()
+    settings = get_settings()
+    msg = MIMEMultipart("alternative" if html else "mixed")
     msg["From"] = settings.from_email
     msg["To"] = to_email
     msg["Subject"] = subject
+    msg["Message-ID"] = message_id or make_msgid()
 
     msg.attach(MIMEText(body, "plain"))
+    if html:
+        msg.attach(MIMEText(html, "html"))
 
     try:
         with smtplib.SMTP(settings.smtp_host, settings.smtp_port) as server:
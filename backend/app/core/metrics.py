@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# In-process counters and timers, exposed at GET /health/metrics.
+# Values are per worker process and reset on restart.
+_lock = threading.Lock()
+_counters: dict[str, float] = defaultdict(float)
+_timings: dict[str, dict[str, float]] = {}
+
+
+def increment(name: str, value: float = 1) -> None:
+    """Add `value` to a counter."""
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, seconds: float) -> None:
+    """Record one duration sample for a timer."""
+    with _lock:
+        timing = _timings.get(name)
+        if timing is None:
+            _timings[name] = {"count": 1, "total_seconds": seconds, "max_seconds": seconds}
+        else:
+            timing["count"] += 1
+            timing["total_seconds"] += seconds
+            timing["max_seconds"] = max(timing["max_seconds"], seconds)
+
+
+@contextmanager
+def timer(name: str) -> Iterator[None]:
+    """Time the enclosed block into the `name` timer."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started)
+
+
+def snapshot() -> dict:
+    """Return a copy of all counters and timers."""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "timings": {name: dict(timing) for name, timing in _timings.items()},
+        }
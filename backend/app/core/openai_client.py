@@ -1,8 +1,18 @@
-from openai import OpenAI
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-from app.core.config import settings
+from app.core.config import get_settings
 
-client = OpenAI(api_key=settings.openai_api_key)
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+
+@lru_cache
+def get_client() -> "OpenAI":
+    """Create the OpenAI client on first use; the SDK is slow to import."""
+    from openai import OpenAI
+
+    return OpenAI(api_key=get_settings().openai_api_key)
 
 
 def rewrite_text(text: str, tone: str = "professional", purpose: str = "cold_outreach") -> str:
@@ -40,7 +50,7 @@ Only return the rewritten text, nothing else.
 Original text:
 {text}"""
 
-    response = client.chat.completions.create(
+    response = get_client().chat.completions.create(
         model="gpt-4o-mini",
         messages=[
             {
@@ -0,0 +1,200 @@
+"""
+Opt-in per-request profiling.
+
+A selected request (a sampled share of traffic, or any request sending
+`X-Profile: <PROFILING_TOKEN>`) gets a sampler thread that reads the event loop
+thread's stack every PROFILING_INTERVAL_MS and keeps the samples taken while
+this request's code is running. Each sample is classified into a phase (auth,
+workspace, db, smtp, openai, serialization or app) by the frames on its stack.
+Per-phase estimates go back in a Server-Timing header, and the full profile is
+written in collapsed-stack format (speedscope, flamegraph.pl; weights are
+microseconds) to PROFILING_DIR.
+
+Work in sync dependencies runs on the threadpool and isn't sampled; it shows up,
+along with time spent awaiting, as the `wait` phase. The middleware is only
+installed when profiling is configured, so it costs nothing when it is off.
+"""
+
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from types import CodeType
+
+from app.core import metrics
+
+HEADER = b"x-profile"
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SECURITY_FILE = os.path.join(BACKEND_ROOT, "app", "core", "security.py")
+DEPS_FILE = os.path.join(BACKEND_ROOT, "app", "api", "deps.py")
+
+# A sample belongs to the first of these phases with a frame on its stack, so auth
+# and workspace resolution include their own DB queries
+PHASES = ("auth", "workspace", "serialization", "smtp", "openai", "db")
+
+
+@lru_cache(maxsize=8192)
+def code_phase(code: CodeType) -> str | None:
+    filename, name = code.co_filename, code.co_name
+    if name == "get_current_user" and filename == SECURITY_FILE:
+        return "auth"
+    if name == "get_current_workspace" and filename == DEPS_FILE:
+        return "workspace"
+    if name in ("serialize_response", "jsonable_encoder"):
+        return "serialization"
+    if filename.endswith(f"{os.sep}smtplib.py"):
+        return "smtp"
+    if f"{os.sep}openai{os.sep}" in filename:
+        return "openai"
+    if f"{os.sep}sqlalchemy{os.sep}" in filename or f"{os.sep}psycopg2{os.sep}" in filename:
+        return "db"
+    return None
+
+
+def phase_of(stack: tuple[CodeType, ...]) -> str:
+    found = {code_phase(code) for code in stack}
+    return next((phase for phase in PHASES if phase in found), "app")
+
+
+def frame_name(code: CodeType) -> str:
+    filename = code.co_filename
+    if filename.startswith(BACKEND_ROOT + os.sep):
+        filename = filename[len(BACKEND_ROOT) + 1 :]
+    elif "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    # ';' separates frames and ' ' precedes the weight in the collapsed format
+    name = f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+    return name.replace(";", ",").replace(" ", "_")
+
+
+class Sampler(threading.Thread):
+    """Samples one thread's stack, keeping only samples taken inside `marker`'s frame."""
+
+    def __init__(self, thread_id: int, marker, interval: float, max_seconds: float, path: str):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.marker = marker
+        self.interval = interval
+        self.deadline = time.monotonic() + max_seconds
+        self.path = path
+        self.samples: Counter = Counter()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.started_at = time.perf_counter()
+        self.finished_at: float | None = None
+
+    def run(self) -> None:
+        # Each sample is weighted by the time since the previous one: while the
+        # request holds the GIL, samples arrive late rather than every `interval`
+        last = time.perf_counter()
+        while not self.stopped.wait(self.interval) and time.monotonic() < self.deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            stack = []
+            while frame is not None and frame is not self.marker:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if frame is not None:
+                with self.lock:
+                    self.samples[tuple(reversed(stack))] += elapsed
+        self.write()
+
+    def stop(self) -> None:
+        self.finished_at = time.perf_counter()
+        self.stopped.set()
+
+    def phases(self) -> dict[str, float]:
+        """Estimated milliseconds per phase so far, plus `wait` and `total`."""
+        with self.lock:
+            samples = list(self.samples.items())
+        phases: Counter = Counter()
+        for stack, seconds in samples:
+            phases[phase_of(stack)] += seconds * 1000
+        total = ((self.finished_at or time.perf_counter()) - self.started_at) * 1000
+        phases["wait"] = max(total - sum(phases.values()), 0.0)
+        phases["total"] = total
+        return dict(phases)
+
+    def write(self) -> None:
+        try:
+            with self.lock:
+                samples = list(self.samples.items())
+            with open(self.path, "w") as f:
+                for stack, seconds in samples:
+                    frames = [phase_of(stack), *(frame_name(code) for code in stack)]
+                    f.write(f"{';'.join(frames)} {round(seconds * 1_000_000)}\n")
+        except OSError as e:
+            print(f"Failed to write profile {self.path}: {e}")
+
+
+def server_timing(phases: dict[str, float]) -> bytes:
+    return ", ".join(
+        f"{phase};dur={ms:.1f}" for phase, ms in phases.items() if ms or phase == "total"
+    ).encode()
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app,
+        directory: str,
+        sample_rate: float = 0.0,
+        token: str | None = None,
+        interval_ms: float = 2.0,
+        max_seconds: float = 30.0,
+    ):
+        self.app = app
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.token = token.encode() if token else None
+        self.interval = interval_ms / 1000
+        self.max_seconds = max_seconds
+        os.makedirs(directory, exist_ok=True)
+
+    def selected(self, scope) -> bool:
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == HEADER:
+                    return secrets.compare_digest(value, self.token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self.selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = secrets.token_hex(6)
+        route = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        path = os.path.join(
+            self.directory,
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{route}-{profile_id}.collapsed",
+        )
+        sampler = Sampler(
+            threading.get_ident(), sys._getframe(), self.interval, self.max_seconds, path
+        )
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(sampler.phases())))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            sampler.stop()
+            phases = sampler.phases()
+            for phase, ms in phases.items():
+                metrics.observe(f"profile.{phase}", ms / 1000)
+            summary = ", ".join(f"{phase}={ms:.0f}ms" for phase, ms in phases.items())
+            print(f"Profiled {scope['method']} {scope['path']}: {summary} -> {path}")
@@ -0,0 +1,191 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Protocol
+
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.core.db import get_session
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class Limit:
+    """Token bucket of `burst` tokens refilled at `rate` tokens per second."""
+
+    rate: float
+    burst: float
+
+    @classmethod
+    def parse(cls, spec: str) -> "Limit":
+        """Parse '<count>/<second|minute|hour|day>', e.g. '20/minute'."""
+        count, _, period = spec.partition("/")
+        if period not in PERIODS:
+            raise ValueError(f"Invalid rate limit: {spec}")
+        return cls(rate=int(count) / PERIODS[period], burst=float(count))
+
+
+class RateLimitBackend(Protocol):
+    def consume(self, buckets: list[tuple[str, Limit]], cost: float = 1) -> list[float]:
+        """
+        Take `cost` tokens from every bucket, or from none of them. Returns the
+        seconds each bucket needs until it has enough tokens, all 0 if allowed.
+        """
+        ...
+
+
+class LocalBackend:
+    """Per-process buckets. Limits are per worker; use for tests and single-worker runs."""
+
+    # Beyond this many buckets the least recently used ones are dropped
+    MAX_BUCKETS = 100_000
+
+    def __init__(self, max_buckets: int = MAX_BUCKETS) -> None:
+        # key -> (tokens, updated, time the bucket is full again), least recently used first
+        self._buckets: OrderedDict[str, tuple[float, float, float]] = OrderedDict()
+        self._max_buckets = max_buckets
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def consume(self, buckets: list[tuple[str, Limit]], cost: float = 1) -> list[float]:
+        now = time.monotonic()
+        with self._lock:
+            available = []
+            for key, limit in buckets:
+                tokens, updated, _ = self._buckets.get(key, (limit.burst, now, now))
+                available.append(min(limit.burst, tokens + (now - updated) * limit.rate))
+
+            allowed = all(tokens >= cost for tokens in available)
+            for (key, limit), tokens in zip(buckets, available):
+                if allowed:
+                    tokens -= cost
+                self._buckets[key] = (tokens, now, now + (limit.burst - tokens) / limit.rate)
+                self._buckets.move_to_end(key)
+            self._evict(now)
+
+        if allowed:
+            return [0.0] * len(buckets)
+        return [
+            max(cost - tokens, 0.0) / limit.rate
+            for (_, limit), tokens in zip(buckets, available)
+        ]
+
+    def _evict(self, now: float) -> None:
+        # A bucket that has refilled is the same as a missing one, so idle buckets go
+        # once they are full; the size cap bounds memory under a burst of new keys
+        while self._buckets:
+            key, (_, _, full_at) = next(iter(self._buckets.items()))
+            if full_at > now and len(self._buckets) <= self._max_buckets:
+                break
+            del self._buckets[key]
+
+
+# Buckets that don't exist yet start full
+CREATE_SQL = text(
+    """
+    INSERT INTO rate_limit_buckets (key, tokens, updated_at)
+    SELECT key, burst, clock_timestamp()
+    FROM unnest(CAST(:keys AS text[]), CAST(:bursts AS float8[])) AS r(key, burst)
+    ON CONFLICT (key) DO NOTHING
+    """
+)
+
+# Locked in key order so concurrent requests sharing a bucket can't deadlock
+AVAILABLE_SQL = text(
+    """
+    SELECT b.key,
+           LEAST(r.burst, b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * r.rate)
+    FROM rate_limit_buckets b
+    JOIN unnest(CAST(:keys AS text[]), CAST(:rates AS float8[]), CAST(:bursts AS float8[]))
+        AS r(key, rate, burst) ON r.key = b.key
+    ORDER BY b.key
+    FOR UPDATE OF b
+    """
+)
+
+TAKE_SQL = text(
+    """
+    UPDATE rate_limit_buckets b
+    SET tokens = r.tokens - :cost, updated_at = clock_timestamp()
+    FROM unnest(CAST(:keys AS text[]), CAST(:tokens AS float8[])) AS r(key, tokens)
+    WHERE b.key = r.key
+    """
+)
+
+
+class PostgresBackend:
+    """Buckets in an unlogged Postgres table, shared by every worker and node."""
+
+    def consume(self, buckets: list[tuple[str, Limit]], cost: float = 1) -> list[float]:
+        keys = [key for key, _ in buckets]
+        params = {
+            "keys": keys,
+            "rates": [limit.rate for _, limit in buckets],
+            "bursts": [limit.burst for _, limit in buckets],
+        }
+        db = get_session()
+        try:
+            db.execute(CREATE_SQL, params)
+            available = {key: float(tokens) for key, tokens in db.execute(AVAILABLE_SQL, params)}
+            tokens = [available[key] for key in keys]
+            allowed = all(value >= cost for value in tokens)
+            if allowed:
+                db.execute(TAKE_SQL, {"keys": keys, "tokens": tokens, "cost": cost})
+            db.commit()
+        finally:
+            db.close()
+
+        if allowed:
+            return [0.0] * len(buckets)
+        return [
+            max(cost - value, 0.0) / limit.rate for (_, limit), value in zip(buckets, tokens)
+        ]
+
+
+BACKENDS = {"local": LocalBackend, "postgres": PostgresBackend}
+
+
+@lru_cache
+def get_backend() -> RateLimitBackend:
+    """The configured backend (RATE_LIMIT_BACKEND), created on first use."""
+    return BACKENDS[get_settings().rate_limit_backend]()
+
+
+@lru_cache
+def get_limits(scope: str) -> dict[str, Limit]:
+    """Parsed limits per route group for 'user' or 'workspace' keys."""
+    settings = get_settings()
+    specs = settings.user_rate_limits if scope == "user" else settings.workspace_rate_limits
+    return {group: Limit.parse(spec) for group, spec in specs.items()}
+
+
+def check_all(group: str, keys: list[tuple[str, str]]) -> tuple[str, int] | None:
+    """
+    Consume one request from each (scope, key) bucket of a route group, but only
+    if every bucket allows it. Returns None if allowed, else the scope that waits
+    longest and its Retry-After seconds.
+    """
+    buckets = []
+    for scope, key in keys:
+        limit = get_limits(scope).get(group)
+        if limit is not None:
+            buckets.append((scope, f"{group}:{scope}:{key}", limit))
+    if not buckets:
+        return None
+
+    waits = get_backend().consume([(key, limit) for _, key, limit in buckets])
+    wait, scope = max(zip(waits, (scope for scope, _, _ in buckets)))
+    return (scope, math.ceil(wait)) if wait > 0 else None
+
+
+def check(group: str, scope: str, key: str) -> int:
+    """Consume one request for `key`. Returns 0 if allowed, else Retry-After seconds."""
+    rejected = check_all(group, [(scope, key)])
+    return rejected[1] if rejected else 0
@@ -1,10 +1,9 @@
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from clerk_backend_api import Clerk, authenticate_request, AuthenticateRequestOptions
 from sqlalchemy.orm import Session
 
 from app import models
-from app.core.config import settings
+from app.core.config import get_settings
 from app.core.db import get_db
 
 auth_scheme = HTTPBearer()
@@ -19,6 +18,11 @@ async def get_current_user(
     Validate Clerk JWT and return the current user.
     Creates the user in the local database if they don't exist.
     """
+    # Imported here so the Clerk SDK is loaded on the first authenticated request,
+    # not when the app is imported
+    from clerk_backend_api import Clerk, authenticate_request, AuthenticateRequestOptions
+
+    settings = get_settings()
     try:
         result = authenticate_request(
             request,
@@ -94,5 +98,10 @@ async def get_current_user(
         db.add(user)
         db.commit()
         db.refresh(user)
+        # Even on a GET, the new user row only exists on the primary so far
+        request.state.wrote = True
+
+    # Lets the write-tracking middleware pin this user's reads to the primary
+    request.state.user_id = user.id
 
     return user
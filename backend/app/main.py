@@ -1,26 +1,41 @@
+import math
 import os
+from datetime import timedelta
+from functools import lru_cache
 
-from opentelemetry import trace
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.resources import SERVICE_NAME, Resource
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
-from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
-
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.core.config import settings
-from app.core.db import engine
+from app.core.compression import CompressionMiddleware
+from app.core.config import get_settings
+from app.core.profiling import ProfilingMiddleware
+from app.core.db import (
+    STICKY_COOKIE,
+    get_engine,
+    get_replica_engine,
+    get_session,
+    sticky_token,
+    warm_pool,
+)
+from app.services import idempotency
+from app.services.tracking import tracking_buffer
 
 
-def setup_telemetry() -> None:
+def setup_telemetry(app: FastAPI) -> None:
     """Configure OpenTelemetry if OTEL_EXPORTER_OTLP_ENDPOINT is set."""
     if not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
         return
 
+    # Imported here so the exporter stack is only loaded when telemetry is enabled
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
     resource = Resource.create(attributes={
         SERVICE_NAME: os.getenv("OTEL_SERVICE_NAME", "inboxpilot-api")
     })
@@ -31,7 +46,11 @@ def setup_telemetry() -> None:
     trace.set_tracer_provider(provider)
 
     HTTPXClientInstrumentor().instrument()
-    SQLAlchemyInstrumentor().instrument(engine=engine)
+    SQLAlchemyInstrumentor().instrument(engine=get_engine())
+    replica_engine = get_replica_engine()
+    if replica_engine is not None:
+        SQLAlchemyInstrumentor().instrument(engine=replica_engine)
+    FastAPIInstrumentor.instrument_app(app)
 
 
 from app.api import (
@@ -40,36 +59,191 @@ from app.api import (
     routes_contacts,
     routes_emails,
     routes_health,
+    routes_jobs,
     routes_me,
     routes_sequences,
+    routes_suppressions,
+    routes_tracking,
+    routes_webhooks,
     routes_workspaces,
 )
 
-app = FastAPI(
-    title="InboxPilot API",
-    description="Lightweight outbound email CRM with AI-assisted copy",
-    version="0.1.0",
-)
+def warm_db_pools() -> None:
+    """Pre-open pooled connections (DB_POOL_WARMUP) before taking traffic."""
+    warmup = get_settings().db_pool_warmup
+    warm_pool(get_engine(), warmup)
+    replica_engine = get_replica_engine()
+    if replica_engine is not None:
+        warm_pool(replica_engine, warmup)
+
+
+def start_tracking_buffer() -> None:
+    tracking_buffer.start()
+
+
+def flush_tracking_buffer() -> None:
+    """Write buffered open/click counts before the process exits."""
+    tracking_buffer.stop()
+
+
+async def track_writes(request: Request, call_next):
+    """
+    Pin a user's reads to the primary for a short window after any write request.
+    The window is a signed cookie, so it holds whichever worker serves the next read.
+    """
+    response = await call_next(request)
+    user_id = getattr(request.state, "user_id", None)
+    wrote = request.method not in ("GET", "HEAD", "OPTIONS") or getattr(
+        request.state, "wrote", False
+    )
+    if user_id is not None and wrote:
+        response.set_cookie(
+            STICKY_COOKIE,
+            sticky_token(user_id),
+            max_age=math.ceil(get_settings().replica_sticky_seconds),
+            httponly=True,
+            secure=request.url.scheme == "https",
+            samesite="lax",
+        )
+    return response
+
+
+async def store_idempotent_responses(request: Request, call_next):
+    """Store the response of requests that claimed an Idempotency-Key so retries can replay it."""
+    try:
+        response = await call_next(request)
+    except Exception:
+        claim = getattr(request.state, "idempotency_claim", None)
+        if claim is not None:
+            db = get_session()
+            try:
+                idempotency.release(db, *claim)
+            finally:
+                db.close()
+        raise
+
+    claim = getattr(request.state, "idempotency_claim", None)
+    if claim is None:
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    db = get_session()
+    try:
+        # A 429 from the rate limiter is not the outcome of the request; let a retry run it
+        if response.status_code >= 500 or response.status_code == 429:
+            idempotency.release(db, *claim)
+        else:
+            idempotency.complete(
+                db,
+                *claim,
+                response.status_code,
+                body.decode("utf-8"),
+                timedelta(hours=get_settings().idempotency_ttl_hours),
+            )
+    finally:
+        db.close()
+
+    return Response(
+        content=body,
+        status_code=response.status_code,
+        headers=dict(response.headers),
+        media_type=response.media_type,
+    )
+
+
+async def replay_idempotent_response(
+    request: Request, exc: idempotency.IdempotentReplay
+) -> Response:
+    """Return the stored response for a retried Idempotency-Key."""
+    return Response(
+        content=exc.body or b"",
+        status_code=exc.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def create_app() -> FastAPI:
+    """
+    Build the API. Middleware depends on settings, so they are only loaded here
+    and `import app.main` stays cheap.
+    """
+    settings = get_settings()
+    app = FastAPI(
+        title="InboxPilot API",
+        description="Lightweight outbound email CRM with AI-assisted copy",
+        version="0.1.0",
+    )
+
+    # Only installed when configured, so there is no overhead otherwise. Added first so
+    # it is innermost and runs in the same task as the endpoint it samples.
+    if settings.profiling_sample_rate > 0 or settings.profiling_token:
+        app.add_middleware(
+            ProfilingMiddleware,
+            directory=settings.profiling_dir,
+            sample_rate=settings.profiling_sample_rate,
+            token=settings.profiling_token,
+            interval_ms=settings.profiling_interval_ms,
+            max_seconds=settings.profiling_max_seconds,
+        )
+
+    # CORS middleware - configure via CORS_ORIGINS env var
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["ETag", "Idempotent-Replayed", "Server-Timing", "X-Profile-Id"],
+    )
+
+    app.router.add_event_handler("startup", warm_db_pools)
+    app.router.add_event_handler("startup", start_tracking_buffer)
+    app.router.add_event_handler("shutdown", flush_tracking_buffer)
+
+    app.middleware("http")(track_writes)
+    app.middleware("http")(store_idempotent_responses)
+
+    # Added last so it is outermost: idempotency stores and replays uncompressed bodies
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+            levels={
+                "gzip": settings.compression_gzip_level,
+                "br": settings.compression_brotli_quality,
+                "zstd": settings.compression_zstd_level,
+            },
+        )
+
+    app.add_exception_handler(idempotency.IdempotentReplay, replay_idempotent_response)
+
+    # Include routers
+    app.include_router(routes_health.router, prefix="/health", tags=["health"])
+    app.include_router(routes_me.router, prefix="/me", tags=["me"])
+    app.include_router(routes_workspaces.router, prefix="/workspaces", tags=["workspaces"])
+    app.include_router(routes_contacts.router, prefix="/contacts", tags=["contacts"])
+    app.include_router(routes_sequences.router, prefix="/sequences", tags=["sequences"])
+    app.include_router(routes_emails.router, prefix="/emails", tags=["emails"])
+    app.include_router(routes_ai.router, prefix="/ai", tags=["ai"])
+    app.include_router(routes_activity.router, prefix="/activity", tags=["activity"])
+    app.include_router(routes_suppressions.router, prefix="/suppressions", tags=["suppressions"])
+    app.include_router(routes_webhooks.router, prefix="/webhooks", tags=["webhooks"])
+    app.include_router(routes_jobs.router, prefix="/jobs", tags=["jobs"])
+    app.include_router(routes_tracking.router, prefix="/t", tags=["tracking"])
+
+    # Setup OpenTelemetry (only if OTEL_EXPORTER_OTLP_ENDPOINT is set)
+    setup_telemetry(app)
+    return app
+
+
+@lru_cache
+def get_app() -> FastAPI:
+    return create_app()
 
-# CORS middleware - configure via CORS_ORIGINS env var
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# Include routers
-app.include_router(routes_health.router, prefix="/health", tags=["health"])
-app.include_router(routes_me.router, prefix="/me", tags=["me"])
-app.include_router(routes_workspaces.router, prefix="/workspaces", tags=["workspaces"])
-app.include_router(routes_contacts.router, prefix="/contacts", tags=["contacts"])
-app.include_router(routes_sequences.router, prefix="/sequences", tags=["sequences"])
-app.include_router(routes_emails.router, prefix="/emails", tags=["emails"])
-app.include_router(routes_ai.router, prefix="/ai", tags=["ai"])
-app.include_router(routes_activity.router, prefix="/activity", tags=["activity"])
-
-# Setup OpenTelemetry (only if OTEL_EXPORTER_OTLP_ENDPOINT is set)
-setup_telemetry()
-FastAPIInstrumentor.instrument_app(app)
+def __getattr__(name: str):
+    # `uvicorn app.main:app` looks `app` up by attribute, so it is built on first use
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,23 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime, time
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
+    Date,
     DateTime,
+    Float,
     ForeignKey,
+    Identity,
     Index,
     Integer,
     String,
     Text,
+    Time,
     UniqueConstraint,
+    text,
 )
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -49,6 +55,11 @@ class Workspace(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     name: Mapped[str] = mapped_column(String, nullable=False)
+    # Sequence steps are sent inside this window, in the workspace's timezone
+    timezone: Mapped[str] = mapped_column(String, nullable=False, default="UTC")
+    send_window_start: Mapped[time] = mapped_column(Time, nullable=False, default=time(9))
+    send_window_end: Mapped[time] = mapped_column(Time, nullable=False, default=time(17))
+    send_on_weekends: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -111,18 +122,28 @@ class Contact(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     # Relationships
     workspace: Mapped["Workspace"] = relationship(back_populates="contacts")
+    # passive_deletes: the FKs cascade in Postgres, so deleting a contact doesn't load its children
     enrollments: Mapped[list["SequenceEnrollment"]] = relationship(
-        back_populates="contact", cascade="all, delete-orphan"
+        back_populates="contact", cascade="all, delete-orphan", passive_deletes=True
     )
     outbound_emails: Mapped[list["OutboundEmail"]] = relationship(
-        back_populates="contact", cascade="all, delete-orphan"
+        back_populates="contact", cascade="all, delete-orphan", passive_deletes=True
     )
 
     __table_args__ = (
         UniqueConstraint("workspace_id", "email", name="contacts_workspace_email_idx"),
+        Index("contacts_workspace_email_lower_idx", "workspace_id", text("lower(email)")),
+        Index(
+            "contacts_workspace_suppressed_idx",
+            "workspace_id",
+            postgresql_where=text("status <> 'active'"),
+        ),
     )
 
 
@@ -140,19 +161,31 @@ class Sequence(Base):
     name: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[str | None] = mapped_column(Text)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1
+    )  # Bumped on any change to the sequence or its steps
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     # Relationships
     workspace: Mapped["Workspace"] = relationship(back_populates="sequences")
+    # passive_deletes: children are cascaded / SET NULL by the FKs, not loaded by the ORM
     steps: Mapped[list["SequenceStep"]] = relationship(
-        back_populates="sequence", cascade="all, delete-orphan", order_by="SequenceStep.step_order"
+        back_populates="sequence",
+        cascade="all, delete-orphan",
+        order_by="SequenceStep.step_order",
+        passive_deletes=True,
     )
     enrollments: Mapped[list["SequenceEnrollment"]] = relationship(
-        back_populates="sequence", cascade="all, delete-orphan"
+        back_populates="sequence", cascade="all, delete-orphan", passive_deletes=True
+    )
+    outbound_emails: Mapped[list["OutboundEmail"]] = relationship(
+        back_populates="sequence", passive_deletes=True
     )
-    outbound_emails: Mapped[list["OutboundEmail"]] = relationship(back_populates="sequence")
 
 
 class SequenceStep(Base):
@@ -170,13 +203,25 @@ class SequenceStep(Base):
     subject_template: Mapped[str] = mapped_column(Text, nullable=False)
     body_template: Mapped[str] = mapped_column(Text, nullable=False)
     delay_days: Mapped[int] = mapped_column(Integer, default=0)  # Delay from previous step
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     # Relationships
     sequence: Mapped["Sequence"] = relationship(back_populates="steps")
-    outbound_emails: Mapped[list["OutboundEmail"]] = relationship(back_populates="step")
+    outbound_emails: Mapped[list["OutboundEmail"]] = relationship(
+        back_populates="step", passive_deletes=True
+    )
 
     __table_args__ = (
-        UniqueConstraint("sequence_id", "step_order", name="sequence_steps_order_idx"),
+        # Deferrable so a single UPDATE can permute step orders; checked at statement end
+        UniqueConstraint(
+            "sequence_id",
+            "step_order",
+            name="sequence_steps_order_idx",
+            deferrable=True,
+            initially="IMMEDIATE",
+        ),
     )
 
 
@@ -200,6 +245,8 @@ class SequenceEnrollment(Base):
     last_step_sent: Mapped[int | None] = mapped_column(Integer)
     last_sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     next_scheduled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # Consecutive failed sends of the next step
+    failed_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -210,6 +257,12 @@ class SequenceEnrollment(Base):
 
     __table_args__ = (
         UniqueConstraint("sequence_id", "contact_id", name="sequence_enrollments_unique_idx"),
+        Index("sequence_enrollments_contact_created_idx", "contact_id", "created_at", "id"),
+        Index(
+            "sequence_enrollments_due_idx",
+            "next_scheduled_at",
+            postgresql_where=text("status = 'active'"),
+        ),
     )
 
 
@@ -248,6 +301,39 @@ class OutboundEmail(Base):
     sequence: Mapped["Sequence | None"] = relationship(back_populates="outbound_emails")
     step: Mapped["SequenceStep | None"] = relationship(back_populates="outbound_emails")
 
+    __table_args__ = (
+        Index("outbound_emails_workspace_created_idx", "workspace_id", "created_at", "id"),
+        Index("outbound_emails_contact_created_idx", "contact_id", "created_at", "id"),
+        Index(
+            "outbound_emails_sequence_created_idx",
+            "sequence_id",
+            "created_at",
+            "id",
+            postgresql_where=text("sequence_id IS NOT NULL"),
+        ),
+        Index(
+            "outbound_emails_step_created_idx",
+            "step_id",
+            "created_at",
+            "id",
+            postgresql_where=text("step_id IS NOT NULL"),
+        ),
+        Index(
+            "outbound_emails_workspace_failed_idx",
+            "workspace_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'failed'"),
+        ),
+        Index(
+            "outbound_emails_workspace_queued_idx",
+            "workspace_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'queued'"),
+        ),
+    )
+
 
 class ActivityLog(Base):
     """Audit/event log."""
@@ -277,4 +363,304 @@ class ActivityLog(Base):
 
     __table_args__ = (
         Index("activity_log_workspace_created_idx", "workspace_id", "created_at"),
+        Index(
+            "activity_log_contact_created_idx",
+            text("(payload->>'contact_id')"),
+            "created_at",
+            "id",
+            postgresql_where=text("payload ? 'contact_id'"),
+        ),
+    )
+
+
+class WorkspaceCounter(Base):
+    """Incrementally maintained dashboard counter, reconciled periodically."""
+
+    __tablename__ = "workspace_counters"
+
+    workspace_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("workspaces.id", ondelete="CASCADE"), primary_key=True
+    )
+    metric: Mapped[str] = mapped_column(
+        String, primary_key=True
+    )  # 'contacts_by_status' | 'active_enrollments' | 'emails_sent' | 'emails_failed'
+    dimension: Mapped[str] = mapped_column(
+        String, primary_key=True
+    )  # Contact status, sequence ID, or ISO day for email metrics
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class SequenceDailyStat(Base):
+    """Daily funnel rollup per sequence step; step_id is NULL for sequence-level events."""
+
+    __tablename__ = "sequence_daily_stats"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    sequence_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("sequences.id", ondelete="CASCADE"), nullable=False
+    )
+    step_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("sequence_steps.id", ondelete="CASCADE")
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    enrolled: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sent: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    stopped: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Unique opens and clicks, counted on the day of the first one
+    opened: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    clicked: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "sequence_id",
+            "step_id",
+            "day",
+            name="sequence_daily_stats_key_idx",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+
+class Suppression(Base):
+    """Address that must never be emailed; workspace_id is NULL for global suppressions."""
+
+    __tablename__ = "suppressions"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    workspace_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("workspaces.id", ondelete="CASCADE")
+    )
+    email: Mapped[str] = mapped_column(String, nullable=False)  # Stored lowercased
+    reason: Mapped[str] = mapped_column(
+        String, nullable=False, default="manual"
+    )  # 'bounced' | 'unsubscribed' | 'complaint' | 'manual'
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "workspace_id",
+            "email",
+            name="suppressions_workspace_email_idx",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+
+class IdempotencyKey(Base):
+    """Stored result of a request made with an Idempotency-Key header."""
+
+    __tablename__ = "idempotency_keys"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[str] = mapped_column(
+        String, nullable=False, default="in_progress"
+    )  # 'in_progress' | 'completed'
+    response_status: Mapped[int | None] = mapped_column(Integer)
+    response_body: Mapped[str | None] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    # In-progress claims past this are taken over; their request died without releasing
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (Index("idempotency_keys_expires_idx", "expires_at"),)
+
+
+class RateLimitBucket(Base):
+    """Token bucket shared across API workers (RATE_LIMIT_BACKEND=postgres)."""
+
+    __tablename__ = "rate_limit_buckets"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)  # '<group>:<scope>:<id>'
+    tokens: Mapped[float] = mapped_column(Float, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    # Losing buckets on a crash only resets limits, so skip the WAL
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+
+class DispatcherWorker(Base):
+    """Heartbeat of a running sequence dispatcher; used to size and reclaim shard leases."""
+
+    __tablename__ = "dispatcher_workers"
+
+    worker_id: Mapped[str] = mapped_column(String, primary_key=True)
+    backend_pid: Mapped[int] = mapped_column(Integer, nullable=False)  # Holds the lease locks
+    # pg_stat_activity.backend_start of that backend, so a reused PID isn't mistaken for it
+    backend_start: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    shard_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class EmailEngagement(Base):
+    """Open and click counts of an outbound email, written in batches by the tracking buffer."""
+
+    __tablename__ = "email_engagement"
+
+    outbound_email_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("outbound_emails.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    opens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    clicks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    first_opened_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    first_clicked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_event_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class MailboxCursor(Base):
+    """How far the reply worker has read a mailbox, so it never rescans old messages."""
+
+    __tablename__ = "mailbox_cursors"
+
+    source: Mapped[str] = mapped_column(String, primary_key=True)  # 'imap://user@host/INBOX'
+    uidvalidity: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    last_uid: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class OutboxEvent(Base):
+    """
+    Event for webhook subscribers, written in the same transaction as the change.
+
+    Delivery reads in (txid, id) order and only up to the oldest running
+    transaction, so an event can't commit behind a subscriber's cursor.
+    """
+
+    __tablename__ = "outbox_events"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    event_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    workspace_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("workspaces.id", ondelete="CASCADE"), nullable=False
+    )
+    type: Mapped[str] = mapped_column(String, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    txid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("pg_current_xact_id()::text::bigint")
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    __table_args__ = (Index("outbox_events_workspace_cursor_idx", "workspace_id", "txid", "id"),)
+
+
+class WebhookSubscription(Base):
+    """An integrator's endpoint and how far its event stream has been delivered."""
+
+    __tablename__ = "webhook_subscriptions"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    workspace_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("workspaces.id", ondelete="CASCADE"), nullable=False
+    )
+    url: Mapped[str] = mapped_column(String, nullable=False)
+    secret: Mapped[str] = mapped_column(String, nullable=False)  # Signs deliveries
+    event_types: Mapped[list[str] | None] = mapped_column(ARRAY(String))  # NULL = all
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    # Delivered up to and including this (txid, id)
+    cursor_txid: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    cursor_event_id: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_error: Mapped[str | None] = mapped_column(Text)
+    last_delivered_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # Set while a delivery worker has a batch in flight to this endpoint
+    leased_by: Mapped[str | None] = mapped_column(String)
+    leased_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+
+class WebhookDeadLetter(Base):
+    """A batch given up on after webhook_max_attempts; replay it from first_event_id."""
+
+    __tablename__ = "webhook_dead_letters"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    subscription_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("webhook_subscriptions.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    first_event_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    last_event_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    event_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    error: Mapped[str | None] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    __table_args__ = (Index("webhook_dead_letters_subscription_idx", "subscription_id"),)
+
+
+class Job(Base):
+    """A background job; claimed and run by app.workers.jobs."""
+
+    __tablename__ = "jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    workspace_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("workspaces.id", ondelete="CASCADE"), nullable=False
+    )
+    user_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL")
+    )
+    type: Mapped[str] = mapped_column(String, nullable=False)
+    params: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    status: Mapped[str] = mapped_column(
+        String, nullable=False, default="queued"
+    )  # 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled'
+    progress_done: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    progress_total: Mapped[int | None] = mapped_column(Integer)
+    result: Mapped[dict | None] = mapped_column(JSONB)
+    error: Mapped[str | None] = mapped_column(Text)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    run_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )  # Not claimed before this; pushed back between retries
+    locked_by: Mapped[str | None] = mapped_column(String)  # Worker running it
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    __table_args__ = (
+        Index("jobs_due_idx", "run_at", postgresql_where=text("status = 'queued'")),
+        Index("jobs_running_idx", "type", postgresql_where=text("status = 'running'")),
+        Index("jobs_workspace_created_idx", "workspace_id", "created_at"),
     )
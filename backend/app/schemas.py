@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime, time
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 
 # ============ User Schemas ============
@@ -34,10 +34,18 @@ class WorkspaceCreate(WorkspaceBase):
 
 class WorkspaceUpdate(BaseModel):
     name: str | None = None
+    timezone: str | None = None
+    send_window_start: time | None = None
+    send_window_end: time | None = None
+    send_on_weekends: bool | None = None
 
 
 class WorkspaceResponse(WorkspaceBase):
     id: UUID
+    timezone: str
+    send_window_start: time
+    send_window_end: time
+    send_on_weekends: bool
     created_at: datetime
 
     class Config:
@@ -48,6 +56,28 @@ class WorkspaceWithRole(WorkspaceResponse):
     role: str
 
 
+class WorkspaceStatsResponse(BaseModel):
+    contacts_total: int
+    contacts_by_status: dict[str, int]
+    active_enrollments: int
+    active_enrollments_by_sequence: dict[UUID, int]
+    emails_sent_today: int
+    emails_failed_today: int
+
+
+class SendForecastBucket(BaseModel):
+    minute: datetime
+    sends: int
+
+
+class SendForecastResponse(BaseModel):
+    start: datetime
+    end: datetime
+    total: int
+    peak_per_minute: int
+    buckets: list[SendForecastBucket]  # Minutes with no sends are omitted
+
+
 # ============ Contact Schemas ============
 class ContactBase(BaseModel):
     email: EmailStr
@@ -70,6 +100,12 @@ class ContactUpdate(BaseModel):
     status: str | None = None
 
 
+class ContactBulkDelete(BaseModel):
+    ids: list[UUID] | None = None
+    status: str | None = None
+    search: str | None = None
+
+
 class ContactResponse(ContactBase):
     id: UUID
     workspace_id: UUID
@@ -99,6 +135,10 @@ class SequenceStepUpdate(BaseModel):
     delay_days: int | None = None
 
 
+class SequenceStepOrder(BaseModel):
+    step_ids: list[UUID]  # Every step of the sequence, in the new order
+
+
 class SequenceStepResponse(SequenceStepBase):
     id: UUID
     sequence_id: UUID
@@ -123,6 +163,15 @@ class SequenceUpdate(BaseModel):
     is_active: bool | None = None
 
 
+class SequenceClone(BaseModel):
+    name: str | None = None  # Defaults to "<name> (copy)"
+
+
+class SequenceBulkDelete(BaseModel):
+    ids: list[UUID] | None = None
+    is_active: bool | None = None
+
+
 class SequenceResponse(SequenceBase):
     id: UUID
     workspace_id: UUID
@@ -157,6 +206,39 @@ class EnrollmentResponse(BaseModel):
         from_attributes = True
 
 
+# ============ Sequence Analytics Schemas ============
+class SequenceAnalyticsTotals(BaseModel):
+    enrolled: int
+    sent: int
+    failed: int
+    completed: int
+    stopped: int
+    opened: int
+    clicked: int
+
+
+class SequenceStepAnalytics(BaseModel):
+    step_id: UUID
+    sent: int
+    failed: int
+    opened: int
+    clicked: int
+
+
+class SequenceAnalyticsDay(SequenceAnalyticsTotals):
+    day: date
+    step_id: UUID | None
+
+
+class SequenceAnalyticsResponse(BaseModel):
+    sequence_id: UUID
+    start: date
+    end: date
+    totals: SequenceAnalyticsTotals
+    by_step: list[SequenceStepAnalytics]
+    daily: list[SequenceAnalyticsDay]
+
+
 # ============ Email Schemas ============
 class SendTestEmailRequest(BaseModel):
     contact_email: EmailStr
@@ -182,8 +264,23 @@ class OutboundEmailResponse(BaseModel):
         from_attributes = True
 
 
+class OutboundEmailPage(BaseModel):
+    items: list[OutboundEmailResponse]
+    next_cursor: str | None  # pass as ?cursor= for the next page; None on the last page
+
+
+class EmailEngagementResponse(BaseModel):
+    outbound_email_id: UUID
+    opens: int
+    clicks: int
+    first_opened_at: datetime | None
+    first_clicked_at: datetime | None
+    last_event_at: datetime | None
+
+
 # ============ AI Schemas ============
 class RewriteRequest(BaseModel):
+    workspace_id: UUID  # Rate limited per workspace as well as per user
     text: str
     tone: str = "professional"  # 'friendly' | 'professional' | 'punchy'
     purpose: str = "cold_outreach"  # 'cold_outreach' | 'follow_up'
@@ -193,6 +290,23 @@ class RewriteResponse(BaseModel):
     rewritten: str
 
 
+# ============ Timeline Schemas ============
+class TimelineEvent(BaseModel):
+    kind: str  # 'email' | 'enrollment' | 'activity'
+    id: UUID
+    type: str  # email status, enrollment status or activity type
+    occurred_at: datetime
+    data: dict
+
+    class Config:
+        from_attributes = True
+
+
+class TimelinePage(BaseModel):
+    items: list[TimelineEvent]
+    next_cursor: str | None
+
+
 # ============ Activity Schemas ============
 class ActivityLogResponse(BaseModel):
     id: UUID
@@ -207,12 +321,122 @@ class ActivityLogResponse(BaseModel):
         from_attributes = True
 
 
+# ============ Webhook Schemas ============
+class WebhookCreate(BaseModel):
+    url: str = Field(..., pattern=r"^https?://")
+    event_types: list[str] | None = None  # e.g. ["contact.created"]; all events if omitted
+
+
+class WebhookResponse(BaseModel):
+    id: UUID
+    workspace_id: UUID
+    url: str
+    event_types: list[str] | None
+    is_active: bool
+    attempts: int
+    next_attempt_at: datetime | None
+    last_error: str | None
+    last_delivered_at: datetime | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class WebhookCreatedResponse(WebhookResponse):
+    secret: str  # Only returned once, at creation
+
+
+class WebhookReplayRequest(BaseModel):
+    from_event_id: int  # The "sequence" of the first event to deliver again
+
+
+class WebhookDeadLetterResponse(BaseModel):
+    id: UUID
+    first_event_id: int
+    last_event_id: int
+    event_count: int
+    error: str | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# ============ Suppression Schemas ============
+class SuppressionCreate(BaseModel):
+    emails: list[EmailStr] = Field(..., min_length=1, max_length=1000)
+    reason: str = Field("manual", pattern=r"^(bounced|unsubscribed|complaint|manual)$")
+
+
+class SuppressionResponse(BaseModel):
+    id: UUID
+    workspace_id: UUID | None
+    email: str
+    reason: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SuppressionAddResponse(BaseModel):
+    received: int
+    added: int
+
+
+# ============ Job Schemas ============
+class JobResponse(BaseModel):
+    id: UUID
+    workspace_id: UUID
+    user_id: UUID | None
+    type: str
+    status: str
+    progress_done: int
+    progress_total: int | None
+    result: dict | None
+    error: str | None
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    run_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 # ============ Me/Identity Schemas ============
 class MeResponse(BaseModel):
     user: UserResponse
     workspaces: list[WorkspaceWithRole]
 
 
+# ============ Bulk Operation Schemas ============
+class BulkDeleteResponse(BaseModel):
+    deleted: int
+
+
+class BulkStatusUpdateResponse(BaseModel):
+    received: int
+    invalid: int
+    updated: int
+    enrollments_stopped: int
+
+
 # ============ Health Schemas ============
 class HealthResponse(BaseModel):
     status: str = "ok"
+
+
+class TimingStats(BaseModel):
+    count: int
+    total_seconds: float
+    max_seconds: float
+
+
+class MetricsResponse(BaseModel):
+    counters: dict[str, float]
+    timings: dict[str, TimingStats]
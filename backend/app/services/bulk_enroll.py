@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy import exists
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services import counters, jobs, send_schedule, sequence_analytics, sequence_cache
+
+JOB_TYPE = "sequences.bulk_enroll"
+BATCH_SIZE = 1000
+
+
+@jobs.handler(JOB_TYPE)
+def bulk_enroll(db: Session, job: models.Job, progress: jobs.Progress) -> dict:
+    """
+    Enroll every active contact of the workspace that isn't in the sequence yet.
+    Each batch commits on its own and already-enrolled contacts are skipped, so a
+    retried or cancelled job leaves no partial batch behind and resumes cleanly.
+    """
+    sequence_id = UUID(job.params["sequence_id"])
+    workspace = db.get(models.Workspace, job.workspace_id)
+    sequence = sequence_cache.get_compiled_sequence(db, sequence_id, job.workspace_id)
+    if not sequence:
+        raise jobs.JobFailed("Sequence not found")
+
+    window = send_schedule.SendWindow.for_workspace(workspace)
+    first_step = sequence.first_step
+
+    not_enrolled = ~exists().where(
+        models.SequenceEnrollment.sequence_id == sequence_id,
+        models.SequenceEnrollment.contact_id == models.Contact.id,
+    )
+    candidates = db.query(models.Contact.id).filter(
+        models.Contact.workspace_id == job.workspace_id,
+        models.Contact.status == "active",
+        not_enrolled,
+    )
+    total = candidates.count()
+    db.rollback()
+    progress.report(0, total)
+
+    done = enrolled = 0
+    after = None
+    while True:
+        batch = candidates
+        if after:
+            batch = batch.filter(models.Contact.id > after)
+        contact_ids = [row.id for row in batch.order_by(models.Contact.id).limit(BATCH_SIZE)]
+        if not contact_ids:
+            break
+
+        now = datetime.now(timezone.utc)
+        rows = []
+        for contact_id in contact_ids:
+            enrollment_id = uuid4()
+            next_scheduled = None
+            if first_step:
+                next_scheduled = send_schedule.schedule(
+                    now + timedelta(days=first_step.delay_days), window, enrollment_id
+                )
+            rows.append(
+                {
+                    "id": enrollment_id,
+                    "sequence_id": sequence_id,
+                    "contact_id": contact_id,
+                    "next_scheduled_at": next_scheduled,
+                }
+            )
+
+        inserted = len(
+            db.execute(
+                insert(models.SequenceEnrollment)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["sequence_id", "contact_id"])
+                .returning(models.SequenceEnrollment.id)
+            ).all()
+        )
+        if inserted:
+            counters.increment(
+                db, job.workspace_id, counters.ACTIVE_ENROLLMENTS, str(sequence_id), inserted
+            )
+            counters.bump_collection(db, job.workspace_id, "enrollments")
+            sequence_analytics.record(db, sequence_id, None, "enrolled", inserted)
+        db.commit()
+
+        done += len(contact_ids)
+        enrolled += inserted
+        after = contact_ids[-1]
+        progress.report(done, total)
+
+    return {"enrolled": enrolled}
@@ -0,0 +1,119 @@
+from collections.abc import AsyncIterator
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services import counters, sequence_analytics, suppression
+
+CONTACT_STATUSES = ("active", "bounced", "unsubscribed")
+
+# One round trip: lock the matching contacts, record their old status, update them,
+# stop their active enrollments, and return per-status / per-sequence counts.
+BULK_STATUS_SQL = """
+WITH targets AS (
+    SELECT c.id, c.status AS old_status
+    FROM contacts c
+    JOIN unnest(CAST(:keys AS {key_type}[])) AS v(key) ON {key_match}
+    WHERE c.workspace_id = :workspace_id AND c.status <> :status
+    FOR UPDATE OF c
+),
+updated AS (
+    UPDATE contacts c SET status = :status, updated_at = now()
+    FROM targets t
+    WHERE c.id = t.id
+    RETURNING c.id, t.old_status
+),
+stopped AS (
+    UPDATE sequence_enrollments e SET status = 'stopped', next_scheduled_at = NULL
+    FROM updated u
+    WHERE e.contact_id = u.id AND e.status = 'active' AND :stop_enrollments
+    RETURNING e.sequence_id
+)
+SELECT 'contact' AS kind, old_status AS key, count(*) AS n FROM updated GROUP BY old_status
+UNION ALL
+SELECT 'enrollment', CAST(sequence_id AS text), count(*) FROM stopped GROUP BY sequence_id
+"""
+
+
+async def read_keys(stream: AsyncIterator[bytes], match: str) -> tuple[set, int]:
+    """
+    Parse newline-delimited emails or contact IDs from a request body as it arrives.
+
+    Lines may be single-column CSV; a header row and blank lines are skipped.
+    Returns the distinct valid keys and the number of lines that couldn't be parsed.
+    """
+    keys: set = set()
+    invalid = 0
+    pending = b""
+
+    def parse(line: bytes) -> None:
+        nonlocal invalid
+        value = line.decode("utf-8", errors="replace").split(",", 1)[0].strip().strip('"')
+        if not value or value.lower() in ("email", "id", "contact_id"):
+            return
+        if match == "id":
+            try:
+                keys.add(UUID(value))
+            except ValueError:
+                invalid += 1
+        elif "@" in value:
+            keys.add(value.lower())
+        else:
+            invalid += 1
+
+    async for chunk in stream:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            parse(line)
+    parse(pending)
+
+    return keys, invalid
+
+
+def bulk_update_status(
+    db: Session, workspace_id: UUID, keys: set, match: str, new_status: str
+) -> dict:
+    """
+    Set the status of every matching contact in one statement, stopping their
+    active enrollments unless the new status is 'active'. Counters are adjusted
+    in the same transaction; the caller commits.
+    """
+    if not keys:
+        return {"updated": 0, "enrollments_stopped": 0}
+
+    # Emails match case-insensitively, like the suppression index; served by
+    # contacts_workspace_email_lower_idx
+    sql = BULK_STATUS_SQL.format(
+        key_type="uuid" if match == "id" else "text",
+        key_match="c.id = v.key" if match == "id" else "lower(c.email) = lower(v.key)",
+    )
+    rows = db.execute(
+        text(sql),
+        {
+            "keys": [str(key) for key in keys],
+            "workspace_id": workspace_id,
+            "status": new_status,
+            "stop_enrollments": new_status != "active",
+        },
+    ).all()
+
+    updated = 0
+    stopped = 0
+    for kind, key, count in rows:
+        if kind == "contact":
+            counters.contact_status_changed(db, workspace_id, key, new_status, count)
+            suppression.contacts_changed(db, workspace_id, key, new_status)
+            updated += count
+        else:
+            counters.increment(db, workspace_id, counters.ACTIVE_ENROLLMENTS, key, -count)
+            sequence_analytics.record(db, UUID(key), None, "stopped", count)
+            stopped += count
+
+    if updated:
+        counters.bump_collection(db, workspace_id, "contacts")
+    if stopped:
+        counters.bump_collection(db, workspace_id, "enrollments")
+
+    return {"updated": updated, "enrollments_stopped": stopped}
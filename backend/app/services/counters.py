@@ -0,0 +1,230 @@
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+CONTACTS_BY_STATUS = "contacts_by_status"
+ACTIVE_ENROLLMENTS = "active_enrollments"
+EMAILS_SENT = "emails_sent"
+EMAILS_FAILED = "emails_failed"
+# Monotonic per-collection change counter used for list ETags; never reconciled
+COLLECTION_VERSION = "collection_version"
+
+# Metrics whose dimension is an ISO day rather than a current-state bucket
+DAILY_METRICS = (EMAILS_SENT, EMAILS_FAILED)
+# Metrics recomputed from scratch by reconcile_workspace()
+STATE_METRICS = (CONTACTS_BY_STATUS, ACTIVE_ENROLLMENTS)
+
+
+def today() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def increment(
+    db: Session,
+    workspace_id: UUID,
+    metric: str,
+    dimension: str,
+    delta: int = 1,
+) -> None:
+    """
+    Adjust a counter inside the caller's transaction.
+
+    The upsert takes a row lock on the counter until the caller commits, which
+    is what keeps reconcile_workspace() from double counting in-flight writes.
+    """
+    if delta == 0:
+        return
+
+    stmt = insert(models.WorkspaceCounter).values(
+        workspace_id=workspace_id,
+        metric=metric,
+        dimension=dimension,
+        value=delta,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["workspace_id", "metric", "dimension"],
+        set_={
+            "value": models.WorkspaceCounter.value + stmt.excluded.value,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+
+
+def contact_status_changed(
+    db: Session,
+    workspace_id: UUID,
+    old_status: str | None,
+    new_status: str | None,
+    count: int = 1,
+) -> None:
+    """Record contacts moving between statuses; None means created or deleted."""
+    if old_status == new_status:
+        return
+    if old_status is not None:
+        increment(db, workspace_id, CONTACTS_BY_STATUS, old_status, -count)
+    if new_status is not None:
+        increment(db, workspace_id, CONTACTS_BY_STATUS, new_status, count)
+
+
+def email_status_changed(db: Session, workspace_id: UUID, new_status: str) -> None:
+    """Record an outbound email reaching a terminal status today."""
+    if new_status == "sent":
+        increment(db, workspace_id, EMAILS_SENT, today())
+    elif new_status == "failed":
+        increment(db, workspace_id, EMAILS_FAILED, today())
+
+
+def bump_collection(db: Session, workspace_id: UUID, collection: str) -> None:
+    """
+    Mark a workspace collection ('contacts', 'sequences', 'enrollments',
+    'suppressions') as changed.
+    """
+    increment(db, workspace_id, COLLECTION_VERSION, collection)
+
+
+def get_collection_versions(
+    db: Session, workspace_id: UUID, *collections: str
+) -> tuple[int, ...]:
+    """Current change counters of the given collections, 0 for never-changed ones."""
+    rows = dict(
+        db.query(models.WorkspaceCounter.dimension, models.WorkspaceCounter.value)
+        .filter(
+            models.WorkspaceCounter.workspace_id == workspace_id,
+            models.WorkspaceCounter.metric == COLLECTION_VERSION,
+            models.WorkspaceCounter.dimension.in_(collections),
+        )
+        .all()
+    )
+    return tuple(rows.get(collection, 0) for collection in collections)
+
+
+def get_workspace_stats(db: Session, workspace_id: UUID) -> dict:
+    """Read the dashboard numbers for a workspace from its counter rows only."""
+    day = today()
+    rows = (
+        db.query(models.WorkspaceCounter)
+        .filter(
+            models.WorkspaceCounter.workspace_id == workspace_id,
+            models.WorkspaceCounter.metric.in_(STATE_METRICS)
+            | (
+                models.WorkspaceCounter.metric.in_(DAILY_METRICS)
+                & (models.WorkspaceCounter.dimension == day)
+            ),
+        )
+        .all()
+    )
+
+    stats = {
+        "contacts_by_status": {},
+        "active_enrollments_by_sequence": {},
+        "active_enrollments": 0,
+        "emails_sent_today": 0,
+        "emails_failed_today": 0,
+    }
+    for row in rows:
+        if row.value == 0:
+            continue
+        if row.metric == CONTACTS_BY_STATUS:
+            stats["contacts_by_status"][row.dimension] = row.value
+        elif row.metric == ACTIVE_ENROLLMENTS:
+            stats["active_enrollments_by_sequence"][row.dimension] = row.value
+            stats["active_enrollments"] += row.value
+        elif row.metric == EMAILS_SENT:
+            stats["emails_sent_today"] = row.value
+        elif row.metric == EMAILS_FAILED:
+            stats["emails_failed_today"] = row.value
+
+    stats["contacts_total"] = sum(stats["contacts_by_status"].values())
+    return stats
+
+
+def reconcile_workspace(db: Session, workspace_id: UUID, day: date | None = None) -> None:
+    """
+    Recompute a workspace's counters from the source tables and overwrite them.
+
+    Existing counter rows are locked first so writers that have already bumped a
+    counter commit before we count, and writers that haven't wait until we're done.
+    Commits the transaction.
+    """
+    day = day or datetime.now(timezone.utc).date()
+    day_start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    day_end = day_start + timedelta(days=1)
+
+    db.query(models.WorkspaceCounter).filter_by(workspace_id=workspace_id).with_for_update().all()
+
+    expected: dict[tuple[str, str], int] = {}
+
+    contact_counts = (
+        db.query(models.Contact.status, func.count())
+        .filter(models.Contact.workspace_id == workspace_id)
+        .group_by(models.Contact.status)
+        .all()
+    )
+    for contact_status, count in contact_counts:
+        expected[(CONTACTS_BY_STATUS, contact_status)] = count
+
+    enrollment_counts = (
+        db.query(models.SequenceEnrollment.sequence_id, func.count())
+        .join(models.Sequence)
+        .filter(
+            models.Sequence.workspace_id == workspace_id,
+            models.SequenceEnrollment.status == "active",
+        )
+        .group_by(models.SequenceEnrollment.sequence_id)
+        .all()
+    )
+    for sequence_id, count in enrollment_counts:
+        expected[(ACTIVE_ENROLLMENTS, str(sequence_id))] = count
+
+    email_counts = (
+        db.query(models.OutboundEmail.status, func.count())
+        .filter(
+            models.OutboundEmail.workspace_id == workspace_id,
+            models.OutboundEmail.status.in_(("sent", "failed")),
+            func.coalesce(models.OutboundEmail.sent_at, models.OutboundEmail.created_at)
+            >= day_start,
+            func.coalesce(models.OutboundEmail.sent_at, models.OutboundEmail.created_at)
+            < day_end,
+        )
+        .group_by(models.OutboundEmail.status)
+        .all()
+    )
+    for email_status, count in email_counts:
+        metric = EMAILS_SENT if email_status == "sent" else EMAILS_FAILED
+        expected[(metric, day.isoformat())] = count
+
+    # Current-state metrics are replaced wholesale; daily metrics only for `day`
+    db.query(models.WorkspaceCounter).filter(
+        models.WorkspaceCounter.workspace_id == workspace_id,
+        models.WorkspaceCounter.metric.in_(STATE_METRICS)
+        | (
+            models.WorkspaceCounter.metric.in_(DAILY_METRICS)
+            & (models.WorkspaceCounter.dimension == day.isoformat())
+        ),
+    ).delete(synchronize_session=False)
+
+    for (metric, dimension), value in expected.items():
+        db.add(
+            models.WorkspaceCounter(
+                workspace_id=workspace_id,
+                metric=metric,
+                dimension=dimension,
+                value=value,
+            )
+        )
+
+    db.commit()
+
+
+def reconcile_all(db: Session) -> int:
+    """Reconcile every workspace. Returns the number of workspaces processed."""
+    workspace_ids = [row.id for row in db.query(models.Workspace.id).all()]
+    for workspace_id in workspace_ids:
+        reconcile_workspace(db, workspace_id)
+    return len(workspace_ids)
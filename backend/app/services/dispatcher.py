@@ -0,0 +1,240 @@
+import re
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy import String, cast, func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import get_settings
+from app.core.email import make_message_id, send_email
+from app.services import (
+    counters,
+    outbox,
+    send_schedule,
+    sequence_analytics,
+    sequence_cache,
+    tracking,
+)
+from app.services.suppression import suppression_index
+
+# A failed send is retried no sooner than this, in the enrollment's send-window
+# slot (so usually the next allowed day), without advancing the enrollment
+RETRY_DELAY = timedelta(minutes=15)
+
+TEMPLATE_VARIABLE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+TEMPLATE_FIELDS = ("email", "first_name", "last_name", "company", "title")
+
+
+def shard_of(workspace_id_column, shards: int):
+    """SQL expression for a workspace's shard: a stable hash of its ID modulo `shards`."""
+    return func.mod(
+        func.hashtext(cast(workspace_id_column, String)).op("&")(0x7FFFFFFF), shards
+    )
+
+
+def render(template: str, contact: models.Contact) -> str:
+    """Fill {{first_name}}-style variables from the contact; unknown variables are kept."""
+
+    def replace(match: re.Match) -> str:
+        name = match.group(1)
+        if name not in TEMPLATE_FIELDS:
+            return match.group(0)
+        return getattr(contact, name) or ""
+
+    return TEMPLATE_VARIABLE.sub(replace, template)
+
+
+def due_enrollments(
+    db: Session, shards: set[int], total_shards: int, limit: int
+) -> list[tuple[UUID, UUID, int]]:
+    """
+    (enrollment_id, workspace_id, shard) of due enrollments in the given shards,
+    oldest first so each workspace's sends go out in schedule order.
+    """
+    if not shards:
+        return []
+
+    shard = shard_of(models.Sequence.workspace_id, total_shards)
+    return (
+        db.query(models.SequenceEnrollment.id, models.Sequence.workspace_id, shard)
+        .join(models.Sequence)
+        .filter(
+            models.SequenceEnrollment.status == "active",
+            models.SequenceEnrollment.next_scheduled_at <= func.now(),
+            models.Sequence.is_active.is_(True),
+            shard.in_(shards),
+        )
+        .order_by(models.SequenceEnrollment.next_scheduled_at)
+        .limit(limit)
+        .all()
+    )
+
+
+def publish_enrollment(
+    db: Session,
+    workspace_id: UUID,
+    enrollment_id: UUID,
+    sequence_id: UUID,
+    contact_id: UUID,
+    status: str,
+    reason: str,
+) -> None:
+    """Queue an enrollment.<status> event for webhook subscribers. The caller commits."""
+    outbox.publish(
+        db,
+        workspace_id,
+        f"enrollment.{status}",
+        uuid4(),
+        {
+            "enrollment_id": str(enrollment_id),
+            "sequence_id": str(sequence_id),
+            "contact_id": str(contact_id),
+            "reason": reason,
+        },
+    )
+
+
+def _finish(
+    db: Session,
+    enrollment: models.SequenceEnrollment,
+    workspace_id: UUID,
+    status: str,
+    reason: str,
+) -> None:
+    enrollment.status = status
+    enrollment.next_scheduled_at = None
+    counters.increment(
+        db, workspace_id, counters.ACTIVE_ENROLLMENTS, str(enrollment.sequence_id), -1
+    )
+    counters.bump_collection(db, workspace_id, "enrollments")
+    sequence_analytics.record(db, enrollment.sequence_id, None, status)
+    publish_enrollment(
+        db,
+        workspace_id,
+        enrollment.id,
+        enrollment.sequence_id,
+        enrollment.contact_id,
+        status,
+        reason,
+    )
+
+
+def dispatch_enrollment(db: Session, enrollment_id: UUID, workspace_id: UUID) -> str:
+    """
+    Send the next step of one due enrollment and schedule the one after. Commits.
+
+    The row is locked (skipping it if another worker has it) and re-checked, so a
+    shard changing hands mid-batch can't send the same step twice. A step that
+    fails DISPATCHER_MAX_SEND_ATTEMPTS times in a row stops the enrollment. Returns
+    what happened: 'sent', 'failed', 'completed', 'stopped' or 'skipped'.
+    """
+    enrollment = (
+        db.query(models.SequenceEnrollment)
+        .filter(
+            models.SequenceEnrollment.id == enrollment_id,
+            models.SequenceEnrollment.status == "active",
+            models.SequenceEnrollment.next_scheduled_at <= func.now(),
+        )
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if enrollment is None:
+        db.rollback()
+        return "skipped"
+
+    sequence = sequence_cache.get_compiled_sequence(db, enrollment.sequence_id, workspace_id)
+    last_sent = enrollment.last_step_sent
+    remaining = [
+        step
+        for step in (sequence.steps if sequence else ())
+        if last_sent is None or step.step_order > last_sent
+    ]
+
+    if not remaining:
+        _finish(db, enrollment, workspace_id, "completed", "no_remaining_steps")
+        db.commit()
+        return "completed"
+
+    contact = enrollment.contact
+    if contact.status != "active":
+        _finish(db, enrollment, workspace_id, "stopped", f"contact_{contact.status}")
+        db.commit()
+        return "stopped"
+    if suppression_index.is_suppressed(db, workspace_id, contact.email):
+        _finish(db, enrollment, workspace_id, "stopped", "suppressed")
+        db.commit()
+        return "stopped"
+
+    step = remaining[0]
+    outbound_email = models.OutboundEmail(
+        workspace_id=workspace_id,
+        contact_id=contact.id,
+        sequence_id=enrollment.sequence_id,
+        step_id=step.id,
+        subject=render(step.subject_template, contact),
+        body=render(step.body_template, contact),
+        status="queued",
+    )
+    db.add(outbound_email)
+    db.flush()
+
+    body, html = outbound_email.body, None
+    if get_settings().tracking_enabled:
+        body, html = tracking.instrument(outbound_email.id, outbound_email.body)
+
+    success = send_email(
+        to_email=contact.email,
+        subject=outbound_email.subject,
+        body=body,
+        html=html,
+        message_id=make_message_id(outbound_email.id),
+    )
+
+    now = datetime.now(timezone.utc)
+    window = send_schedule.SendWindow.for_workspace(db.get(models.Workspace, workspace_id))
+    if success:
+        outbound_email.status = "sent"
+        outbound_email.sent_at = now
+        enrollment.last_step_sent = step.step_order
+        enrollment.last_sent_at = now
+        enrollment.failed_attempts = 0
+        if len(remaining) > 1:
+            enrollment.next_scheduled_at = send_schedule.schedule(
+                now + timedelta(days=remaining[1].delay_days), window, enrollment.id
+            )
+        else:
+            _finish(db, enrollment, workspace_id, "completed", "last_step_sent")
+    else:
+        outbound_email.status = "failed"
+        outbound_email.error_message = "Failed to send email via SMTP"
+        enrollment.failed_attempts += 1
+        if enrollment.failed_attempts >= get_settings().dispatcher_max_send_attempts:
+            _finish(db, enrollment, workspace_id, "stopped", "send_failures")
+        else:
+            enrollment.next_scheduled_at = send_schedule.schedule(
+                now + RETRY_DELAY, window, enrollment.id
+            )
+    if enrollment.status == "active":
+        # _finish bumps it otherwise; list ETags must see the new progress and schedule
+        counters.bump_collection(db, workspace_id, "enrollments")
+    counters.email_status_changed(db, workspace_id, outbound_email.status)
+    sequence_analytics.record_email_status(db, outbound_email)
+    # Same type and payload as a test send, plus where in the sequence it came from
+    outbox.publish(
+        db,
+        workspace_id,
+        f"email.{outbound_email.status}",
+        uuid4(),
+        {
+            "email_id": str(outbound_email.id),
+            "contact_email": contact.email,
+            "subject": outbound_email.subject,
+            "enrollment_id": str(enrollment.id),
+            "sequence_id": str(enrollment.sequence_id),
+            "step_id": str(step.id),
+        },
+    )
+
+    db.commit()
+    return outbound_email.status
@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+import zlib
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from uuid import UUID
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+BATCH_SIZE = 1000
+
+
+def _encode_value(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode_batch(rows, columns: list[str], fmt: str, write_header: bool) -> bytes:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if write_header:
+            writer.writerow(columns)
+        writer.writerows([_encode_value(value) for value in row] for row in rows)
+        return buffer.getvalue().encode("utf-8")
+
+    lines = (
+        json.dumps(dict(zip(columns, (_encode_value(value) for value in row))))
+        for row in rows
+    )
+    return "".join(f"{line}\n" for line in lines).encode("utf-8")
+
+
+def stream_export(
+    session_factory: Callable[[], Session],
+    statement: Select,
+    fmt: str,
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """
+    Stream the rows of `statement` as CSV or NDJSON, optionally gzipped.
+
+    Rows are fetched through a server-side cursor in batches of BATCH_SIZE and
+    encoded batch by batch, so memory use doesn't depend on the result size.
+    The generator owns its session because it outlives the request's dependencies.
+    """
+    columns = [column.key for column in statement.selected_columns]
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31 = gzip container
+
+    db = session_factory()
+    try:
+        result = db.execute(statement.execution_options(yield_per=BATCH_SIZE))
+        write_header = True
+        for rows in result.partitions():
+            chunk = _encode_batch(rows, columns, fmt, write_header)
+            write_header = False
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+        if write_header and fmt == "csv":
+            # Empty export still gets a header row
+            chunk = _encode_batch([], columns, fmt, True)
+            yield compressor.compress(chunk) if compressor is not None else chunk
+
+        if compressor is not None:
+            yield compressor.flush()
+    finally:
+        db.close()
+
+
+def export_response(
+    session_factory: Callable[[], Session],
+    statement: Select,
+    name: str,
+    fmt: str,
+    compress: bool = False,
+) -> StreamingResponse:
+    """Wrap stream_export() in a downloadable StreamingResponse."""
+    filename = f"{name}.{fmt}.gz" if compress else f"{name}.{fmt}"
+    return StreamingResponse(
+        stream_export(session_factory, statement, fmt, compress),
+        media_type="application/gzip" if compress else EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,129 @@
+import hashlib
+import random
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import and_, or_, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+# Fraction of claims that also delete a batch of expired keys
+PURGE_PROBABILITY = 0.01
+PURGE_BATCH_SIZE = 1000
+
+
+class IdempotentReplay(Exception):
+    """Raised by the idempotency dependency to return a stored response instead."""
+
+    def __init__(self, status_code: int, body: str) -> None:
+        self.status_code = status_code
+        self.body = body
+
+
+def request_fingerprint(method: str, path: str, query: str, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query.encode(), body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def claim(
+    db: Session,
+    user_id: UUID,
+    key: str,
+    request_hash: str,
+    ttl: timedelta,
+    lease: timedelta,
+) -> models.IdempotencyKey | None:
+    """
+    Try to claim `key` for a new request. Commits.
+
+    Returns None when the claim succeeded (the caller should do the work), or
+    the existing record when another request already owns the key. Expired
+    records are taken over as if they didn't exist, and so are in-progress
+    claims whose `lease` ran out: their request died without releasing them.
+    """
+    now = datetime.now(timezone.utc)
+    stmt = insert(models.IdempotencyKey).values(
+        user_id=user_id,
+        key=key,
+        request_hash=request_hash,
+        status="in_progress",
+        locked_until=now + lease,
+        expires_at=now + ttl,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "key"],
+        set_={
+            "request_hash": stmt.excluded.request_hash,
+            "status": "in_progress",
+            "response_status": None,
+            "response_body": None,
+            "created_at": now,
+            "locked_until": stmt.excluded.locked_until,
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=or_(
+            models.IdempotencyKey.expires_at < now,
+            and_(
+                models.IdempotencyKey.status == "in_progress",
+                models.IdempotencyKey.locked_until < now,
+            ),
+        ),
+    ).returning(models.IdempotencyKey.key)
+
+    claimed = db.execute(stmt).first() is not None
+    db.commit()
+
+    if random.random() < PURGE_PROBABILITY:
+        purge_expired(db)
+
+    if claimed:
+        return None
+    return get(db, user_id, key)
+
+
+def get(db: Session, user_id: UUID, key: str) -> models.IdempotencyKey | None:
+    db.expire_all()
+    return db.query(models.IdempotencyKey).filter_by(user_id=user_id, key=key).first()
+
+
+def complete(
+    db: Session, user_id: UUID, key: str, status_code: int, body: str, ttl: timedelta
+) -> None:
+    """Store the response of a claimed request so retries can replay it for `ttl`. Commits."""
+    db.query(models.IdempotencyKey).filter_by(user_id=user_id, key=key).update(
+        {
+            models.IdempotencyKey.status: "completed",
+            models.IdempotencyKey.response_status: status_code,
+            models.IdempotencyKey.response_body: body,
+            models.IdempotencyKey.locked_until: None,
+            models.IdempotencyKey.expires_at: datetime.now(timezone.utc) + ttl,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def release(db: Session, user_id: UUID, key: str) -> None:
+    """Drop an in-progress claim after a server error so the client can retry. Commits."""
+    db.query(models.IdempotencyKey).filter_by(
+        user_id=user_id, key=key, status="in_progress"
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+def purge_expired(db: Session) -> int:
+    """Delete one batch of expired keys. Commits."""
+    result = db.execute(
+        text(
+            "DELETE FROM idempotency_keys WHERE ctid IN ("
+            "SELECT ctid FROM idempotency_keys WHERE expires_at < now() LIMIT :limit)"
+        ),
+        {"limit": PURGE_BATCH_SIZE},
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,268 @@
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import metrics
+from app.core.config import get_settings
+from app.core.db import get_session
+
+# Advisory lock namespace for claiming; the second key is hashtext(job type)
+LOCK_NAMESPACE = 0x10B5
+
+TRY_TYPE_LOCK_SQL = text("SELECT pg_try_advisory_xact_lock(:namespace, hashtext(:job_type))")
+
+PROGRESS_SQL = text(
+    """
+    UPDATE jobs
+    SET progress_done = :done,
+        progress_total = COALESCE(:total, progress_total),
+        heartbeat_at = now()
+    WHERE id = :id AND locked_by = :worker_id
+    RETURNING cancel_requested
+    """
+)
+
+# Running jobs whose worker stopped heartbeating go back in the queue, or fail
+# once they have used up their attempts
+REQUEUE_STALE_SQL = text(
+    """
+    UPDATE jobs
+    SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+        error = 'Worker stopped responding',
+        locked_by = NULL,
+        finished_at = CASE WHEN attempts >= max_attempts THEN now() END
+    WHERE status = 'running' AND heartbeat_at < now() - make_interval(secs => :timeout)
+    """
+)
+
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+Handler = Callable[[Session, models.Job, "Progress"], dict | None]
+HANDLERS: dict[str, Handler] = {}
+
+
+class JobCancelled(Exception):
+    """
+    Raised from Progress.report() once cancellation has been requested, or once
+    the job was requeued away from this worker for missing its heartbeat.
+    """
+
+
+class JobFailed(Exception):
+    """A failure that retrying won't fix; the job fails without further attempts."""
+
+
+def handler(job_type: str) -> Callable[[Handler], Handler]:
+    """Register the function that runs jobs of `job_type`."""
+
+    def register(fn: Handler) -> Handler:
+        HANDLERS[job_type] = fn
+        return fn
+
+    return register
+
+
+class Progress:
+    """
+    Handed to job handlers. Each report() is committed on its own connection, so
+    progress is visible while the handler's transaction is still open, and doubles
+    as the job's heartbeat and cancellation check.
+    """
+
+    def __init__(self, job_id: UUID, worker_id: str):
+        self.job_id = job_id
+        self.worker_id = worker_id
+
+    def report(self, done: int, total: int | None = None) -> None:
+        db = get_session()
+        try:
+            row = db.execute(
+                PROGRESS_SQL,
+                {"id": self.job_id, "worker_id": self.worker_id, "done": done, "total": total},
+            ).first()
+            db.commit()
+        finally:
+            db.close()
+
+        # No row: requeue_stale() gave the job up on this worker
+        if row is None or row.cancel_requested:
+            raise JobCancelled()
+
+
+def enqueue(
+    db: Session,
+    workspace_id: UUID,
+    job_type: str,
+    params: dict,
+    user_id: UUID | None = None,
+) -> models.Job:
+    """Queue a job inside the caller's transaction; it becomes claimable on commit."""
+    if job_type not in HANDLERS:
+        raise ValueError(f"Unknown job type: {job_type}")
+
+    job = models.Job(
+        workspace_id=workspace_id,
+        user_id=user_id,
+        type=job_type,
+        params=params,
+        max_attempts=get_settings().job_max_attempts,
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def concurrency_limit(job_type: str) -> int:
+    settings = get_settings()
+    return settings.job_concurrency.get(job_type, settings.job_default_concurrency)
+
+
+def backoff(attempts: int) -> timedelta:
+    settings = get_settings()
+    seconds = settings.job_backoff_base_seconds * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.job_backoff_max_seconds))
+
+
+def claim(db: Session, worker_id: str) -> models.Job | None:
+    """
+    Mark the oldest due job as running and commit. Job types at their concurrency
+    limit are skipped. Claims of the same type are serialized by an advisory lock,
+    so two workers can't both take the last free slot; claims of other types, and
+    of other jobs of the same type, skip each other's locked rows.
+    """
+    due = (
+        db.query(models.Job.type, func.min(models.Job.run_at))
+        .filter(models.Job.status == "queued", models.Job.run_at <= func.now())
+        .group_by(models.Job.type)
+        .order_by(func.min(models.Job.run_at))
+        .all()
+    )
+
+    for job_type, _ in due:
+        if job_type not in HANDLERS:
+            continue
+        locked = db.execute(
+            TRY_TYPE_LOCK_SQL, {"namespace": LOCK_NAMESPACE, "job_type": job_type}
+        ).scalar()
+        if not locked:
+            continue
+
+        running = (
+            db.query(func.count(models.Job.id))
+            .filter(models.Job.type == job_type, models.Job.status == "running")
+            .scalar()
+        )
+        if running >= concurrency_limit(job_type):
+            continue
+
+        job = (
+            db.query(models.Job)
+            .filter(
+                models.Job.type == job_type,
+                models.Job.status == "queued",
+                models.Job.run_at <= func.now(),
+            )
+            .order_by(models.Job.run_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            continue
+
+        now = datetime.now(timezone.utc)
+        job.status = "running"
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.heartbeat_at = now
+        job.started_at = job.started_at or now
+        db.commit()
+        return job
+
+    db.rollback()
+    return None
+
+
+def _finish(db: Session, job_id: UUID, worker_id: str, **values) -> None:
+    """
+    Record the outcome of a run, unless the job no longer belongs to `worker_id`:
+    requeue_stale() may have handed it to another worker, whose outcome counts.
+    """
+    job = (
+        db.query(models.Job)
+        .filter_by(id=job_id, locked_by=worker_id)
+        .with_for_update()
+        .populate_existing()
+        .first()
+    )
+    if job is None:
+        db.rollback()
+        metrics.increment("jobs.lost")
+        return
+    for key, value in values.items():
+        setattr(job, key, value)
+    job.locked_by = None
+    if job.status in TERMINAL_STATUSES:
+        job.finished_at = datetime.now(timezone.utc)
+    db.commit()
+    metrics.increment(f"jobs.{job.type}.{job.status}")
+
+
+def run(db: Session, job: models.Job) -> str:
+    """Run a claimed job to its next state. Commits. Returns the new status."""
+    job_id, worker_id = job.id, job.locked_by
+    try:
+        result = HANDLERS[job.type](db, job, Progress(job_id, worker_id))
+    except JobCancelled:
+        db.rollback()
+        _finish(db, job_id, worker_id, status="cancelled")
+        return "cancelled"
+    except JobFailed as e:
+        db.rollback()
+        _finish(db, job_id, worker_id, status="failed", error=str(e))
+        return "failed"
+    except Exception as e:
+        db.rollback()
+        job = db.get(models.Job, job_id)
+        if job.attempts < job.max_attempts:
+            _finish(
+                db,
+                job_id,
+                worker_id,
+                status="queued",
+                error=f"{type(e).__name__}: {e}",
+                run_at=datetime.now(timezone.utc) + backoff(job.attempts),
+            )
+            return "retrying"
+        _finish(db, job_id, worker_id, status="failed", error=f"{type(e).__name__}: {e}")
+        return "failed"
+
+    db.commit()
+    _finish(db, job_id, worker_id, status="succeeded", result=result, error=None)
+    return "succeeded"
+
+
+def cancel(db: Session, job: models.Job) -> None:
+    """
+    Cancel a job, locked with FOR UPDATE by the caller so it can't be claimed
+    meanwhile. The caller commits. Queued jobs stop right away; running jobs
+    stop at their handler's next progress report.
+    """
+    if job.status == "queued":
+        job.status = "cancelled"
+        job.finished_at = datetime.now(timezone.utc)
+    elif job.status == "running":
+        job.cancel_requested = True
+
+
+def requeue_stale(db: Session) -> int:
+    """Recover jobs from workers that died mid-run. Commits. Returns jobs recovered."""
+    result = db.execute(
+        REQUEUE_STALE_SQL, {"timeout": get_settings().job_heartbeat_timeout_seconds}
+    )
+    db.commit()
+    return result.rowcount
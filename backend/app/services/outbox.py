@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import text, tuple_
+from sqlalchemy.orm import Session
+
+from app import models
+
+PURGE_BATCH_SIZE = 5000
+
+# Events are only safe to deliver once every transaction that could still insert
+# an earlier one has finished: everything below the oldest running xid.
+VISIBLE_TXID_SQL = text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+
+def publish(
+    db: Session, workspace_id: UUID, event_type: str, event_id: UUID, payload: dict
+) -> None:
+    """Queue an event for webhook delivery inside the caller's transaction."""
+    db.add(
+        models.OutboxEvent(
+            event_id=event_id,
+            workspace_id=workspace_id,
+            type=event_type,
+            payload=payload,
+        )
+    )
+
+
+def visible_txid(db: Session) -> int:
+    return db.execute(VISIBLE_TXID_SQL).scalar()
+
+
+def read_after(
+    db: Session,
+    subscription: models.WebhookSubscription,
+    limit: int,
+    below_txid: int,
+) -> list[models.OutboxEvent]:
+    """The next events for a subscription after its cursor, in delivery order."""
+    query = db.query(models.OutboxEvent).filter(
+        models.OutboxEvent.workspace_id == subscription.workspace_id,
+        models.OutboxEvent.txid < below_txid,
+        tuple_(models.OutboxEvent.txid, models.OutboxEvent.id)
+        > tuple_(subscription.cursor_txid, subscription.cursor_event_id),
+    )
+    if subscription.event_types:
+        query = query.filter(models.OutboxEvent.type.in_(subscription.event_types))
+
+    return query.order_by(models.OutboxEvent.txid, models.OutboxEvent.id).limit(limit).all()
+
+
+def purge(db: Session, retention: timedelta) -> int:
+    """Delete one batch of events older than `retention`. Commits."""
+    cutoff = datetime.now(timezone.utc) - retention
+    result = db.execute(
+        text(
+            "DELETE FROM outbox_events WHERE id IN ("
+            "SELECT id FROM outbox_events WHERE created_at < :cutoff LIMIT :limit)"
+        ),
+        {"cutoff": cutoff, "limit": PURGE_BATCH_SIZE},
+    )
+    db.commit()
+    return result.rowcount
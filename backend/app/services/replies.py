@@ -0,0 +1,199 @@
+import imaplib
+import os
+from email.message import Message
+from email.parser import BytesHeaderParser
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.email import referenced_outbound_emails
+from app.services import counters, dispatcher, sequence_analytics
+
+# Only the threading headers are needed to match a reply; bodies are never downloaded
+HEADER_FIELDS = "MESSAGE-ID IN-REPLY-TO REFERENCES"
+
+# Stop the active enrollment behind each replied-to email, in one statement
+STOP_REPLIED_SQL = text(
+    """
+    WITH stopped AS (
+        UPDATE sequence_enrollments e SET status = 'stopped', next_scheduled_at = NULL
+        FROM outbound_emails o
+        WHERE o.id = ANY(CAST(:email_ids AS uuid[]))
+            AND e.sequence_id = o.sequence_id
+            AND e.contact_id = o.contact_id
+            AND e.status = 'active'
+        RETURNING e.id, e.sequence_id, e.contact_id, o.workspace_id
+    )
+    SELECT DISTINCT workspace_id, sequence_id, id, contact_id FROM stopped
+    ORDER BY workspace_id, sequence_id
+    """
+)
+
+
+def replied_email_ids(headers: Message) -> set[UUID]:
+    """Outbound emails a message replies to, from its In-Reply-To and References."""
+    return referenced_outbound_emails(headers.get("In-Reply-To"), headers.get("References"))
+
+
+def stop_replied(db: Session, email_ids: set[UUID]) -> int:
+    """
+    Stop the active enrollments that sent any of `email_ids`, adjusting counters
+    and analytics in the same transaction. The caller commits. Returns the number
+    of enrollments stopped.
+    """
+    if not email_ids:
+        return 0
+
+    rows = db.execute(STOP_REPLIED_SQL, {"email_ids": [str(i) for i in email_ids]}).all()
+
+    stopped: dict[tuple[UUID, UUID], int] = {}
+    for workspace_id, sequence_id, enrollment_id, contact_id in rows:
+        dispatcher.publish_enrollment(
+            db, workspace_id, enrollment_id, sequence_id, contact_id, "stopped", "replied"
+        )
+        stopped[workspace_id, sequence_id] = stopped.get((workspace_id, sequence_id), 0) + 1
+
+    for (workspace_id, sequence_id), count in stopped.items():
+        counters.increment(db, workspace_id, counters.ACTIVE_ENROLLMENTS, str(sequence_id), -count)
+        sequence_analytics.record(db, sequence_id, None, "stopped", count)
+        counters.bump_collection(db, workspace_id, "enrollments")
+    return len(rows)
+
+
+# ============ Mailbox sources ============
+
+
+class MaildirSource:
+    """
+    Reads a local maildir. Messages are taken from new/ and moved to cur/ (marked
+    seen) once processed, which is maildir's own record of what has been read.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.name = f"maildir://{os.path.abspath(path)}"
+        self._parser = BytesHeaderParser()
+
+    def fetch(self, db: Session, limit: int) -> tuple[list[Message], object]:
+        """Up to `limit` unread messages, and a position to pass to commit()."""
+        new_dir = os.path.join(self.path, "new")
+        names = sorted(entry.name for entry in os.scandir(new_dir) if entry.is_file())[:limit]
+
+        messages = []
+        for name in names:
+            with open(os.path.join(new_dir, name), "rb") as f:
+                messages.append(self._parser.parse(f, headersonly=True))
+        return messages, names
+
+    def commit(self, db: Session, position: object) -> None:
+        """Commit the stops, then mark the messages read."""
+        db.commit()
+        for name in position:
+            os.replace(
+                os.path.join(self.path, "new", name),
+                os.path.join(self.path, "cur", f"{name}:2,S"),
+            )
+
+
+class ImapSource:
+    """
+    Reads an IMAP mailbox by UID. The last UID seen is kept in mailbox_cursors
+    together with the mailbox's UIDVALIDITY; if the server resets UIDVALIDITY the
+    old UIDs are meaningless, so reading restarts from the beginning (stopping an
+    enrollment twice is a no-op).
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        mailbox: str = "INBOX",
+        ssl: bool = True,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.mailbox = mailbox
+        self.ssl = ssl
+        self.name = f"imap://{username}@{host}:{port}/{mailbox}"
+        self._conn: imaplib.IMAP4 | None = None
+        self._current: models.MailboxCursor | None = None
+        self._parser = BytesHeaderParser()
+
+    def _connection(self) -> imaplib.IMAP4:
+        if self._conn is None:
+            imap_class = imaplib.IMAP4_SSL if self.ssl else imaplib.IMAP4
+            self._conn = imap_class(self.host, self.port)
+            self._conn.login(self.username, self.password)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.logout()
+            except (imaplib.IMAP4.error, OSError):
+                pass
+            self._conn = None
+
+    def _cursor(self, db: Session, uidvalidity: int) -> models.MailboxCursor:
+        cursor = db.get(models.MailboxCursor, self.name)
+        if cursor is None:
+            cursor = models.MailboxCursor(source=self.name, uidvalidity=uidvalidity, last_uid=0)
+            db.add(cursor)
+        elif cursor.uidvalidity != uidvalidity:
+            print(f"UIDVALIDITY of {self.name} changed; rereading the mailbox")
+            cursor.uidvalidity = uidvalidity
+            cursor.last_uid = 0
+        return cursor
+
+    def fetch(self, db: Session, limit: int) -> tuple[list[Message], object]:
+        """Headers of up to `limit` messages after the stored UID, and the new last UID."""
+        try:
+            conn = self._connection()
+            conn.select(self.mailbox, readonly=True)
+            _, data = conn.response("UIDVALIDITY")
+            cursor = self._current = self._cursor(db, int(data[0]))
+
+            # `n:*` always matches the newest message, even when its UID is below n
+            _, data = conn.uid("SEARCH", None, f"UID {cursor.last_uid + 1}:*")
+            uids = sorted(uid for uid in map(int, data[0].split()) if uid > cursor.last_uid)
+            uids = uids[:limit]
+            if not uids:
+                return [], cursor.last_uid
+
+            uid_set = ",".join(map(str, uids))
+            _, data = conn.uid("FETCH", uid_set, f"(BODY.PEEK[HEADER.FIELDS ({HEADER_FIELDS})])")
+        except (imaplib.IMAP4.error, OSError):
+            # Reconnect on the next poll
+            self.close()
+            raise
+
+        messages = [
+            self._parser.parsebytes(item[1]) for item in data if isinstance(item, tuple)
+        ]
+        return messages, uids[-1]
+
+    def commit(self, db: Session, position: object) -> None:
+        """Move the cursor and commit it together with the stops."""
+        self._current.last_uid = position
+        db.commit()
+
+
+def process_batch(db: Session, source: MaildirSource | ImapSource, limit: int) -> dict:
+    """Read one batch of new messages, stop the enrollments they reply to. Commits."""
+    messages, position = source.fetch(db, limit)
+
+    email_ids: set[UUID] = set()
+    for headers in messages:
+        email_ids |= replied_email_ids(headers)
+
+    stopped = stop_replied(db, email_ids)
+    source.commit(db, position)
+
+    return {"messages": len(messages), "replies": len(email_ids), "stopped": stopped}
+
@@ -0,0 +1,90 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+@dataclass(frozen=True)
+class SendWindow:
+    """Hours of the day (and days of the week) a workspace's sequence steps go out."""
+
+    tz: ZoneInfo
+    start: time
+    end: time
+    weekends: bool
+
+    @classmethod
+    def for_workspace(cls, workspace: models.Workspace) -> "SendWindow":
+        return cls(
+            tz=ZoneInfo(workspace.timezone),
+            start=workspace.send_window_start,
+            end=workspace.send_window_end,
+            weekends=workspace.send_on_weekends,
+        )
+
+    def allows(self, day: date) -> bool:
+        return self.weekends or day.weekday() < 5
+
+    def slot(self, day: date, fraction: float) -> datetime:
+        """The instant `fraction` of the way through the window on a local day."""
+        opens = datetime.combine(day, self.start, tzinfo=self.tz)
+        closes = datetime.combine(day, self.end, tzinfo=self.tz)
+        return opens + (closes - opens) * fraction
+
+
+def jitter(enrollment_id: UUID) -> float:
+    """Stable fraction in [0, 1) for an enrollment, so reschedules land in the same slot."""
+    digest = hashlib.blake2b(enrollment_id.bytes, digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64
+
+
+def schedule(due: datetime, window: SendWindow, enrollment_id: UUID) -> datetime:
+    """
+    When to actually send a step that is nominally due at `due`.
+
+    Each enrollment gets a fixed slot inside the send window, so a batch enrolled
+    at the same moment is spread evenly over the window instead of all coming due
+    together. The step goes out in its slot on the first allowed day at or after
+    `due`, never before `due`. If `due` is inside an allowed day's window but past
+    the slot, it goes out that day, spread the same way over the rest of the window.
+    Returns UTC.
+    """
+    fraction = jitter(enrollment_id)
+    day = due.astimezone(window.tz).date()
+    while True:
+        if window.allows(day):
+            send_at = window.slot(day, fraction)
+            if send_at >= due:
+                return send_at.astimezone(timezone.utc)
+            closes = window.slot(day, 1.0)
+            if due < closes:
+                return (due + (closes - due) * fraction).astimezone(timezone.utc)
+        day += timedelta(days=1)
+
+
+def forecast(db: Session, workspace_id: UUID, start: datetime, end: datetime) -> list[tuple]:
+    """
+    (minute, sends) for the next scheduled step of active enrollments due before
+    `end`. Overdue steps are counted in the first minute, when they'd go out.
+    """
+    due_at = func.greatest(models.SequenceEnrollment.next_scheduled_at, start)
+    minute = func.date_trunc("minute", due_at)
+    return (
+        db.query(minute, func.count())
+        .join(models.Sequence)
+        .filter(
+            models.Sequence.workspace_id == workspace_id,
+            models.Sequence.is_active.is_(True),
+            models.SequenceEnrollment.status == "active",
+            models.SequenceEnrollment.next_scheduled_at < end,
+        )
+        .group_by(minute)
+        .order_by(minute)
+        .all()
+    )
@@ -0,0 +1,171 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import Date, cast, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+FIELDS = ("enrolled", "sent", "failed", "completed", "stopped", "opened", "clicked")
+STEP_FIELDS = ("sent", "failed", "opened", "clicked")
+
+
+def record(
+    db: Session,
+    sequence_id: UUID,
+    step_id: UUID | None,
+    field: str,
+    delta: int = 1,
+    day: date | None = None,
+) -> None:
+    """Add `delta` to one funnel field of the rollup row, inside the caller's transaction."""
+    if field not in FIELDS:
+        raise ValueError(f"Unknown analytics field: {field}")
+
+    day = day or datetime.now(timezone.utc).date()
+    stmt = insert(models.SequenceDailyStat).values(
+        sequence_id=sequence_id,
+        step_id=step_id,
+        day=day,
+        **{field: delta},
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["sequence_id", "step_id", "day"],
+        set_={field: getattr(models.SequenceDailyStat, field) + delta},
+    )
+    db.execute(stmt)
+
+
+def record_email_status(db: Session, outbound_email: models.OutboundEmail) -> None:
+    """Count a sequence email reaching 'sent' or 'failed'. Test emails are ignored."""
+    if outbound_email.sequence_id is None or outbound_email.status not in ("sent", "failed"):
+        return
+    record(db, outbound_email.sequence_id, outbound_email.step_id, outbound_email.status)
+
+
+def get_sequence_analytics(
+    db: Session, sequence_id: UUID, start: date, end: date
+) -> dict:
+    """Aggregate the rollup rows of a sequence between `start` and `end` (inclusive)."""
+    rows = (
+        db.query(models.SequenceDailyStat)
+        .filter(
+            models.SequenceDailyStat.sequence_id == sequence_id,
+            models.SequenceDailyStat.day >= start,
+            models.SequenceDailyStat.day <= end,
+        )
+        .order_by(models.SequenceDailyStat.day)
+        .all()
+    )
+
+    totals = dict.fromkeys(FIELDS, 0)
+    by_step: dict[UUID, dict[str, int]] = {}
+    daily = []
+    for row in rows:
+        values = {field: getattr(row, field) for field in FIELDS}
+        for field, value in values.items():
+            totals[field] += value
+        if row.step_id is not None:
+            step_totals = by_step.setdefault(row.step_id, dict.fromkeys(STEP_FIELDS, 0))
+            for field in STEP_FIELDS:
+                step_totals[field] += values[field]
+        daily.append({"day": row.day, "step_id": row.step_id, **values})
+
+    return {
+        "sequence_id": sequence_id,
+        "start": start,
+        "end": end,
+        "totals": totals,
+        "by_step": [{"step_id": step_id, **values} for step_id, values in by_step.items()],
+        "daily": daily,
+    }
+
+
+def backfill_sequence(db: Session, sequence_id: UUID) -> int:
+    """
+    Rebuild a sequence's rollup rows from enrollments and outbound emails.
+
+    Enrollments don't record when they completed or stopped, so those are
+    attributed to the day of the last send (or enrollment). Opens and clicks come
+    from email_engagement; counts still in a tracking buffer are missed. Commits
+    the transaction and returns the number of rollup rows written.
+    """
+    buckets: dict[tuple[UUID | None, date], dict[str, int]] = defaultdict(
+        lambda: dict.fromkeys(FIELDS, 0)
+    )
+
+    enrolled_day = cast(func.timezone("UTC", models.SequenceEnrollment.created_at), Date)
+    for day, count in (
+        db.query(enrolled_day, func.count())
+        .filter(models.SequenceEnrollment.sequence_id == sequence_id)
+        .group_by(enrolled_day)
+        .all()
+    ):
+        buckets[(None, day)]["enrolled"] += count
+
+    ended_day = cast(
+        func.timezone(
+            "UTC",
+            func.coalesce(
+                models.SequenceEnrollment.last_sent_at, models.SequenceEnrollment.created_at
+            ),
+        ),
+        Date,
+    )
+    for enrollment_status, day, count in (
+        db.query(models.SequenceEnrollment.status, ended_day, func.count())
+        .filter(
+            models.SequenceEnrollment.sequence_id == sequence_id,
+            models.SequenceEnrollment.status.in_(("completed", "stopped")),
+        )
+        .group_by(models.SequenceEnrollment.status, ended_day)
+        .all()
+    ):
+        buckets[(None, day)][enrollment_status] += count
+
+    email_day = cast(
+        func.timezone(
+            "UTC",
+            func.coalesce(models.OutboundEmail.sent_at, models.OutboundEmail.created_at),
+        ),
+        Date,
+    )
+    for step_id, email_status, day, count in (
+        db.query(
+            models.OutboundEmail.step_id, models.OutboundEmail.status, email_day, func.count()
+        )
+        .filter(
+            models.OutboundEmail.sequence_id == sequence_id,
+            models.OutboundEmail.status.in_(("sent", "failed")),
+        )
+        .group_by(models.OutboundEmail.step_id, models.OutboundEmail.status, email_day)
+        .all()
+    ):
+        buckets[(step_id, day)][email_status] += count
+
+    for column, field in (
+        (models.EmailEngagement.first_opened_at, "opened"),
+        (models.EmailEngagement.first_clicked_at, "clicked"),
+    ):
+        first_day = cast(func.timezone("UTC", column), Date)
+        for step_id, day, count in (
+            db.query(models.OutboundEmail.step_id, first_day, func.count())
+            .join(models.EmailEngagement)
+            .filter(models.OutboundEmail.sequence_id == sequence_id, column.isnot(None))
+            .group_by(models.OutboundEmail.step_id, first_day)
+            .all()
+        ):
+            buckets[(step_id, day)][field] += count
+
+    db.query(models.SequenceDailyStat).filter_by(sequence_id=sequence_id).delete(
+        synchronize_session=False
+    )
+    db.add_all(
+        models.SequenceDailyStat(sequence_id=sequence_id, step_id=step_id, day=day, **values)
+        for (step_id, day), values in buckets.items()
+    )
+    db.commit()
+
+    return len(buckets)
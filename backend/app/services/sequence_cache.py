@@ -0,0 +1,143 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy.orm import Session, joinedload
+
+from app import models
+
+MAX_CACHED_SEQUENCES = 1024
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    """A sequence step with its delay resolved relative to enrollment."""
+
+    id: UUID
+    sequence_id: UUID
+    step_order: int
+    subject_template: str
+    body_template: str
+    delay_days: int
+    offset_days: int  # Cumulative delay from enrollment to this step
+
+
+@dataclass(frozen=True)
+class CompiledSequence:
+    """Immutable snapshot of a sequence and its ordered steps at a given version."""
+
+    id: UUID
+    workspace_id: UUID
+    version: int
+    name: str
+    description: str | None
+    is_active: bool
+    created_at: datetime
+    steps: tuple[CompiledStep, ...]
+
+    @property
+    def first_step(self) -> CompiledStep | None:
+        return self.steps[0] if self.steps else None
+
+
+_cache: OrderedDict[UUID, CompiledSequence] = OrderedDict()
+_lock = threading.Lock()
+
+
+def compile_sequence(sequence: models.Sequence) -> CompiledSequence:
+    """Build a CompiledSequence from a Sequence with its steps loaded."""
+    steps = []
+    offset = 0
+    for step in sorted(sequence.steps, key=lambda s: s.step_order):
+        offset += step.delay_days or 0
+        steps.append(
+            CompiledStep(
+                id=step.id,
+                sequence_id=step.sequence_id,
+                step_order=step.step_order,
+                subject_template=step.subject_template,
+                body_template=step.body_template,
+                delay_days=step.delay_days or 0,
+                offset_days=offset,
+            )
+        )
+
+    return CompiledSequence(
+        id=sequence.id,
+        workspace_id=sequence.workspace_id,
+        version=sequence.version,
+        name=sequence.name,
+        description=sequence.description,
+        is_active=sequence.is_active,
+        created_at=sequence.created_at,
+        steps=tuple(steps),
+    )
+
+
+def get_version(db: Session, sequence_id: UUID, workspace_id: UUID) -> int | None:
+    """Current version of a sequence in a workspace, or None if it doesn't exist."""
+    return (
+        db.query(models.Sequence.version)
+        .filter_by(id=sequence_id, workspace_id=workspace_id)
+        .scalar()
+    )
+
+
+def get_compiled_sequence(
+    db: Session, sequence_id: UUID, workspace_id: UUID, version: int | None = None
+) -> CompiledSequence | None:
+    """
+    Return the compiled definition of a sequence in a workspace.
+
+    Only the version column is read when the cached copy is current (pass
+    `version` if the caller already has it); the sequence and its steps are
+    reloaded whenever the version has moved.
+    """
+    if version is None:
+        version = get_version(db, sequence_id, workspace_id)
+
+    if version is None:
+        evict(sequence_id)
+        return None
+
+    with _lock:
+        cached = _cache.get(sequence_id)
+        if cached is not None and cached.version == version:
+            _cache.move_to_end(sequence_id)
+            return cached
+
+    sequence = (
+        db.query(models.Sequence)
+        .options(joinedload(models.Sequence.steps))
+        .filter_by(id=sequence_id, workspace_id=workspace_id)
+        .first()
+    )
+
+    if not sequence:
+        evict(sequence_id)
+        return None
+
+    compiled = compile_sequence(sequence)
+
+    with _lock:
+        _cache[sequence_id] = compiled
+        _cache.move_to_end(sequence_id)
+        while len(_cache) > MAX_CACHED_SEQUENCES:
+            _cache.popitem(last=False)
+
+    return compiled
+
+
+def bump_version(db: Session, sequence_id: UUID) -> None:
+    """Invalidate cached definitions of a sequence. Call within the writing transaction."""
+    db.query(models.Sequence).filter_by(id=sequence_id).update(
+        {models.Sequence.version: models.Sequence.version + 1},
+        synchronize_session=False,
+    )
+
+
+def evict(sequence_id: UUID) -> None:
+    with _lock:
+        _cache.pop(sequence_id, None)
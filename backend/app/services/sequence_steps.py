@@ -0,0 +1,67 @@
+from uuid import UUID
+
+from sqlalchemy import func, insert, literal, select, text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app import models
+
+# Relies on sequence_steps_order_idx being deferrable: it is checked once the
+# whole permutation is applied, not after each row
+REORDER_SQL = text(
+    """
+    UPDATE sequence_steps s
+    SET step_order = o.position::int
+    FROM unnest(CAST(:step_ids AS uuid[])) WITH ORDINALITY AS o(id, position)
+    WHERE s.id = o.id AND s.sequence_id = :sequence_id
+    """
+)
+
+# FOR SHARE waits for a dispatch in progress and keeps the dispatcher (SKIP LOCKED)
+# off these enrollments until the reorder commits
+STARTED_ENROLLMENTS_SQL = text(
+    """
+    SELECT count(*) FILTER (WHERE e.last_step_sent IS NOT NULL)
+    FROM (
+        SELECT last_step_sent FROM sequence_enrollments
+        WHERE sequence_id = :sequence_id AND status = 'active'
+        FOR SHARE
+    ) e
+    """
+)
+
+STEP_COLUMNS = ("step_order", "subject_template", "body_template", "delay_days")
+
+
+def copy_steps(db: Session, source_id: UUID, target_id: UUID) -> int:
+    """Copy every step of one sequence to another with a single INSERT ... SELECT."""
+    columns = [getattr(models.SequenceStep, name) for name in STEP_COLUMNS]
+    result = db.execute(
+        insert(models.SequenceStep).from_select(
+            ["id", "sequence_id", *STEP_COLUMNS],
+            select(
+                func.gen_random_uuid(), literal(target_id, PG_UUID(as_uuid=True)), *columns
+            ).where(models.SequenceStep.sequence_id == source_id),
+        )
+    )
+    return result.rowcount
+
+
+def lock_started_enrollments(db: Session, sequence_id: UUID) -> int:
+    """
+    Lock the sequence's active enrollments until commit and count those that
+    have sent a step. Their progress is a step_order, so a reorder would make
+    them resend or skip steps.
+    """
+    return db.execute(STARTED_ENROLLMENTS_SQL, {"sequence_id": sequence_id}).scalar_one()
+
+
+def reorder(db: Session, sequence_id: UUID, step_ids: list[UUID]) -> None:
+    """
+    Renumber a sequence's steps 1..N in the order given, in one statement. The
+    caller checks that `step_ids` is exactly the sequence's steps, and commits.
+    """
+    db.execute(
+        REORDER_SQL,
+        {"step_ids": [str(step_id) for step_id in step_ids], "sequence_id": sequence_id},
+    )
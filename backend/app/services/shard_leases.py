@@ -0,0 +1,162 @@
+import math
+import os
+import socket
+import time
+import uuid
+import zlib
+
+from sqlalchemy import Connection, Engine, text
+from sqlalchemy.exc import DBAPIError
+
+# First key of the two-int advisory locks; the second is the shard number
+LOCK_NAMESPACE = 0x1B0C
+
+# application_name of the lock connections; only backends with it are ever terminated
+APPLICATION_NAME = "inboxpilot-dispatcher-leases"
+
+HEARTBEAT_SQL = text(
+    """
+    INSERT INTO dispatcher_workers (worker_id, backend_pid, backend_start, shard_count,
+                                    heartbeat_at)
+    SELECT :worker_id, pid, backend_start, :shard_count, clock_timestamp()
+    FROM pg_stat_activity WHERE pid = pg_backend_pid()
+    ON CONFLICT (worker_id) DO UPDATE SET
+        backend_pid = EXCLUDED.backend_pid,
+        backend_start = EXCLUDED.backend_start,
+        shard_count = EXCLUDED.shard_count,
+        heartbeat_at = EXCLUDED.heartbeat_at
+    """
+)
+
+# Terminating a silent worker's backend drops its advisory locks with the session. By
+# now its PID may belong to another backend, so only one that still matches the
+# recorded start time and application_name is terminated; otherwise the row just goes.
+REAP_SQL = text(
+    """
+    WITH dead AS (
+        DELETE FROM dispatcher_workers
+        WHERE heartbeat_at < clock_timestamp() - make_interval(secs => :timeout)
+        RETURNING backend_pid, backend_start
+    )
+    SELECT count(*) FILTER (WHERE pg_terminate_backend(a.pid))
+    FROM dead
+    JOIN pg_stat_activity a
+        ON a.pid = dead.backend_pid
+        AND a.backend_start = dead.backend_start
+        AND a.application_name = :application_name
+    """
+)
+
+LIVE_WORKERS_SQL = text("SELECT count(*) FROM dispatcher_workers")
+
+TRY_LOCK_SQL = text("SELECT pg_try_advisory_lock(:namespace, :shard)")
+UNLOCK_SQL = text("SELECT pg_advisory_unlock(:namespace, :shard)")
+UNREGISTER_SQL = text("DELETE FROM dispatcher_workers WHERE worker_id = :worker_id")
+
+
+class ShardLeases:
+    """
+    Shards leased by one dispatcher worker, held as session advisory locks.
+
+    The locks live on a dedicated connection, so a crashed worker gives its shards
+    back as soon as Postgres sees the connection close. Workers also heartbeat into
+    dispatcher_workers; one that stays silent past the lease timeout (hung, or cut
+    off without the connection closing) has its backend terminated by the others,
+    provided that backend is still the one it registered.
+    Every heartbeat rebalances towards an even share of ceil(shards / live workers):
+    surplus shards are unlocked for newcomers and free ones are picked up.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        shards: int,
+        heartbeat_seconds: float,
+        lease_timeout_seconds: float,
+        worker_id: str | None = None,
+    ) -> None:
+        self.engine = engine
+        self.shards = shards
+        self.heartbeat_seconds = heartbeat_seconds
+        self.lease_timeout_seconds = lease_timeout_seconds
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+        self.held: set[int] = set()
+        self._conn: Connection | None = None
+        self._last_heartbeat = 0.0
+        # Workers scan for free shards from different offsets so they don't all race
+        # for the same ones when they start together.
+        self._offset = zlib.crc32(self.worker_id.encode()) % shards
+
+    def _connection(self) -> Connection:
+        if self._conn is None or self._conn.closed or self._conn.invalidated:
+            self._reset()
+            self._conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            self._conn.execute(text(f"SET application_name = '{APPLICATION_NAME}'"))
+        return self._conn
+
+    def _reset(self) -> None:
+        self.held.clear()
+        if self._conn is not None:
+            # Closed rather than returned to the pool, so no other user inherits its
+            # session: its advisory locks or its application_name
+            try:
+                self._conn.invalidate()
+                self._conn.close()
+            except DBAPIError:
+                pass
+        self._conn = None
+
+    def _params(self, shard: int) -> dict:
+        return {"namespace": LOCK_NAMESPACE, "shard": shard}
+
+    def heartbeat(self) -> set[int]:
+        """Record liveness, evict dead workers and rebalance. Returns the shards held."""
+        self._last_heartbeat = time.monotonic()
+        try:
+            conn = self._connection()
+            conn.execute(
+                HEARTBEAT_SQL, {"worker_id": self.worker_id, "shard_count": len(self.held)}
+            )
+            evicted = conn.execute(
+                REAP_SQL,
+                {"timeout": self.lease_timeout_seconds, "application_name": APPLICATION_NAME},
+            ).scalar()
+            if evicted:
+                print(f"Evicted {evicted} unresponsive dispatcher workers")
+            live = conn.execute(LIVE_WORKERS_SQL).scalar() or 1
+            self._rebalance(conn, math.ceil(self.shards / live))
+        except DBAPIError as e:
+            # Without the lock connection the leases are gone; start over next time
+            print(f"Lost dispatcher lease connection: {e}")
+            self._reset()
+        return set(self.held)
+
+    def heartbeat_if_due(self) -> set[int]:
+        """Heartbeat if the interval has passed; call between units of work."""
+        if time.monotonic() - self._last_heartbeat >= self.heartbeat_seconds:
+            return self.heartbeat()
+        return set(self.held)
+
+    def _rebalance(self, conn: Connection, target: int) -> None:
+        for shard in sorted(self.held)[target:]:
+            conn.execute(UNLOCK_SQL, self._params(shard))
+            self.held.discard(shard)
+
+        for i in range(self.shards):
+            if len(self.held) >= target:
+                break
+            shard = (self._offset + i) % self.shards
+            if shard not in self.held and conn.execute(TRY_LOCK_SQL, self._params(shard)).scalar():
+                self.held.add(shard)
+
+    def release(self) -> None:
+        """Give up all shards and unregister, e.g. on shutdown."""
+        if self._conn is not None and not self._conn.closed:
+            try:
+                self._conn.execute(text("SELECT pg_advisory_unlock_all()"))
+                self._conn.execute(UNREGISTER_SQL, {"worker_id": self.worker_id})
+            except DBAPIError as e:
+                print(f"Failed to release dispatcher leases: {e}")
+        self._reset()
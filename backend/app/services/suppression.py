@@ -0,0 +1,186 @@
+import hashlib
+import threading
+import time
+from collections.abc import Iterable
+from uuid import UUID
+
+from sqlalchemy import delete, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import metrics
+from app.services import counters
+
+SUPPRESSED_STATUSES = ("bounced", "unsubscribed")
+SUPPRESSION_REASONS = ("bounced", "unsubscribed", "complaint", "manual")
+
+# Collection version (see counters.bump_collection) of a workspace's suppressed addresses
+COLLECTION = "suppressions"
+
+# One round trip per check: the workspace's version, and which of the addresses
+# are on the global list (an index probe; that list changes outside any workspace)
+CHECK_SQL = text(
+    """
+    SELECT
+        (SELECT value FROM workspace_counters
+         WHERE workspace_id = :workspace_id AND metric = :metric AND dimension = :collection),
+        ARRAY(SELECT email FROM suppressions
+              WHERE workspace_id IS NULL AND email = ANY(CAST(:emails AS text[])))
+    """
+)
+
+
+def normalize(email: str) -> str:
+    return email.strip().lower()
+
+
+def address_key(email: str) -> int:
+    """64-bit hash of a normalized address; sets of ints are far smaller than of strings."""
+    digest = hashlib.blake2b(normalize(email).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def mark_changed(db: Session, workspace_id: UUID) -> None:
+    """
+    Record that a workspace's suppressed addresses changed, inside the caller's
+    transaction. Every process reloads its copy on its next check after commit.
+    """
+    counters.bump_collection(db, workspace_id, COLLECTION)
+
+
+def contacts_changed(
+    db: Session, workspace_id: UUID, old_status: str | None, new_status: str | None
+) -> None:
+    """
+    Call inside the transaction when contacts change status or address, or are
+    created or deleted (None). Only suppressed statuses affect the index.
+    """
+    if old_status in SUPPRESSED_STATUSES or new_status in SUPPRESSED_STATUSES:
+        mark_changed(db, workspace_id)
+
+
+class SuppressionIndex:
+    """
+    Per-workspace sets of hashed suppressed addresses, each tagged with the
+    workspace's suppressions version. Every check reads the version and reloads
+    a stale set, so a change is seen by every process as soon as it commits.
+    """
+
+    def __init__(self) -> None:
+        self._sets: dict[UUID, tuple[int, set[int]]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session, workspace_id: UUID) -> set[int]:
+        keys: set[int] = set()
+        suppressions = db.query(models.Suppression.email).filter(
+            models.Suppression.workspace_id == workspace_id
+        )
+        keys.update(address_key(email) for (email,) in suppressions)
+
+        # The redundant `!= 'active'` lets Postgres use contacts_workspace_suppressed_idx
+        contacts = db.query(models.Contact.email).filter(
+            models.Contact.workspace_id == workspace_id,
+            models.Contact.status != "active",
+            models.Contact.status.in_(SUPPRESSED_STATUSES),
+        )
+        keys.update(address_key(email) for (email,) in contacts)
+
+        metrics.increment("suppression.loads")
+        return keys
+
+    def _get(self, db: Session, workspace_id: UUID, version: int) -> set[int]:
+        entry = self._sets.get(workspace_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        # Reading the version before loading means a change committed in between
+        # is either in this set or bumps the version past it
+        keys = self._load(db, workspace_id)
+        with self._lock:
+            current = self._sets.get(workspace_id)
+            if current is None or current[0] <= version:
+                self._sets[workspace_id] = (version, keys)
+        return keys
+
+    def filter(
+        self, db: Session, workspace_id: UUID, emails: Iterable[str]
+    ) -> tuple[list[str], list[str]]:
+        """Split recipients into (allowed, suppressed) without per-recipient queries."""
+        started = time.perf_counter()
+        emails = list(emails)
+        version, global_hits = db.execute(
+            CHECK_SQL,
+            {
+                "workspace_id": workspace_id,
+                "metric": counters.COLLECTION_VERSION,
+                "collection": COLLECTION,
+                "emails": sorted({normalize(email) for email in emails}),
+            },
+        ).one()
+        workspace_keys = self._get(db, workspace_id, version or 0)
+        global_hits = set(global_hits)
+
+        allowed: list[str] = []
+        suppressed: list[str] = []
+        for email in emails:
+            if address_key(email) in workspace_keys or normalize(email) in global_hits:
+                suppressed.append(email)
+            else:
+                allowed.append(email)
+
+        metrics.observe("suppression.lookup", time.perf_counter() - started)
+        metrics.increment("suppression.checked", len(allowed) + len(suppressed))
+        metrics.increment("suppression.suppressed", len(suppressed))
+        return allowed, suppressed
+
+    def is_suppressed(self, db: Session, workspace_id: UUID, email: str) -> bool:
+        return bool(self.filter(db, workspace_id, [email])[1])
+
+
+suppression_index = SuppressionIndex()
+
+
+def suppress(
+    db: Session, workspace_id: UUID | None, emails: Iterable[str], reason: str = "manual"
+) -> list[str]:
+    """
+    Add addresses to a workspace's suppression list, or the global one when
+    `workspace_id` is None. Returns the addresses that weren't listed yet; the
+    caller commits.
+    """
+    addresses = sorted({normalize(email) for email in emails})
+    if not addresses:
+        return []
+
+    rows = [{"workspace_id": workspace_id, "email": email, "reason": reason} for email in addresses]
+    inserted = db.execute(
+        insert(models.Suppression)
+        .values(rows)
+        .on_conflict_do_nothing(constraint="suppressions_workspace_email_idx")
+        .returning(models.Suppression.email)
+    ).scalars()
+    added = list(inserted)
+    if added and workspace_id is not None:
+        mark_changed(db, workspace_id)
+    return added
+
+
+def unsuppress(db: Session, workspace_id: UUID | None, email: str) -> bool:
+    """
+    Remove an address from a suppression list; the caller commits. The address
+    stays suppressed while a contact with it is bounced or unsubscribed.
+    """
+    workspace_filter = (
+        models.Suppression.workspace_id.is_(None)
+        if workspace_id is None
+        else models.Suppression.workspace_id == workspace_id
+    )
+    result = db.execute(
+        delete(models.Suppression).where(
+            workspace_filter, models.Suppression.email == normalize(email)
+        )
+    )
+    if result.rowcount and workspace_id is not None:
+        mark_changed(db, workspace_id)
+    return result.rowcount > 0
@@ -0,0 +1,103 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import String, func, literal, select, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+def _newest_first(statement, model, after: tuple[datetime, UUID] | None, limit: int):
+    """Limit one source to its own next page before the sources are merged."""
+    if after:
+        statement = statement.where(tuple_(model.created_at, model.id) < tuple_(*after))
+    return statement.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+
+
+def contact_timeline(
+    db: Session,
+    workspace_id: UUID,
+    contact_id: UUID,
+    after: tuple[datetime, UUID] | None,
+    limit: int,
+) -> list:
+    """
+    Emails, enrollments and activity of a contact merged newest first, in one
+    UNION ALL query. Each branch fetches at most `limit` rows from its own
+    (contact, created_at, id) index, so a page never reads more than 3 * limit rows.
+    Rows have kind, id, type, occurred_at and data.
+    """
+    emails = _newest_first(
+        select(
+            literal("email", String).label("kind"),
+            models.OutboundEmail.id,
+            models.OutboundEmail.status.label("type"),
+            models.OutboundEmail.created_at.label("occurred_at"),
+            func.jsonb_build_object(
+                "subject",
+                models.OutboundEmail.subject,
+                "sequence_id",
+                models.OutboundEmail.sequence_id,
+                "step_id",
+                models.OutboundEmail.step_id,
+                "sent_at",
+                models.OutboundEmail.sent_at,
+                "error_message",
+                models.OutboundEmail.error_message,
+            ).label("data"),
+        ).where(models.OutboundEmail.contact_id == contact_id),
+        models.OutboundEmail,
+        after,
+        limit,
+    )
+
+    enrollments = _newest_first(
+        select(
+            literal("enrollment", String).label("kind"),
+            models.SequenceEnrollment.id,
+            models.SequenceEnrollment.status.label("type"),
+            models.SequenceEnrollment.created_at.label("occurred_at"),
+            func.jsonb_build_object(
+                "sequence_id",
+                models.SequenceEnrollment.sequence_id,
+                "sequence_name",
+                models.Sequence.name,
+                "last_step_sent",
+                models.SequenceEnrollment.last_step_sent,
+                "next_scheduled_at",
+                models.SequenceEnrollment.next_scheduled_at,
+            ).label("data"),
+        )
+        .join(models.Sequence)
+        .where(models.SequenceEnrollment.contact_id == contact_id),
+        models.SequenceEnrollment,
+        after,
+        limit,
+    )
+
+    activity = _newest_first(
+        select(
+            literal("activity", String).label("kind"),
+            models.ActivityLog.id,
+            models.ActivityLog.type,
+            models.ActivityLog.created_at.label("occurred_at"),
+            models.ActivityLog.payload.label("data"),
+        ).where(
+            # Matches activity_log_contact_created_idx, including its partial predicate
+            models.ActivityLog.payload.has_key("contact_id"),
+            models.ActivityLog.payload["contact_id"].astext == str(contact_id),
+            models.ActivityLog.workspace_id == workspace_id,
+        ),
+        models.ActivityLog,
+        after,
+        limit,
+    )
+
+    merged = union_all(
+        *(branch.subquery().select() for branch in (emails, enrollments, activity))
+    ).subquery()
+    return db.execute(
+        select(merged)
+        .order_by(merged.c.occurred_at.desc(), merged.c.id.desc())
+        .limit(limit)
+    ).all()
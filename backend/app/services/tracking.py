@@ -0,0 +1,240 @@
+import base64
+import hashlib
+import hmac
+import html
+import re
+import threading
+from functools import lru_cache
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.core.db import get_session
+
+OPEN = b"o"
+CLICK = b"c"
+
+# Trailing punctuation is treated as part of the sentence, not the link
+URL_PATTERN = re.compile(r"https?://[^\s<>\"']*[^\s<>\"'.,;:!?)]")
+
+# Flush early once this many emails have pending counts
+MAX_PENDING = 10_000
+# Stop holding on to counts that failed to flush beyond this many emails
+MAX_RETAINED = 100_000
+
+# One statement per flush: add the counts per email, then count first opens and
+# clicks (rows whose first_*_at was set by this statement) into the step rollup.
+FLUSH_SQL = text(
+    """
+    WITH events AS (
+        SELECT * FROM unnest(
+            CAST(:email_ids AS uuid[]), CAST(:opens AS int[]), CAST(:clicks AS int[])
+        ) AS e(email_id, opens, clicks)
+    ), engagement AS (
+        INSERT INTO email_engagement AS g
+            (outbound_email_id, opens, clicks, first_opened_at, first_clicked_at, last_event_at)
+        SELECT e.email_id, e.opens, e.clicks,
+            CASE WHEN e.opens > 0 THEN now() END,
+            CASE WHEN e.clicks > 0 THEN now() END,
+            now()
+        FROM events e
+        JOIN outbound_emails o ON o.id = e.email_id
+        ON CONFLICT (outbound_email_id) DO UPDATE SET
+            opens = g.opens + EXCLUDED.opens,
+            clicks = g.clicks + EXCLUDED.clicks,
+            first_opened_at = COALESCE(g.first_opened_at, EXCLUDED.first_opened_at),
+            first_clicked_at = COALESCE(g.first_clicked_at, EXCLUDED.first_clicked_at),
+            last_event_at = EXCLUDED.last_event_at
+        RETURNING outbound_email_id,
+            first_opened_at = now() AS first_open,
+            first_clicked_at = now() AS first_click
+    )
+    INSERT INTO sequence_daily_stats (id, sequence_id, step_id, day, opened, clicked)
+    SELECT gen_random_uuid(), o.sequence_id, o.step_id, CAST(timezone('UTC', now()) AS date),
+        count(*) FILTER (WHERE g.first_open),
+        count(*) FILTER (WHERE g.first_click)
+    FROM engagement g
+    JOIN outbound_emails o ON o.id = g.outbound_email_id
+    WHERE o.sequence_id IS NOT NULL AND (g.first_open OR g.first_click)
+    GROUP BY o.sequence_id, o.step_id
+    ON CONFLICT (sequence_id, step_id, day) DO UPDATE SET
+        opened = sequence_daily_stats.opened + EXCLUDED.opened,
+        clicked = sequence_daily_stats.clicked + EXCLUDED.clicked
+    """
+)
+
+
+# ============ Tokens ============
+
+
+@lru_cache
+def _signing_key() -> bytes:
+    settings = get_settings()
+    if settings.tracking_secret:
+        return settings.tracking_secret.encode()
+    return hmac.new(settings.clerk_secret_key.encode(), b"email-tracking", "sha256").digest()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def make_token(kind: bytes, email_id: UUID, url: str = "") -> str:
+    """Signed, self-contained token: the event kind, the email and (for clicks) the target."""
+    payload = kind + email_id.bytes + url.encode()
+    signature = hmac.new(_signing_key(), payload, hashlib.sha256).digest()[:12]
+    return f"{_b64encode(payload)}.{_b64encode(signature)}"
+
+
+def read_token(token: str, kind: bytes) -> tuple[UUID, str] | None:
+    """(email_id, url) from a token of the given kind, or None if it's invalid or forged."""
+    try:
+        encoded_payload, encoded_signature = token.split(".", 1)
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except ValueError:
+        return None
+
+    expected = hmac.new(_signing_key(), payload, hashlib.sha256).digest()[:12]
+    if not hmac.compare_digest(signature, expected) or payload[:1] != kind:
+        return None
+    if len(payload) < 17:
+        return None
+
+    try:
+        url = payload[17:].decode()
+    except UnicodeDecodeError:
+        return None
+    return UUID(bytes=payload[1:17]), url
+
+
+def open_url(email_id: UUID) -> str:
+    return f"{get_settings().tracking_base_url}/t/o/{make_token(OPEN, email_id)}.gif"
+
+
+def click_url(email_id: UUID, url: str) -> str:
+    return f"{get_settings().tracking_base_url}/t/c/{make_token(CLICK, email_id, url)}"
+
+
+def instrument(email_id: UUID, body: str) -> tuple[str, str]:
+    """
+    Plain text and HTML versions of a body with links routed through click
+    tracking; the HTML version also carries the open pixel.
+    """
+    text_body = URL_PATTERN.sub(lambda m: click_url(email_id, m.group(0)), body)
+
+    parts = []
+    position = 0
+    for match in URL_PATTERN.finditer(body):
+        parts.append(html.escape(body[position : match.start()]))
+        href = html.escape(click_url(email_id, match.group(0)))
+        parts.append(f'<a href="{href}">{html.escape(match.group(0))}</a>')
+        position = match.end()
+    parts.append(html.escape(body[position:]))
+
+    html_body = (
+        "<html><body>"
+        + "".join(parts).replace("\n", "<br>\n")
+        + f'<img src="{html.escape(open_url(email_id))}" width="1" height="1" alt="">'
+        + "</body></html>"
+    )
+    return text_body, html_body
+
+
+# ============ Buffered counts ============
+
+
+class TrackingBuffer:
+    """
+    Open and click counts per email, held in memory and written in batches.
+
+    Recording a hit only touches a dict under a lock. A background thread writes
+    everything pending every TRACKING_FLUSH_SECONDS (sooner once MAX_PENDING emails
+    are waiting) in a single statement. Counts still buffered when a process is
+    killed are lost, which is the price of keeping hits off the database.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[UUID, list[int]] = {}  # email_id -> [opens, clicks]
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+    def add(self, email_id: UUID, kind: bytes) -> None:
+        with self._lock:
+            counts = self._pending.setdefault(email_id, [0, 0])
+            counts[0 if kind == OPEN else 1] += 1
+            full = len(self._pending) >= MAX_PENDING
+        if full:
+            self._wake.set()
+
+    def _restore(self, pending: dict[UUID, list[int]]) -> None:
+        with self._lock:
+            if len(self._pending) + len(pending) > MAX_RETAINED:
+                metrics.increment("tracking.dropped", len(pending))
+                return
+            for email_id, (opens, clicks) in pending.items():
+                counts = self._pending.setdefault(email_id, [0, 0])
+                counts[0] += opens
+                counts[1] += clicks
+
+    def flush(self) -> int:
+        """Write pending counts. Returns the number of emails flushed."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        params = {"email_ids": [], "opens": [], "clicks": []}
+        for email_id, (opens, clicks) in pending.items():
+            params["email_ids"].append(str(email_id))
+            params["opens"].append(opens)
+            params["clicks"].append(clicks)
+
+        db = get_session()
+        try:
+            with metrics.timer("tracking.flush"):
+                db.execute(FLUSH_SQL, params)
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Failed to flush tracking events: {e}")
+            self._restore(pending)
+            return 0
+        finally:
+            db.close()
+
+        metrics.increment("tracking.flushed_emails", len(pending))
+        return len(pending)
+
+    def _run(self) -> None:
+        interval = get_settings().tracking_flush_seconds
+        while not self._stopping:
+            self._wake.wait(interval)
+            self._wake.clear()
+            self.flush()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="tracking-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write whatever is left."""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+tracking_buffer = TrackingBuffer()
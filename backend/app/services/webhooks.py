@@ -0,0 +1,297 @@
+import hashlib
+import hmac
+import ipaddress
+import json
+import secrets
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+from uuid import UUID
+
+from sqlalchemy import any_, func, tuple_
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import metrics
+from app.core.config import get_settings
+from app.services import outbox
+
+if TYPE_CHECKING:
+    import httpx
+
+SIGNATURE_HEADER = "X-InboxPilot-Signature"
+
+
+def new_secret() -> str:
+    return f"whsec_{secrets.token_urlsafe(24)}"
+
+
+def sign(secret: str, timestamp: int, body: bytes) -> str:
+    """Signature receivers check: HMAC-SHA256 over '<timestamp>.<body>'."""
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256)
+    return f"t={timestamp},v1={digest.hexdigest()}"
+
+
+def serialize(events: list[models.OutboxEvent]) -> bytes:
+    return json.dumps(
+        {
+            "events": [
+                {
+                    "id": str(event.event_id),
+                    "sequence": event.id,
+                    "type": event.type,
+                    "workspace_id": str(event.workspace_id),
+                    "created_at": event.created_at.isoformat(),
+                    "data": event.payload,
+                }
+                for event in events
+            ]
+        },
+        separators=(",", ":"),
+    ).encode()
+
+
+def backoff(attempts: int) -> timedelta:
+    settings = get_settings()
+    seconds = settings.webhook_backoff_base_seconds * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.webhook_backoff_max_seconds))
+
+
+def blocked_reason(url: str) -> str | None:
+    """
+    Why `url` can't be a receiver, or None if it can. Every address the host
+    resolves to must be public: otherwise a workspace could point deliveries at
+    the worker's own network (loopback, private and link-local ranges, including
+    cloud metadata endpoints). Checked on creation and again before each delivery,
+    since DNS can change in between.
+    """
+    parts = urlsplit(url)
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError:
+        return "Invalid port"
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return "URL must be http(s) with a host"
+    if get_settings().webhook_allow_private_urls:
+        return None
+
+    try:
+        addresses = socket.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError):
+        return f"Cannot resolve {parts.hostname}"
+
+    for *_, sockaddr in addresses:
+        # Drop an IPv6 zone ("fe80::1%eth0") and unwrap IPv4-mapped addresses
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            return f"{parts.hostname} resolves to a non-public address"
+    return None
+
+
+def post(client: "httpx.Client", url: str, secret: str, body: bytes) -> str | None:
+    """
+    Deliver one batch. Returns None on a 2xx, else the error. Only the status or
+    exception type is kept: the receiver's response body, or a connection error's
+    details, would tell the workspace more about the network than it should see.
+    """
+    # Only the delivery worker posts; the API imports this module without httpx
+    import httpx
+
+    reason = blocked_reason(url)
+    if reason:
+        return f"Blocked: {reason}"
+
+    headers = {
+        "Content-Type": "application/json",
+        SIGNATURE_HEADER: sign(secret, int(time.time()), body),
+    }
+    try:
+        # A redirect could lead anywhere, including to an address blocked above
+        response = client.post(url, content=body, headers=headers, follow_redirects=False)
+    except httpx.HTTPError as e:
+        return type(e).__name__
+    if response.is_success:
+        return None
+    return f"HTTP {response.status_code}"
+
+
+@dataclass
+class Batch:
+    """Events leased for delivery to one subscriber, detached from the claiming session."""
+
+    subscription_id: UUID
+    lease_id: str
+    url: str
+    secret: str
+    # The cursor when the batch was read; if it moved (a replay), the result is dropped
+    cursor: tuple[int, int]
+    first_event_id: int
+    last_event: tuple[int, int]  # (txid, id)
+    event_count: int
+    body: bytes
+
+
+def claim_due(
+    db: Session, limit: int, below_txid: int, lease_id: str
+) -> list[models.WebhookSubscription]:
+    """
+    Lease active subscriptions with undelivered events that aren't backing off.
+    The caller commits. Locked and leased rows are skipped, so several delivery
+    workers never deliver to the same subscriber at once; a lease left behind by
+    a worker that died frees up after WEBHOOK_LEASE_SECONDS.
+    """
+    has_pending = (
+        db.query(models.OutboxEvent.id)
+        .filter(
+            models.OutboxEvent.workspace_id == models.WebhookSubscription.workspace_id,
+            models.OutboxEvent.txid < below_txid,
+            models.WebhookSubscription.event_types.is_(None)
+            | (models.OutboxEvent.type == any_(models.WebhookSubscription.event_types)),
+            tuple_(models.OutboxEvent.txid, models.OutboxEvent.id)
+            > tuple_(
+                models.WebhookSubscription.cursor_txid,
+                models.WebhookSubscription.cursor_event_id,
+            ),
+        )
+        .exists()
+    )
+    subscriptions = (
+        db.query(models.WebhookSubscription)
+        .filter(
+            models.WebhookSubscription.is_active.is_(True),
+            (models.WebhookSubscription.next_attempt_at.is_(None))
+            | (models.WebhookSubscription.next_attempt_at <= func.now()),
+            (models.WebhookSubscription.leased_until.is_(None))
+            | (models.WebhookSubscription.leased_until < func.now()),
+            has_pending,
+        )
+        .order_by(models.WebhookSubscription.last_delivered_at.asc().nullsfirst())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    leased_until = datetime.now(timezone.utc) + timedelta(
+        seconds=get_settings().webhook_lease_seconds
+    )
+    for subscription in subscriptions:
+        subscription.leased_by = lease_id
+        subscription.leased_until = leased_until
+    return subscriptions
+
+
+def record_result(db: Session, batch: Batch, error: str | None) -> None:
+    """
+    Advance the cursor on success; back off, or dead-letter the batch, on failure.
+    Releases the lease. Does nothing if the lease was lost or the cursor was moved
+    while the batch was in flight. The caller commits.
+    """
+    subscription = (
+        db.query(models.WebhookSubscription)
+        .filter_by(id=batch.subscription_id, leased_by=batch.lease_id)
+        .with_for_update()
+        .first()
+    )
+    if subscription is None:
+        metrics.increment("webhooks.lost_leases")
+        return
+
+    subscription.leased_by = None
+    subscription.leased_until = None
+    if (subscription.cursor_txid, subscription.cursor_event_id) != batch.cursor:
+        return
+
+    now = datetime.now(timezone.utc)
+    if error is None:
+        subscription.cursor_txid, subscription.cursor_event_id = batch.last_event
+        subscription.attempts = 0
+        subscription.next_attempt_at = None
+        subscription.last_error = None
+        subscription.last_delivered_at = now
+        metrics.increment("webhooks.delivered_events", batch.event_count)
+        return
+
+    subscription.attempts += 1
+    subscription.last_error = error
+    metrics.increment("webhooks.failed_deliveries")
+
+    if subscription.attempts < get_settings().webhook_max_attempts:
+        subscription.next_attempt_at = now + backoff(subscription.attempts)
+        return
+
+    # Give up on this batch so later events aren't held back behind it forever
+    db.add(
+        models.WebhookDeadLetter(
+            subscription_id=subscription.id,
+            first_event_id=batch.first_event_id,
+            last_event_id=batch.last_event[1],
+            event_count=batch.event_count,
+            error=error,
+        )
+    )
+    subscription.cursor_txid, subscription.cursor_event_id = batch.last_event
+    subscription.attempts = 0
+    subscription.next_attempt_at = None
+    metrics.increment("webhooks.dead_lettered_events", batch.event_count)
+
+
+def deliver_due(db: Session, client: "httpx.Client", pool: ThreadPoolExecutor) -> int:
+    """
+    One delivery round: a batch of pending events to each due subscriber, with up
+    to webhook_concurrency requests in flight. Returns batches attempted.
+
+    Subscribers are leased and committed before anything is posted, so no
+    transaction stays open while receivers respond: an open one would hold back
+    visible_txid, and so delivery by every other worker, behind the slowest endpoint.
+    Results are recorded in a second transaction.
+    """
+    settings = get_settings()
+    lease_id = secrets.token_hex(8)
+    below_txid = outbox.visible_txid(db)
+    subscriptions = claim_due(db, settings.webhook_concurrency, below_txid, lease_id)
+
+    batches = []
+    for subscription in subscriptions:
+        events = outbox.read_after(db, subscription, settings.webhook_batch_size, below_txid)
+        if not events:
+            subscription.leased_by = None
+            subscription.leased_until = None
+            continue
+        batches.append(
+            Batch(
+                subscription_id=subscription.id,
+                lease_id=lease_id,
+                url=subscription.url,
+                secret=subscription.secret,
+                cursor=(subscription.cursor_txid, subscription.cursor_event_id),
+                first_event_id=events[0].id,
+                last_event=(events[-1].txid, events[-1].id),
+                event_count=len(events),
+                body=serialize(events),
+            )
+        )
+    db.commit()
+
+    futures = [pool.submit(post, client, batch.url, batch.secret, batch.body) for batch in batches]
+    for batch, future in zip(batches, futures):
+        record_result(db, batch, future.result())
+
+    db.commit()
+    return len(batches)
+
+
+def replay_from(
+    db: Session, subscription: models.WebhookSubscription, event: models.OutboxEvent
+) -> None:
+    """Move a subscription's cursor back so delivery resumes at `event`. The caller commits."""
+    subscription.cursor_txid = event.txid
+    subscription.cursor_event_id = event.id - 1
+    subscription.attempts = 0
+    subscription.next_attempt_at = None
+    # A batch in flight from the old position is dropped when its result comes in
@@ -0,0 +1,36 @@
+"""
+Rebuild the daily sequence analytics rollup from enrollments and outbound emails.
+
+Usage (from backend/):
+    python -m app.workers.backfill_sequence_analytics [--sequence-id UUID]
+"""
+
+import argparse
+from uuid import UUID
+
+from app import models
+from app.core.db import get_session
+from app.services.sequence_analytics import backfill_sequence
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill sequence analytics rollups")
+    parser.add_argument("--sequence-id", type=UUID, help="Only backfill this sequence")
+    args = parser.parse_args()
+
+    db = get_session()
+    try:
+        if args.sequence_id:
+            sequence_ids = [args.sequence_id]
+        else:
+            sequence_ids = [row.id for row in db.query(models.Sequence.id).all()]
+
+        for sequence_id in sequence_ids:
+            rows = backfill_sequence(db, sequence_id)
+            print(f"Backfilled {rows} rollup rows for sequence {sequence_id}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Sequence dispatcher: sends due sequence steps.
+
+Due enrollments are partitioned into DISPATCHER_SHARDS shards by a hash of their
+workspace. Each worker leases a share of the shards (see services.shard_leases), so
+a workspace is only ever handled by one worker at a time: its sends go out in order
+and its send rate limit can be enforced locally. Run as many workers as needed;
+shards rebalance as workers start and stop.
+
+Usage (from backend/):
+    python -m app.workers.dispatcher [--interval 5] [--once]
+"""
+
+import argparse
+import signal
+import time
+from collections import Counter
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.core import rate_limit
+from app.core.config import get_settings
+from app.core.db import get_session
+from app.services.dispatcher import dispatch_enrollment, due_enrollments
+from app.services.shard_leases import ShardLeases
+
+
+def dispatch_batch(leases: ShardLeases, batch_size: int) -> Counter:
+    """Send one batch of due steps from the leased shards."""
+    outcomes: Counter = Counter()
+    held = leases.heartbeat_if_due()
+    throttled: set = set()
+
+    db = get_session()
+    try:
+        due = due_enrollments(db, held, leases.shards, batch_size)
+        db.rollback()
+
+        for enrollment_id, workspace_id, shard in due:
+            held = leases.heartbeat_if_due()
+            if shard not in held or workspace_id in throttled:
+                continue
+
+            # Leave the rest of a throttled workspace for a later batch, in order
+            if rate_limit.check("send", "workspace", str(workspace_id)):
+                throttled.add(workspace_id)
+                outcomes["throttled"] += 1
+                continue
+
+            try:
+                outcomes[dispatch_enrollment(db, enrollment_id, workspace_id)] += 1
+            except Exception as e:
+                db.rollback()
+                outcomes["error"] += 1
+                print(f"Failed to dispatch enrollment {enrollment_id}: {e}")
+    finally:
+        db.close()
+
+    return outcomes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Send due sequence steps")
+    parser.add_argument("--interval", type=float, default=5, help="Seconds to wait when idle")
+    parser.add_argument("--once", action="store_true", help="Run a single batch and exit")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    # Session advisory locks need a real session, not a PgBouncer transaction slot
+    lock_engine = create_engine(
+        settings.dispatcher_lock_url or settings.database_url, poolclass=NullPool
+    )
+    leases = ShardLeases(
+        lock_engine,
+        shards=settings.dispatcher_shards,
+        heartbeat_seconds=settings.dispatcher_heartbeat_seconds,
+        lease_timeout_seconds=settings.dispatcher_lease_timeout_seconds,
+    )
+
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    try:
+        held = leases.heartbeat()
+        print(f"Dispatcher {leases.worker_id} started with {len(held)} shards")
+        while not stopping:
+            outcomes = dispatch_batch(leases, settings.dispatcher_batch_size)
+            if outcomes:
+                summary = ", ".join(f"{name}={count}" for name, count in sorted(outcomes.items()))
+                print(f"Dispatched batch: {summary}")
+
+            if args.once:
+                break
+            dispatched = sum(outcomes.values()) - outcomes["throttled"]
+            if dispatched < settings.dispatcher_batch_size:
+                time.sleep(args.interval)
+    finally:
+        leases.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Background job worker: runs jobs queued with services.jobs.enqueue().
+
+Each worker runs one job at a time; run more workers for more throughput. Per-type
+limits (JOB_CONCURRENCY) hold across all workers. Failed jobs are retried with
+exponential backoff, and jobs left running by a worker that died are requeued
+once their heartbeat is older than JOB_HEARTBEAT_TIMEOUT_SECONDS.
+
+Usage (from backend/):
+    python -m app.workers.jobs [--interval 2] [--once]
+"""
+
+import argparse
+import os
+import signal
+import socket
+import time
+
+from app.core.db import get_session
+from app.services import jobs
+from app.services import bulk_enroll  # noqa: F401  (registers its job handler)
+
+REQUEUE_INTERVAL_SECONDS = 60
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background jobs")
+    parser.add_argument("--interval", type=float, default=2, help="Seconds to wait when idle")
+    parser.add_argument("--once", action="store_true", help="Run queued jobs, then exit")
+    args = parser.parse_args()
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"Job worker {worker_id} started ({', '.join(sorted(jobs.HANDLERS))})")
+    next_requeue = 0.0
+    while not stopping:
+        db = get_session()
+        try:
+            if time.monotonic() >= next_requeue:
+                requeued = jobs.requeue_stale(db)
+                if requeued:
+                    print(f"Recovered {requeued} jobs from unresponsive workers")
+                next_requeue = time.monotonic() + REQUEUE_INTERVAL_SECONDS
+
+            job = jobs.claim(db, worker_id)
+            if job:
+                job_id, job_type = job.id, job.type
+                started = time.monotonic()
+                outcome = jobs.run(db, job)
+                print(f"Job {job_id} ({job_type}) {outcome} in {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            db.rollback()
+            job = None
+            print(f"Job worker error: {e}")
+        finally:
+            db.close()
+
+        if job is None:
+            if args.once:
+                break
+            time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Periodic reconciliation of workspace dashboard counters.
+
+Usage (from backend/):
+    python -m app.workers.reconcile_counters [--interval 3600] [--once]
+"""
+
+import argparse
+import time
+
+from app.core.db import get_session
+from app.services.counters import reconcile_all
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconcile workspace dashboard counters")
+    parser.add_argument("--interval", type=int, default=3600, help="Seconds between runs")
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit")
+    args = parser.parse_args()
+
+    while True:
+        started = time.monotonic()
+        db = get_session()
+        try:
+            count = reconcile_all(db)
+            elapsed = time.monotonic() - started
+            print(f"Reconciled counters for {count} workspaces in {elapsed:.1f}s")
+        except Exception as e:
+            db.rollback()
+            print(f"Counter reconciliation failed: {e}")
+        finally:
+            db.close()
+
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Reply detection: stops sequence enrollments when the contact replies.
+
+Reads the reply mailbox incrementally (IMAP by UID, or a local maildir) and
+matches each message's In-Reply-To / References headers against the Message-IDs
+written by core.email.send_email.
+
+Usage (from backend/):
+    python -m app.workers.replies [--maildir PATH] [--interval 60] [--once]
+
+Without --maildir the REPLY_IMAP_* settings are used.
+"""
+
+import argparse
+import time
+
+from app.core.config import get_settings
+from app.core.db import get_session
+from app.services.replies import ImapSource, MaildirSource, process_batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stop enrollments that received a reply")
+    parser.add_argument("--maildir", help="Read a local maildir instead of IMAP")
+    parser.add_argument("--interval", type=int, default=60, help="Seconds between polls")
+    parser.add_argument("--batch-size", type=int, default=500, help="Messages per batch")
+    parser.add_argument("--once", action="store_true", help="Drain the mailbox once and exit")
+    args = parser.parse_args()
+
+    if args.maildir:
+        source = MaildirSource(args.maildir)
+    else:
+        settings = get_settings()
+        if not settings.reply_imap_host:
+            parser.error("Set REPLY_IMAP_HOST or pass --maildir")
+        source = ImapSource(
+            settings.reply_imap_host,
+            settings.reply_imap_port,
+            settings.reply_imap_username or "",
+            settings.reply_imap_password or "",
+            mailbox=settings.reply_imap_mailbox,
+            ssl=settings.reply_imap_ssl,
+        )
+
+    while True:
+        db = get_session()
+        try:
+            while True:
+                result = process_batch(db, source, args.batch_size)
+                if result["messages"]:
+                    print(
+                        f"Read {result['messages']} messages from {source.name}: "
+                        f"{result['replies']} replies, {result['stopped']} enrollments stopped"
+                    )
+                if result["messages"] < args.batch_size:
+                    break
+        except Exception as e:
+            db.rollback()
+            print(f"Reply detection failed: {e}")
+        finally:
+            db.close()
+
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Manage the global suppression list, which applies to every workspace.
+
+Addresses are given as arguments or read one per line from --file. Sends check
+the global list in the database, so running processes see a change as soon as
+it commits.
+
+Usage (from backend/):
+    python -m app.workers.suppressions add [--reason complaint] [--file FILE] [EMAIL ...]
+    python -m app.workers.suppressions remove [--file FILE] [EMAIL ...]
+"""
+
+import argparse
+import sys
+
+from app.core.db import get_session
+from app.services import suppression
+
+
+def read_addresses(args: argparse.Namespace) -> list[str]:
+    addresses = list(args.emails)
+    if args.file:
+        with open(args.file) as f:
+            addresses.extend(line.split(",", 1)[0].strip().strip('"') for line in f)
+    return [address for address in addresses if "@" in address]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Manage the global suppression list")
+    parser.add_argument("action", choices=("add", "remove"))
+    parser.add_argument("emails", nargs="*")
+    parser.add_argument("--file", help="File with one address per line")
+    parser.add_argument("--reason", choices=suppression.SUPPRESSION_REASONS, default="manual")
+    args = parser.parse_args()
+
+    addresses = read_addresses(args)
+    if not addresses:
+        parser.error("no addresses given")
+
+    db = get_session()
+    try:
+        if args.action == "add":
+            added = suppression.suppress(db, None, addresses, args.reason)
+            db.commit()
+            print(f"Added {len(added)} of {len(addresses)} addresses to the global list")
+        else:
+            removed = sum(suppression.unsuppress(db, None, address) for address in addresses)
+            db.commit()
+            print(f"Removed {removed} of {len(addresses)} addresses from the global list")
+    except Exception as e:
+        db.rollback()
+        print(f"Updating the global suppression list failed: {e}")
+        return 1
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
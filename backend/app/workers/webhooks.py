@@ -0,0 +1,71 @@
+"""
+Webhook delivery: sends outbox events to subscribed endpoints.
+
+Each round leases up to WEBHOOK_CONCURRENCY subscribers with pending events and
+posts one batch to each in parallel over a shared keep-alive connection pool.
+Failed subscribers back off exponentially; after WEBHOOK_MAX_ATTEMPTS the batch
+is dead-lettered and delivery moves on. Several workers can run side by side.
+
+Usage (from backend/):
+    python -m app.workers.webhooks [--interval 2] [--once]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import httpx
+
+from app.core.config import get_settings
+from app.core.db import get_session
+from app.services import outbox, webhooks
+
+PURGE_INTERVAL_SECONDS = 3600
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Deliver webhook events")
+    parser.add_argument("--interval", type=float, default=2, help="Seconds to wait when idle")
+    parser.add_argument("--once", action="store_true", help="Run a single round and exit")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    limits = httpx.Limits(
+        max_connections=settings.webhook_concurrency,
+        max_keepalive_connections=settings.webhook_concurrency,
+    )
+    last_purge = 0.0
+
+    with (
+        httpx.Client(
+            timeout=settings.webhook_timeout_seconds, limits=limits, follow_redirects=False
+        ) as client,
+        ThreadPoolExecutor(max_workers=settings.webhook_concurrency) as pool,
+    ):
+        while True:
+            db = get_session()
+            try:
+                delivered = webhooks.deliver_due(db, client, pool)
+
+                if time.monotonic() - last_purge > PURGE_INTERVAL_SECONDS:
+                    retention = timedelta(days=settings.outbox_retention_days)
+                    purged = outbox.purge(db, retention)
+                    last_purge = time.monotonic()
+                    if purged:
+                        print(f"Purged {purged} old outbox events")
+            except Exception as e:
+                db.rollback()
+                delivered = 0
+                print(f"Webhook delivery failed: {e}")
+            finally:
+                db.close()
+
+            if args.once:
+                break
+            if not delivered:
+                time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+CPU cost versus bytes saved of response compression.
+
+Builds payloads shaped like the largest list responses (a page of contacts, an
+unpaginated enrollment list embedding contacts, activity with JSONB payloads) and
+compresses each with every available encoding over a range of levels, exactly as
+app.core.compression does. Reports the compression ratio, CPU time per MB and
+bytes saved per CPU millisecond. Fails if an encoding at its default level costs
+more than --max-ms-per-mb. No database needed.
+
+Usage (from backend/):
+    python bench/compression.py [--enrollments 2000] [--repeat 20] [--max-ms-per-mb 50]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.compression import available_encodings, compress  # noqa: E402
+
+# Defaults of the COMPRESSION_* settings
+DEFAULT_LEVELS = {"gzip": 4, "br": 4, "zstd": 3}
+LEVELS = {"gzip": (1, 4, 6, 9), "br": (1, 4, 6, 9), "zstd": (1, 3, 6, 12)}
+
+FIRST_NAMES = ["Ada", "Grace", "Alan", "Edsger", "Barbara", "Donald", "Frances", "Ken"]
+LAST_NAMES = ["Lovelace", "Hopper", "Turing", "Dijkstra", "Liskov", "Knuth", "Allen"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries"]
+
+
+def timestamp(rng: random.Random) -> str:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return (start + timedelta(seconds=rng.randrange(30_000_000))).isoformat()
+
+
+def contact(rng: random.Random, workspace_id: str) -> dict:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    company = rng.choice(COMPANIES)
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "workspace_id": workspace_id,
+        "email": f"{first}.{last}{rng.randrange(1000)}@{company.lower().replace(' ', '')}.com",
+        "first_name": first,
+        "last_name": last,
+        "company": company,
+        "title": rng.choice(["CEO", "CTO", "VP Sales", "Head of Growth", None]),
+        "status": rng.choice(["active"] * 8 + ["bounced", "unsubscribed"]),
+        "created_at": timestamp(rng),
+    }
+
+
+def payloads(enrollments: int) -> dict[str, bytes]:
+    rng = random.Random(42)
+    workspace_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    sequence_id = str(uuid.UUID(int=rng.getrandbits(128)))
+
+    contacts = [contact(rng, workspace_id) for _ in range(100)]
+    enrollment_list = [
+        {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "sequence_id": sequence_id,
+            "contact_id": (embedded := contact(rng, workspace_id))["id"],
+            "status": rng.choice(["active", "active", "completed", "stopped"]),
+            "last_step_sent": rng.randrange(4),
+            "next_scheduled_at": timestamp(rng),
+            "created_at": timestamp(rng),
+            "contact": embedded,
+        }
+        for _ in range(enrollments)
+    ]
+    activity = [
+        {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "workspace_id": workspace_id,
+            "user_id": None,
+            "type": "contact.enrolled",
+            "payload": {
+                "enrollment_id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "sequence_id": sequence_id,
+                "sequence_name": "Q3 outbound",
+                "contact_id": (subject := rng.choice(contacts))["id"],
+                "contact_email": subject["email"],
+            },
+            "created_at": timestamp(rng),
+            "user": None,
+        }
+        for _ in range(100)
+    ]
+    return {
+        "contacts (100)": json.dumps(contacts).encode(),
+        f"enrollments ({enrollments})": json.dumps(enrollment_list).encode(),
+        "activity (100)": json.dumps(activity).encode(),
+    }
+
+
+def measure(encoding: str, level: int, body: bytes, repeat: int) -> tuple[int, float]:
+    """Compressed size and CPU seconds per compression."""
+    started = time.process_time()
+    for _ in range(repeat):
+        compressed = compress(encoding, level, body)
+    return len(compressed), (time.process_time() - started) / repeat
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Response compression cost/benefit")
+    parser.add_argument("--enrollments", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-ms-per-mb", type=float, default=50.0)
+    args = parser.parse_args()
+
+    encodings = list(available_encodings())
+    missing = sorted(set(DEFAULT_LEVELS) - set(encodings))
+    if missing:
+        print(f"Not installed: {', '.join(missing)} (pip install -e '.[compression]')")
+
+    failures = []
+    for name, body in payloads(args.enrollments).items():
+        size_mb = len(body) / (1024 * 1024)
+        print(f"\n{name}: {len(body) / 1024:.1f} KB")
+        print(
+            f"  {'encoding':10} {'level':>5} {'ratio':>7} {'ms':>8} {'ms/MB':>8} "
+            f"{'KB saved/ms':>12}"
+        )
+        for encoding in encodings:
+            for level in LEVELS[encoding]:
+                size, seconds = measure(encoding, level, body, args.repeat)
+                ms = seconds * 1000
+                saved_per_ms = (len(body) - size) / 1024 / ms if ms else float("inf")
+                marker = "*" if level == DEFAULT_LEVELS[encoding] else " "
+                print(
+                    f"  {encoding:10} {level:>4}{marker} {len(body) / size:>6.1f}x "
+                    f"{ms:>8.2f} {ms / size_mb:>8.1f} {saved_per_ms:>12.0f}"
+                )
+                if level == DEFAULT_LEVELS[encoding] and ms / size_mb > args.max_ms_per_mb:
+                    failures.append(
+                        f"{encoding} level {level} on {name}: {ms / size_mb:.1f} ms/MB "
+                        f"exceeds {args.max_ms_per_mb:.1f}"
+                    )
+
+    print("\n* default level (COMPRESSION_*_LEVEL / COMPRESSION_BROTLI_QUALITY)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Memory benchmark for streaming exports.
+
+Seeds a scratch workspace with N contacts in the database at DATABASE_URL, then
+runs the contacts export end to end through stream_export() once per format, each
+in a fresh subprocess, and reports how far the process's peak RSS grew during
+the export. RSS includes memory libpq allocates in C, so a client-side cursor
+buffering the whole result set shows up even though the Python heap stays small.
+Fails when the growth exceeds the threshold. The scratch workspace is deleted
+at the end.
+
+Usage (from backend/, against a disposable local Postgres):
+    python bench/export_memory.py [--rows 1000000] [--format csv] [--gzip] [--max-rss-mb 64]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, text  # noqa: E402
+
+from app import models  # noqa: E402
+from app.core.db import get_session  # noqa: E402
+from app.services.export import EXPORT_FORMATS, stream_export  # noqa: E402
+
+SEED_SQL = text(
+    """
+    INSERT INTO contacts (id, workspace_id, email, first_name, last_name, company, title, status)
+    SELECT gen_random_uuid(), :workspace_id, 'bench' || n || '@example.com',
+           'First' || n, 'Last' || n, 'Company ' || (n % 1000), 'Title', 'active'
+    FROM generate_series(1, :rows) AS n
+    """
+)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_export(workspace_id: uuid.UUID, fmt: str, gzip: bool) -> dict:
+    """Export in this process and measure it; meant to run in a fresh subprocess."""
+    statement = (
+        select(
+            models.Contact.id,
+            models.Contact.email,
+            models.Contact.first_name,
+            models.Contact.last_name,
+            models.Contact.company,
+            models.Contact.title,
+            models.Contact.status,
+            models.Contact.created_at,
+        )
+        .where(models.Contact.workspace_id == workspace_id)
+        .order_by(models.Contact.created_at)
+    )
+
+    # Connect once first so the pool and driver don't count towards the export
+    get_session().close()
+    baseline = peak_rss_mb()
+    started = time.monotonic()
+    total_bytes = 0
+    for chunk in stream_export(get_session, statement, fmt, gzip):
+        total_bytes += len(chunk)
+    return {
+        "bytes": total_bytes,
+        "seconds": time.monotonic() - started,
+        "baseline_mb": baseline,
+        "growth_mb": peak_rss_mb() - baseline,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Streaming export memory benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=(*EXPORT_FORMATS, "all"), default="all")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--max-rss-mb", type=float, default=64.0)
+    parser.add_argument("--workspace-id", type=uuid.UUID, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.workspace_id:
+        # Child: one export, results as JSON on stdout
+        print(json.dumps(run_export(args.workspace_id, args.format, args.gzip)))
+        return 0
+
+    formats = list(EXPORT_FORMATS) if args.format == "all" else [args.format]
+    failures = []
+    workspace_id = uuid.uuid4()
+    db = get_session()
+    try:
+        db.add(models.Workspace(id=workspace_id, name="export-benchmark"))
+        db.flush()
+        started = time.monotonic()
+        db.execute(SEED_SQL, {"workspace_id": workspace_id, "rows": args.rows})
+        db.commit()
+        print(f"Seeded {args.rows} contacts in {time.monotonic() - started:.1f}s")
+
+        for fmt in formats:
+            command = [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--workspace-id",
+                str(workspace_id),
+                "--format",
+                fmt,
+            ]
+            if args.gzip:
+                command.append("--gzip")
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+
+            elapsed = result["seconds"]
+            print(
+                f"{fmt}{' (gzip)' if args.gzip else ''}: exported "
+                f"{result['bytes'] / (1024 * 1024):.1f} MB in {elapsed:.1f}s "
+                f"({args.rows / elapsed:,.0f} rows/s), peak RSS grew "
+                f"{result['growth_mb']:.1f} MB over {result['baseline_mb']:.1f} MB"
+            )
+            if result["growth_mb"] > args.max_rss_mb:
+                failures.append(
+                    f"{fmt}: peak RSS grew {result['growth_mb']:.1f} MB, "
+                    f"more than {args.max_rss_mb:.1f} MB"
+                )
+    finally:
+        db.rollback()
+        db.query(models.Workspace).filter_by(id=workspace_id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
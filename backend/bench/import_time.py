@@ -0,0 +1,96 @@
+"""
+Import-time benchmark for the API.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter and fails
+when the cumulative import time exceeds a threshold, when modules that should be
+loaded lazily (OpenAI SDK, OpenTelemetry exporters) show up at import, or when
+the import builds Settings.
+
+Usage (from backend/):
+    python bench/import_time.py [--threshold-ms 1500] [--runs 5] [--top 15]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# Modules that must not be imported by `import app.main` with telemetry disabled
+LAZY_MODULES = ("openai", "opentelemetry.exporter", "opentelemetry.sdk", "clerk_backend_api")
+
+# Exits with this status when importing the target built Settings
+SETTINGS_BUILT = 3
+CHECK_SETTINGS = (
+    "import sys; config = sys.modules.get('app.core.config'); "
+    f"sys.exit({SETTINGS_BUILT} if config and config.get_settings.cache_info().currsize else 0)"
+)
+
+LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(target: str) -> list[tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) for every module imported by `target`."""
+    env = dict(os.environ)
+    env.pop("OTEL_EXPORTER_OTLP_ENDPOINT", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}; {CHECK_SETTINGS}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if proc.returncode == SETTINGS_BUILT:
+        raise SystemExit(f"FAIL: importing {target} built Settings; read them in functions")
+    if proc.returncode != 0:
+        lines = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        raise SystemExit(f"Importing {target} failed:\n" + "\n".join(lines))
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target", default="app.main")
+    parser.add_argument("--threshold-ms", type=float, default=1500.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    totals = []
+    modules: list[tuple[str, int, int]] = []
+    for _ in range(args.runs):
+        modules = measure(args.target)
+        target_row = next((m for m in modules if m[0] == args.target), None)
+        if target_row is None:
+            raise SystemExit(f"{args.target} not found in -X importtime output")
+        totals.append(target_row[2] / 1000)
+
+    median_ms = statistics.median(totals)
+    print(f"import {args.target}: median {median_ms:.1f} ms over {args.runs} runs")
+    print("\nSlowest modules (self time, last run):")
+    slowest = sorted(modules, key=lambda m: m[1], reverse=True)[: args.top]
+    for name, self_us, cumulative_us in slowest:
+        print(f"  {self_us / 1000:8.1f} ms  {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+
+    failed = False
+    eager = sorted({m[0] for m in modules if m[0].startswith(LAZY_MODULES)})
+    if eager:
+        print(f"\nFAIL: lazily loaded modules imported eagerly: {', '.join(eager[:10])}")
+        failed = True
+
+    if median_ms > args.threshold_ms:
+        print(f"\nFAIL: {median_ms:.1f} ms exceeds threshold of {args.threshold_ms:.1f} ms")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,419 @@
+"""
+Query plan regression check for the hot read paths.
+
+Seeds scratch workspaces in the database at DATABASE_URL, calls the real route
+functions (and the dispatcher's due-enrollment scan) while recording the SQL
+they emit, then runs EXPLAIN (FORMAT JSON) on every captured SELECT. Fails when
+a plan sequentially scans a large table, or when a statement's estimated total
+cost grows past --max-cost-ratio times the checked-in baseline (or the baseline
+is missing). Baseline entries are keyed by case name and statement fingerprint,
+so adding or reordering queries only affects the statements that changed. The
+scratch workspaces are deleted at the end.
+
+Usage (from backend/, against a disposable local Postgres with migrations applied):
+    python bench/query_plans.py [--workspaces 20] [--contacts 5000] [--max-cost-ratio 2.0]
+
+After an intended plan change, refresh and commit the baseline:
+    python bench/query_plans.py --update-baseline
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import Response  # noqa: E402
+
+from app import models  # noqa: E402
+from app.api import (  # noqa: E402
+    routes_activity,
+    routes_contacts,
+    routes_emails,
+    routes_sequences,
+)
+from app.api.pagination import encode_cursor  # noqa: E402
+from app.core.config import get_settings  # noqa: E402
+from app.core.db import get_engine, get_session  # noqa: E402
+from app.schemas import ContactCreate  # noqa: E402
+from app.services import dispatcher  # noqa: E402
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "query_plans_baseline.json"
+)
+WORKSPACE_PREFIX = "plan-bench-"
+
+# Tables that stay small per installation, where a sequential scan is the right plan
+SMALL_TABLES = {
+    "users",
+    "workspaces",
+    "workspace_members",
+    "workspace_counters",
+    "sequences",
+    "sequence_steps",
+}
+
+# Placeholders and literals, which vary between runs without changing the statement
+LITERAL_RE = re.compile(r"%\(\w+\)s|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+# A parameter list of any length, as expanded IN (...) clauses are
+LIST_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+
+SEEDED_TABLES = (
+    "contacts",
+    "sequences",
+    "sequence_steps",
+    "sequence_enrollments",
+    "outbound_emails",
+    "activity_log",
+)
+
+SEED_SQL = [
+    text(
+        """
+        INSERT INTO contacts (id, workspace_id, email, first_name, last_name, company, status,
+                              created_at)
+        SELECT gen_random_uuid(), w.id, 'c' || n || '@example.com', 'First' || n, 'Last' || n,
+               'Company ' || (n % 500),
+               CASE WHEN n % 50 = 0 THEN 'bounced'
+                    WHEN n % 70 = 0 THEN 'unsubscribed'
+                    ELSE 'active' END,
+               now() - n * interval '1 minute'
+        FROM unnest(CAST(:workspace_ids AS uuid[])) AS w(id)
+        CROSS JOIN generate_series(1, :contacts) AS n
+        """
+    ),
+    text(
+        """
+        INSERT INTO sequences (id, workspace_id, name)
+        SELECT gen_random_uuid(), w.id, 'Sequence ' || n
+        FROM unnest(CAST(:workspace_ids AS uuid[])) AS w(id)
+        CROSS JOIN generate_series(1, :sequences) AS n
+        """
+    ),
+    text(
+        """
+        INSERT INTO sequence_steps (id, sequence_id, step_order, subject_template, body_template)
+        SELECT gen_random_uuid(), s.id, 1, 'Hello {{first_name}}', 'Hi {{first_name}}'
+        FROM sequences s
+        WHERE s.workspace_id = ANY(CAST(:workspace_ids AS uuid[]))
+        """
+    ),
+    # Every contact in one sequence of its workspace; ~1% due now, 20% finished
+    text(
+        """
+        WITH s AS (
+            SELECT id, workspace_id,
+                   row_number() OVER (PARTITION BY workspace_id ORDER BY id) - 1 AS k
+            FROM sequences WHERE workspace_id = ANY(CAST(:workspace_ids AS uuid[]))
+        ), c AS (
+            SELECT id, workspace_id,
+                   row_number() OVER (PARTITION BY workspace_id ORDER BY id) AS n
+            FROM contacts WHERE workspace_id = ANY(CAST(:workspace_ids AS uuid[]))
+        )
+        INSERT INTO sequence_enrollments (id, sequence_id, contact_id, status,
+                                          next_scheduled_at, created_at)
+        SELECT gen_random_uuid(), s.id, c.id,
+               CASE WHEN c.n % 5 = 0 THEN 'completed' ELSE 'active' END,
+               CASE WHEN c.n % 5 = 0 THEN NULL
+                    WHEN c.n % 100 = 1 THEN now() - interval '1 minute'
+                    ELSE now() + (c.n % 10000) * interval '1 minute' END,
+               now() - c.n * interval '1 minute'
+        FROM c JOIN s ON s.workspace_id = c.workspace_id AND s.k = c.n % :sequences
+        """
+    ),
+    # A few emails per enrollment over the last 30 days; ~2% failed, ~1% still queued
+    text(
+        """
+        INSERT INTO outbound_emails (id, workspace_id, contact_id, sequence_id, step_id,
+                                     subject, body, status, created_at)
+        SELECT gen_random_uuid(), c.workspace_id, e.contact_id, e.sequence_id, st.id,
+               'Hello', 'Hi',
+               CASE WHEN x.bucket < 2 THEN 'failed'
+                    WHEN x.bucket < 3 THEN 'queued'
+                    ELSE 'sent' END,
+               now() - random() * interval '30 days'
+        FROM sequence_enrollments e
+        JOIN contacts c ON c.id = e.contact_id
+        JOIN sequence_steps st ON st.sequence_id = e.sequence_id
+        CROSS JOIN generate_series(1, :emails) AS n
+        CROSS JOIN LATERAL (SELECT (abs(hashtext(e.id::text)) + n) % 100 AS bucket) AS x
+        WHERE c.workspace_id = ANY(CAST(:workspace_ids AS uuid[]))
+        """
+    ),
+    text(
+        """
+        INSERT INTO activity_log (id, workspace_id, type, payload, created_at)
+        SELECT gen_random_uuid(), w.id, 'contact.created', '{}'::jsonb,
+               now() - n * interval '1 minute'
+        FROM unnest(CAST(:workspace_ids AS uuid[])) AS w(id)
+        CROSS JOIN generate_series(1, :activity) AS n
+        """
+    ),
+    text(
+        """
+        INSERT INTO activity_log (id, workspace_id, type, payload, created_at)
+        SELECT gen_random_uuid(), workspace_id, 'contact.created',
+               jsonb_build_object('contact_id', id::text, 'contact_email', email), created_at
+        FROM contacts WHERE workspace_id = ANY(CAST(:workspace_ids AS uuid[]))
+        """
+    ),
+]
+
+
+def make_request() -> Request:
+    return Request(
+        {"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""}
+    )
+
+
+def vacuum(command: str) -> None:
+    """
+    Run `command` on the seeded tables. Dead rows left by earlier runs inflate
+    table and index sizes, and with them the estimated costs, from run to run.
+    """
+    with get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in SEEDED_TABLES:
+            conn.exec_driver_sql(f"{command} {table}")
+
+
+def seed(db, args) -> tuple[models.Workspace, models.User, models.Sequence, models.Contact]:
+    workspaces = [
+        models.Workspace(id=uuid.uuid4(), name=f"{WORKSPACE_PREFIX}{n}")
+        for n in range(args.workspaces)
+    ]
+    user = models.User(
+        id=uuid.uuid4(),
+        clerk_user_id=f"{WORKSPACE_PREFIX}{uuid.uuid4().hex}",
+        email="plan-bench@example.com",
+    )
+    db.add_all([*workspaces, user])
+    db.flush()
+    db.add(models.WorkspaceMember(workspace_id=workspaces[0].id, user_id=user.id, role="owner"))
+
+    params = {
+        "workspace_ids": [str(workspace.id) for workspace in workspaces],
+        "contacts": args.contacts,
+        "sequences": args.sequences,
+        "activity": args.activity,
+        "emails": args.emails,
+    }
+    for statement in SEED_SQL:
+        db.execute(statement, params)
+    db.commit()
+    vacuum("VACUUM ANALYZE")
+
+    sequence = db.query(models.Sequence).filter_by(workspace_id=workspaces[0].id).first()
+    contact = db.query(models.Contact).filter_by(workspace_id=workspaces[0].id).first()
+    return workspaces[0], user, sequence, contact
+
+
+def cases(db, workspace, user, sequence, contact) -> dict:
+    """Named coroutine factories; each runs one hot read path."""
+
+    def list_contacts(search=None, status_filter=None):
+        return routes_contacts.list_contacts(
+            request=make_request(),
+            response=Response(),
+            workspace=workspace,
+            db=db,
+            search=search,
+            status_filter=status_filter,
+            limit=50,
+            offset=0,
+        )
+
+    async def create_duplicate_contact():
+        data = ContactCreate(workspace_id=workspace.id, email="c1@example.com")
+        try:
+            await routes_contacts.create_contact(data=data, db=db, current_user=user)
+        except HTTPException:
+            pass
+        db.rollback()
+
+    def list_emails(status_filter=None, sequence_id=None, cursor=None):
+        return routes_emails.list_emails(
+            workspace=workspace,
+            db=db,
+            status_filter=status_filter,
+            sequence_id=sequence_id,
+            step_id=None,
+            since=None,
+            until=None,
+            cursor=cursor,
+            limit=50,
+        )
+
+    # A page two weeks deep, where OFFSET pagination would have to skip half the history
+    deep_cursor = encode_cursor(
+        datetime.now(timezone.utc) - timedelta(days=14), uuid.UUID(int=2**128 - 1)
+    )
+
+    async def due_enrollments():
+        shards = get_settings().dispatcher_shards
+        dispatcher.due_enrollments(db, set(range(shards)), shards, 100)
+
+    return {
+        "contacts.list": lambda: list_contacts(),
+        "contacts.search": lambda: list_contacts(search="Company 42"),
+        "contacts.by_status": lambda: list_contacts(status_filter="bounced"),
+        "contacts.create_duplicate": create_duplicate_contact,
+        "enrollments.list": lambda: routes_sequences.list_enrollments(
+            sequence_id=sequence.id,
+            request=make_request(),
+            response=Response(),
+            workspace=workspace,
+            db=db,
+        ),
+        "contacts.emails": lambda: routes_contacts.list_contact_emails(
+            contact_id=contact.id,
+            workspace=workspace,
+            db=db,
+            status_filter=None,
+            cursor=None,
+            limit=50,
+        ),
+        "contacts.timeline": lambda: routes_contacts.get_contact_timeline(
+            contact_id=contact.id, workspace=workspace, db=db, cursor=None, limit=50
+        ),
+        "emails.list": lambda: list_emails(),
+        "emails.list_deep_page": lambda: list_emails(cursor=deep_cursor),
+        "emails.failed": lambda: list_emails(status_filter="failed"),
+        "emails.queued": lambda: list_emails(status_filter="queued"),
+        "emails.by_sequence": lambda: list_emails(sequence_id=sequence.id),
+        "activity.list": lambda: routes_activity.list_activity(
+            workspace=workspace, db=db, limit=50, offset=0
+        ),
+        "dispatcher.due_enrollments": due_enrollments,
+    }
+
+
+def capture(db, run) -> list[tuple[str, object]]:
+    """SELECT statements (with their parameters) issued while running `run`."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        asyncio.run(run())
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+        db.rollback()
+    return statements
+
+
+def fingerprint(statement: str) -> str:
+    """Stable id of a statement's shape: literals, placeholders and spacing normalized."""
+    normalized = LIST_RE.sub("?", LITERAL_RE.sub("?", " ".join(statement.split())))
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def walk(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+def explain(db, statement: str, parameters) -> dict:
+    connection = db.connection()
+    result = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN-based query plan regression check")
+    parser.add_argument("--workspaces", type=int, default=20)
+    parser.add_argument("--contacts", type=int, default=5000, help="Contacts per workspace")
+    parser.add_argument("--sequences", type=int, default=20, help="Sequences per workspace")
+    parser.add_argument("--emails", type=int, default=3, help="Emails per enrollment")
+    parser.add_argument("--activity", type=int, default=5000, help="Activity rows per workspace")
+    parser.add_argument("--max-cost-ratio", type=float, default=2.0)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="Print every captured statement")
+    args = parser.parse_args()
+
+    baseline = {}
+    if not args.update_baseline:
+        if not os.path.exists(BASELINE_PATH):
+            print(f"FAIL: {BASELINE_PATH} is missing; create it with --update-baseline")
+            return 1
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+
+    failures = []
+    costs = {}
+    vacuum("VACUUM")
+    db = get_session()
+    try:
+        workspace, user, sequence, contact = seed(db, args)
+        print(f"Seeded {args.workspaces} workspaces x {args.contacts} contacts")
+
+        for name, run in cases(db, workspace, user, sequence, contact).items():
+            for statement, parameters in capture(db, run):
+                key = f"{name}:{fingerprint(statement)}"
+                if key in costs:
+                    continue
+                plan = explain(db, statement, parameters)
+                db.rollback()
+                cost = plan["Total Cost"]
+                costs[key] = cost
+
+                if args.verbose:
+                    print(f"{key}: {' '.join(statement.split())}")
+
+                for node in walk(plan):
+                    table = node.get("Relation Name")
+                    if node["Node Type"] == "Seq Scan" and table not in SMALL_TABLES:
+                        failures.append(f"{key}: sequential scan on {table}")
+
+                expected = baseline.get(key)
+                if expected and cost > expected * args.max_cost_ratio:
+                    failures.append(
+                        f"{key}: estimated cost {cost:.1f} is over "
+                        f"{args.max_cost_ratio}x the baseline {expected:.1f}"
+                    )
+                print(f"{key:48} cost {cost:>12.1f}  baseline {expected or '-':>12}")
+    finally:
+        db.rollback()
+        db.query(models.Workspace).filter(
+            models.Workspace.name.like(f"{WORKSPACE_PREFIX}%")
+        ).delete(synchronize_session=False)
+        db.query(models.User).filter(
+            models.User.clerk_user_id.like(f"{WORKSPACE_PREFIX}%")
+        ).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({key: round(cost, 1) for key, cost in sorted(costs.items())}, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {BASELINE_PATH}; commit it alongside the change")
+    else:
+        failures.extend(
+            f"{key}: no baseline; rerun with --update-baseline"
+            for key in sorted(set(costs) - set(baseline))
+        )
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Local stand-in for a webhook subscriber.
+
+Listens for deliveries from `python -m app.workers.webhooks`, checks the
+signature, and prints each batch. --fail-rate makes it answer 503 to a share
+of requests, to watch backoff and dead-lettering in action.
+
+Usage (from backend/):
+    python bench/webhook_receiver.py --port 9000 --secret whsec_... [--fail-rate 0.3]
+
+Then subscribe it:  POST /webhooks?workspace_id=...  {"url": "http://localhost:9000/"}
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import random
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SIGNATURE_HEADER = "X-InboxPilot-Signature"
+
+
+def verify(secret: str, header: str, body: bytes) -> bool:
+    parts = dict(part.split("=", 1) for part in header.split(",") if "=" in part)
+    expected = hmac.new(
+        secret.encode(), f"{parts.get('t', '')}.".encode() + body, hashlib.sha256
+    ).hexdigest()
+    return hmac.compare_digest(expected, parts.get("v1", ""))
+
+
+def make_handler(secret: str | None, fail_rate: float) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 so the delivery worker's keep-alive connections are reused
+        protocol_version = "HTTP/1.1"
+
+        def respond(self, status: int) -> None:
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            if secret and not verify(secret, self.headers.get(SIGNATURE_HEADER, ""), body):
+                print("Rejected: bad signature")
+                self.respond(401)
+                return
+
+            if random.random() < fail_rate:
+                print("Failing this delivery on purpose")
+                self.respond(503)
+                return
+
+            events = json.loads(body)["events"]
+            first, last = events[0]["sequence"], events[-1]["sequence"]
+            print(f"Received {len(events)} events ({first}..{last})")
+            for event in events:
+                print(f"  {event['sequence']} {event['type']} {json.dumps(event['data'])}")
+            self.respond(204)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Print webhook deliveries")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--secret", help="Subscription secret; signatures unchecked if omitted")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests to fail")
+    args = parser.parse_args()
+
+    handler = make_handler(args.secret, args.fail_rate)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"Listening on http://127.0.0.1:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
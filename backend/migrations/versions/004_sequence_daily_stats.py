@@ -0,0 +1,53 @@
+"""Add daily per-sequence analytics rollup
+
+Revision ID: 004_sequence_daily_stats
+Revises: 003_workspace_counters
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "004_sequence_daily_stats"
+down_revision: Union[str, None] = "003_workspace_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sequence_daily_stats",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("sequence_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("step_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("enrolled", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sent", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("completed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("stopped", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(
+            ["sequence_id"], ["sequences.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["step_id"], ["sequence_steps.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        # NULLS NOT DISTINCT (Postgres 15+) so sequence-level rows (step_id NULL) upsert too
+        sa.UniqueConstraint(
+            "sequence_id",
+            "step_id",
+            "day",
+            name="sequence_daily_stats_key_idx",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sequence_daily_stats")
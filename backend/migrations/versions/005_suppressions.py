@@ -0,0 +1,58 @@
+"""Add suppression list
+
+Revision ID: 005_suppressions
+Revises: 004_sequence_daily_stats
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "005_suppressions"
+down_revision: Union[str, None] = "004_sequence_daily_stats"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "suppressions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("workspace_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("reason", sa.String(), nullable=False, server_default="manual"),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["workspace_id"], ["workspaces.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "workspace_id",
+            "email",
+            name="suppressions_workspace_email_idx",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    # Loading a workspace's suppression set reads only non-active contacts
+    op.create_index(
+        "contacts_workspace_suppressed_idx",
+        "contacts",
+        ["workspace_id"],
+        postgresql_where=sa.text("status <> 'active'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("contacts_workspace_suppressed_idx", table_name="contacts")
+    op.drop_table("suppressions")
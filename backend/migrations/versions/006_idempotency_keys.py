@@ -0,0 +1,48 @@
+"""Add idempotency keys
+
+Revision ID: 006_idempotency_keys
+Revises: 005_suppressions
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "006_idempotency_keys"
+down_revision: Union[str, None] = "005_suppressions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("request_hash", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False, server_default="in_progress"),
+        sa.Column("response_status", sa.Integer(), nullable=True),
+        sa.Column("response_body", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["users.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("user_id", "key"),
+    )
+    op.create_index("idempotency_keys_expires_idx", "idempotency_keys", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idempotency_keys_expires_idx", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
@@ -0,0 +1,38 @@
+"""Add updated_at to contacts, sequences and sequence steps
+
+Revision ID: 007_updated_at
+Revises: 006_idempotency_keys
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007_updated_at"
+down_revision: Union[str, None] = "006_idempotency_keys"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("contacts", "sequences", "sequence_steps")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                "updated_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=False,
+            ),
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, "updated_at")
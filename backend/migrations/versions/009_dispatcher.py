@@ -0,0 +1,48 @@
+"""Add dispatcher worker heartbeats and due enrollment index
+
+Revision ID: 009_dispatcher
+Revises: 008_rate_limit_buckets
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "009_dispatcher"
+down_revision: Union[str, None] = "008_rate_limit_buckets"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dispatcher_workers",
+        sa.Column("worker_id", sa.String(), nullable=False),
+        sa.Column("backend_pid", sa.Integer(), nullable=False),
+        sa.Column("shard_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "started_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("worker_id"),
+    )
+
+    # The dispatcher polls for active enrollments whose next step is due
+    op.create_index(
+        "sequence_enrollments_due_idx",
+        "sequence_enrollments",
+        ["next_scheduled_at"],
+        postgresql_where=sa.text("status = 'active'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("sequence_enrollments_due_idx", table_name="sequence_enrollments")
+    op.drop_table("dispatcher_workers")
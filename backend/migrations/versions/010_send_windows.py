@@ -0,0 +1,46 @@
+"""Add workspace send windows
+
+Revision ID: 010_send_windows
+Revises: 009_dispatcher
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "010_send_windows"
+down_revision: Union[str, None] = "009_dispatcher"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "workspaces",
+        sa.Column("timezone", sa.String(), nullable=False, server_default="UTC"),
+    )
+    op.add_column(
+        "workspaces",
+        sa.Column("send_window_start", sa.Time(), nullable=False, server_default="09:00"),
+    )
+    op.add_column(
+        "workspaces",
+        sa.Column("send_window_end", sa.Time(), nullable=False, server_default="17:00"),
+    )
+    op.add_column(
+        "workspaces",
+        sa.Column(
+            "send_on_weekends", sa.Boolean(), nullable=False, server_default=sa.false()
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("workspaces", "send_on_weekends")
+    op.drop_column("workspaces", "send_window_end")
+    op.drop_column("workspaces", "send_window_start")
+    op.drop_column("workspaces", "timezone")
@@ -0,0 +1,50 @@
+"""Add email engagement and open/click rollups
+
+Revision ID: 011_email_engagement
+Revises: 010_send_windows
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "011_email_engagement"
+down_revision: Union[str, None] = "010_send_windows"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "email_engagement",
+        sa.Column("outbound_email_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("opens", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("clicks", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("first_opened_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("first_clicked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_event_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["outbound_email_id"], ["outbound_emails.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("outbound_email_id"),
+    )
+
+    op.add_column(
+        "sequence_daily_stats",
+        sa.Column("opened", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "sequence_daily_stats",
+        sa.Column("clicked", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sequence_daily_stats", "clicked")
+    op.drop_column("sequence_daily_stats", "opened")
+    op.drop_table("email_engagement")
@@ -0,0 +1,38 @@
+"""Add mailbox cursors for reply detection
+
+Revision ID: 012_mailbox_cursors
+Revises: 011_email_engagement
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "012_mailbox_cursors"
+down_revision: Union[str, None] = "011_email_engagement"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "mailbox_cursors",
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("uidvalidity", sa.BigInteger(), nullable=False),
+        sa.Column("last_uid", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("source"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("mailbox_cursors")
@@ -0,0 +1,50 @@
+"""Add outbound email history indexes
+
+Revision ID: 014_outbound_email_indexes
+Revises: 013_webhooks
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "014_outbound_email_indexes"
+down_revision: Union[str, None] = "013_webhooks"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, leading column, partial index predicate). Every index ends in
+# (created_at, id) to serve the newest-first keyset pagination of the history views.
+INDEXES = [
+    ("outbound_emails_workspace_created_idx", "workspace_id", None),
+    ("outbound_emails_contact_created_idx", "contact_id", None),
+    ("outbound_emails_sequence_created_idx", "sequence_id", "sequence_id IS NOT NULL"),
+    ("outbound_emails_step_created_idx", "step_id", "step_id IS NOT NULL"),
+    # Failed and queued emails are a small share of the table but the ones people look for
+    ("outbound_emails_workspace_failed_idx", "workspace_id", "status = 'failed'"),
+    ("outbound_emails_workspace_queued_idx", "workspace_id", "status = 'queued'"),
+]
+
+
+def upgrade() -> None:
+    # Built concurrently so sends can keep writing to outbound_emails meanwhile;
+    # CONCURRENTLY can't run inside the migration's transaction
+    with op.get_context().autocommit_block():
+        for name, column, where in INDEXES:
+            op.create_index(
+                name,
+                "outbound_emails",
+                [column, "created_at", "id"],
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name="outbound_emails", postgresql_concurrently=True)
@@ -0,0 +1,53 @@
+"""Add contact timeline indexes
+
+Revision ID: 015_contact_timeline
+Revises: 014_outbound_email_indexes
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "015_contact_timeline"
+down_revision: Union[str, None] = "014_outbound_email_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently so writes to both tables continue meanwhile; CONCURRENTLY
+    # can't run inside the migration's transaction
+    with op.get_context().autocommit_block():
+        # Activity references contacts only inside the payload; index just the rows that do
+        op.create_index(
+            "activity_log_contact_created_idx",
+            "activity_log",
+            [sa.text("(payload->>'contact_id')"), "created_at", "id"],
+            postgresql_where=sa.text("payload ? 'contact_id'"),
+            postgresql_concurrently=True,
+        )
+        # The unique (sequence_id, contact_id) index can't serve lookups by contact alone
+        op.create_index(
+            "sequence_enrollments_contact_created_idx",
+            "sequence_enrollments",
+            ["contact_id", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "sequence_enrollments_contact_created_idx",
+            table_name="sequence_enrollments",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "activity_log_contact_created_idx",
+            table_name="activity_log",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,82 @@
+"""Add background jobs
+
+Revision ID: 016_jobs
+Revises: 015_contact_timeline
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "016_jobs"
+down_revision: Union[str, None] = "015_contact_timeline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("workspace_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column(
+            "params",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+        sa.Column("status", sa.String(), nullable=False, server_default="queued"),
+        sa.Column("progress_done", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("progress_total", sa.Integer(), nullable=True),
+        sa.Column("result", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="3"),
+        sa.Column("cancel_requested", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column(
+            "run_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("locked_by", sa.String(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["workspace_id"], ["workspaces.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["users.id"], ondelete="SET NULL"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    # Workers look for due queued jobs, and count running ones per type
+    op.create_index(
+        "jobs_due_idx", "jobs", ["run_at"], postgresql_where=sa.text("status = 'queued'")
+    )
+    op.create_index(
+        "jobs_running_idx", "jobs", ["type"], postgresql_where=sa.text("status = 'running'")
+    )
+    op.create_index("jobs_workspace_created_idx", "jobs", ["workspace_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("jobs_workspace_created_idx", table_name="jobs")
+    op.drop_index("jobs_running_idx", table_name="jobs")
+    op.drop_index("jobs_due_idx", table_name="jobs")
+    op.drop_table("jobs")
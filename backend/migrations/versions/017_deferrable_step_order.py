@@ -0,0 +1,38 @@
+"""Make the sequence step order constraint deferrable
+
+Revision ID: 017_deferrable_step_order
+Revises: 016_jobs
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "017_deferrable_step_order"
+down_revision: Union[str, None] = "016_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A non-deferrable unique constraint is checked row by row, so permuting step
+    # orders in one UPDATE fails halfway; a deferrable one is checked when the
+    # statement ends. INITIALLY IMMEDIATE keeps every other write checked as before.
+    op.drop_constraint("sequence_steps_order_idx", "sequence_steps", type_="unique")
+    op.create_unique_constraint(
+        "sequence_steps_order_idx",
+        "sequence_steps",
+        ["sequence_id", "step_order"],
+        deferrable=True,
+        initially="IMMEDIATE",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("sequence_steps_order_idx", "sequence_steps", type_="unique")
+    op.create_unique_constraint(
+        "sequence_steps_order_idx", "sequence_steps", ["sequence_id", "step_order"]
+    )
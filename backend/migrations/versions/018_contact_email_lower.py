@@ -0,0 +1,39 @@
+"""Index contacts by lowercased email
+
+Revision ID: 018_contact_email_lower
+Revises: 017_deferrable_step_order
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "018_contact_email_lower"
+down_revision: Union[str, None] = "017_deferrable_step_order"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Bulk status updates match bounce/unsubscribe files case-insensitively. Built
+    # concurrently so contacts stay writable; that can't run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "contacts_workspace_email_lower_idx",
+            "contacts",
+            ["workspace_id", sa.text("lower(email)")],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "contacts_workspace_email_lower_idx",
+            table_name="contacts",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,34 @@
+"""Give in-progress idempotency claims a lease
+
+Revision ID: 019_idempotency_lease
+Revises: 018_contact_email_lower
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "019_idempotency_lease"
+down_revision: Union[str, None] = "018_contact_email_lower"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "idempotency_keys",
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+    )
+    # Claims already in flight get the default lease from when they were made
+    op.execute(
+        "UPDATE idempotency_keys SET locked_until = created_at + interval '2 minutes' "
+        "WHERE status = 'in_progress'"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("idempotency_keys", "locked_until")
@@ -0,0 +1,29 @@
+"""Count failed sends per enrollment
+
+Revision ID: 020_enrollment_send_attempts
+Revises: 019_idempotency_lease
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "020_enrollment_send_attempts"
+down_revision: Union[str, None] = "019_idempotency_lease"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sequence_enrollments",
+        sa.Column("failed_attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sequence_enrollments", "failed_attempts")
@@ -0,0 +1,31 @@
+"""Lease webhook subscriptions during delivery
+
+Revision ID: 021_webhook_leases
+Revises: 020_enrollment_send_attempts
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "021_webhook_leases"
+down_revision: Union[str, None] = "020_enrollment_send_attempts"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("webhook_subscriptions", sa.Column("leased_by", sa.String(), nullable=True))
+    op.add_column(
+        "webhook_subscriptions",
+        sa.Column("leased_until", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("webhook_subscriptions", "leased_until")
+    op.drop_column("webhook_subscriptions", "leased_by")
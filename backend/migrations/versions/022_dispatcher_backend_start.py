@@ -0,0 +1,30 @@
+"""Record when a dispatcher worker's lock connection started
+
+Revision ID: 022_dispatcher_backend_start
+Revises: 021_webhook_leases
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "022_dispatcher_backend_start"
+down_revision: Union[str, None] = "021_webhook_leases"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # With backend_pid, identifies the backend holding the locks even after its PID is reused
+    op.add_column(
+        "dispatcher_workers",
+        sa.Column("backend_start", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("dispatcher_workers", "backend_start")
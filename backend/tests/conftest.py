@@ -0,0 +1,40 @@
+import os
+import uuid
+
+import pytest
+
+# Settings are required at import; tests that need a database use DATABASE_URL if set
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg2://postgres@localhost:5432/inboxpilot")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("CLERK_SECRET_KEY", "test")
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from app import models  # noqa: E402
+from app.core.db import get_session  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """A session on DATABASE_URL (migrated to head); skips when it's unreachable."""
+    session = get_session()
+    try:
+        session.connection()
+    except OperationalError:
+        session.close()
+        pytest.skip("database not reachable")
+    yield session
+    session.rollback()
+    session.close()
+
+
+@pytest.fixture
+def workspace(db):
+    """A committed workspace, deleted (with everything in it) afterwards."""
+    workspace = models.Workspace(id=uuid.uuid4(), name="test")
+    db.add(workspace)
+    db.commit()
+    yield workspace
+    db.rollback()
+    db.query(models.Workspace).filter_by(id=workspace.id).delete()
+    db.commit()
@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.core import rate_limit
+from app.core.rate_limit import Limit, LocalBackend
+
+PER_SECOND = Limit(rate=1, burst=2)
+PER_MINUTE = Limit(rate=1 / 60, burst=1)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A monotonic clock that only moves when the test advances it."""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock.now)
+    return clock
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = LocalBackend()
+    monkeypatch.setattr(rate_limit, "get_backend", lambda: backend)
+    limits = {"user": {"send": PER_SECOND}, "workspace": {"send": PER_MINUTE}}
+    monkeypatch.setattr(rate_limit, "get_limits", lambda scope: limits[scope])
+    return backend
+
+
+def test_burst_then_refill(clock):
+    backend = LocalBackend()
+    assert backend.consume([("k", PER_SECOND)]) == [0.0]
+    assert backend.consume([("k", PER_SECOND)]) == [0.0]
+    assert backend.consume([("k", PER_SECOND)]) == [1.0]
+
+    clock.now += 0.5
+    assert backend.consume([("k", PER_SECOND)]) == [0.5]
+    clock.now += 0.5
+    assert backend.consume([("k", PER_SECOND)]) == [0.0]
+
+
+def test_rejected_request_charges_no_bucket(clock):
+    backend = LocalBackend()
+    buckets = [("user", PER_SECOND), ("workspace", PER_MINUTE)]
+    assert backend.consume(buckets) == [0.0, 0.0]
+
+    # The workspace bucket is empty; the user bucket must keep its remaining token
+    assert backend.consume(buckets)[1] == pytest.approx(60)
+    assert backend.consume([("user", PER_SECOND)]) == [0.0]
+
+
+def test_full_buckets_are_evicted(clock):
+    backend = LocalBackend()
+    backend.consume([("a", PER_SECOND)])
+    backend.consume([("b", PER_SECOND)])
+    assert len(backend) == 2
+
+    clock.now += 1  # Both have refilled
+    backend.consume([("c", PER_SECOND)])
+    assert len(backend) == 1
+
+
+def test_bucket_count_is_capped(clock):
+    backend = LocalBackend(max_buckets=3)
+    for n in range(10):
+        backend.consume([(f"key-{n}", PER_MINUTE)])
+    assert len(backend) == 3
+
+
+def test_check_all_reports_longest_wait(clock, backend):
+    keys = [("user", "u"), ("workspace", "w")]
+    assert rate_limit.check_all("send", keys) is None
+    clock.now += 1
+    assert rate_limit.check_all("send", keys) == ("workspace", 59)
+    assert rate_limit.check_all("other", keys) is None  # No limits for the group
+
+
+def test_429_with_retry_after(clock, backend):
+    app = FastAPI()
+
+    @app.post("/send", dependencies=[Depends(deps.rate_limited("send"))])
+    def send() -> dict:
+        return {}
+
+    user = SimpleNamespace(id=uuid4())
+    app.dependency_overrides[deps.get_current_user] = lambda: user
+    app.dependency_overrides[deps.get_db] = lambda: None
+    client = TestClient(app)
+
+    assert client.post("/send").status_code == 200
+    assert client.post("/send").status_code == 200
+    response = client.post("/send")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+    clock.now += 1
+    assert client.post("/send").status_code == 200
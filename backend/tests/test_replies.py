@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from app import models
+from app.core.email import make_message_id
+from app.services import replies
+
+
+@pytest.fixture
+def maildir(tmp_path):
+    for sub in ("new", "cur", "tmp"):
+        (tmp_path / sub).mkdir()
+    return tmp_path
+
+
+def deliver_reply(maildir, name: str, in_reply_to: str, references: str = "") -> None:
+    headers = f"Message-ID: <{name}@example.com>\nIn-Reply-To: {in_reply_to}\n"
+    if references:
+        headers += f"References: {references}\n"
+    (maildir / "new" / name).write_text(headers + "Subject: Re: hi\n\nThanks!\n")
+
+
+def enroll(
+    db, workspace, contact, name: str
+) -> tuple[models.SequenceEnrollment, models.OutboundEmail]:
+    sequence = models.Sequence(workspace_id=workspace.id, name=name)
+    db.add(sequence)
+    db.flush()
+    enrollment = models.SequenceEnrollment(
+        sequence_id=sequence.id, contact_id=contact.id, status="active"
+    )
+    email = models.OutboundEmail(
+        workspace_id=workspace.id,
+        contact_id=contact.id,
+        sequence_id=sequence.id,
+        subject="hi",
+        body="hello",
+        status="sent",
+    )
+    db.add_all([enrollment, email])
+    db.flush()
+    return enrollment, email
+
+
+def test_reply_stops_only_its_enrollment(db, workspace, maildir):
+    contact = models.Contact(workspace_id=workspace.id, email="lead@example.com")
+    db.add(contact)
+    db.flush()
+    replied, email = enroll(db, workspace, contact, "replied")
+    other, _ = enroll(db, workspace, contact, "other")
+    db.commit()
+
+    deliver_reply(maildir, "1", make_message_id(email.id))
+    # Quoted again further down a thread: nothing left to stop
+    deliver_reply(maildir, "2", "<elsewhere@example.com>", make_message_id(email.id))
+    source = replies.MaildirSource(str(maildir))
+
+    result = replies.process_batch(db, source, limit=1)
+    assert result == {"messages": 1, "replies": 1, "stopped": 1}
+    assert replies.process_batch(db, source, limit=10)["stopped"] == 0
+
+    db.refresh(replied)
+    db.refresh(other)
+    assert replied.status == "stopped"
+    assert other.status == "active"
+    assert sorted(os.listdir(maildir / "cur")) == ["1:2,S", "2:2,S"]
+
+    events = db.query(models.OutboxEvent).filter_by(workspace_id=workspace.id).all()
+    assert [(e.type, e.payload["enrollment_id"], e.payload["reason"]) for e in events] == [
+        ("enrollment.stopped", str(replied.id), "replied")
+    ]
@@ -0,0 +1,52 @@
+import uuid
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.services import send_schedule
+from app.services.send_schedule import SendWindow
+
+# 09:00-17:00 UTC, weekdays only
+WINDOW = SendWindow(tz=ZoneInfo("UTC"), start=time(9), end=time(17), weekends=False)
+MONDAY = datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def quarter(monkeypatch):
+    """Every enrollment's slot is a quarter of the way through the window (11:00)."""
+    monkeypatch.setattr(send_schedule, "jitter", lambda enrollment_id: 0.25)
+
+
+def test_due_before_slot_goes_out_in_slot(quarter):
+    due = MONDAY.replace(hour=10)
+    assert send_schedule.schedule(due, WINDOW, uuid.uuid4()) == MONDAY.replace(hour=11)
+
+
+def test_due_after_slot_inside_window_goes_out_same_day(quarter):
+    # The slot (11:00) has passed; a quarter of the rest of the window is 14:00
+    due = MONDAY.replace(hour=13)
+    assert send_schedule.schedule(due, WINDOW, uuid.uuid4()) == MONDAY.replace(hour=14)
+
+
+def test_due_after_window_closes_goes_out_next_allowed_day(quarter):
+    friday_evening = MONDAY.replace(hour=18) + timedelta(days=4)
+    next_monday = MONDAY.replace(hour=11) + timedelta(days=7)
+    assert send_schedule.schedule(friday_evening, WINDOW, uuid.uuid4()) == next_monday
+
+
+def test_local_window_in_workspace_timezone(quarter):
+    window = SendWindow(tz=ZoneInfo("America/New_York"), start=time(9), end=time(17), weekends=True)
+    due = datetime(2026, 10, 19, 12, tzinfo=timezone.utc)  # 08:00 in New York
+    assert send_schedule.schedule(due, window, uuid.uuid4()) == due.replace(hour=15)
+
+
+@pytest.mark.parametrize("hour", range(24))
+def test_never_before_due_and_within_a_day_when_inside_window(hour):
+    due = MONDAY.replace(hour=hour, minute=30)
+    for n in range(50):
+        send_at = send_schedule.schedule(due, WINDOW, uuid.UUID(int=n * 7919))
+        assert send_at >= due
+        assert time(9) <= send_at.time() <= time(17)
+        if 9 <= hour < 17:
+            assert send_at.date() == due.date()
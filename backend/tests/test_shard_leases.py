@@ -0,0 +1,85 @@
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app.core.db import get_engine
+from app.services.shard_leases import ShardLeases
+
+SHARDS = 4
+
+
+@pytest.fixture
+def workers(db):
+    """Two lease holders on a database with no other dispatcher workers."""
+    assert db.execute(text("SELECT count(*) FROM dispatcher_workers")).scalar() == 0
+    workers = [ShardLeases(get_engine(), SHARDS, 1, 30, worker_id=name) for name in ("a", "b")]
+    yield workers
+    for worker in workers:
+        worker.release()
+    db.execute(text("DELETE FROM dispatcher_workers WHERE worker_id IN ('a', 'b', 'gone')"))
+    db.commit()
+
+
+def go_silent(db, worker_id: str) -> None:
+    db.execute(
+        text(
+            "UPDATE dispatcher_workers SET heartbeat_at = now() - interval '1 hour' "
+            "WHERE worker_id = :worker_id"
+        ),
+        {"worker_id": worker_id},
+    )
+    db.commit()
+
+
+def test_shards_are_split_between_workers(workers):
+    a, b = workers
+    assert len(a.heartbeat()) == SHARDS
+    assert b.heartbeat() == set()  # Everything is locked until a gives up its surplus
+
+    assert len(a.heartbeat()) == SHARDS // 2
+    assert b.heartbeat() == set(range(SHARDS)) - a.held
+
+
+def test_silent_worker_is_taken_over(db, workers):
+    a, b = workers
+    a.heartbeat()
+    b.heartbeat()
+    a.heartbeat()
+    b.heartbeat()
+    assert a.held and b.held
+
+    go_silent(db, "a")
+    b.heartbeat()
+    # a's locks go once its terminated backend has exited
+    deadline = time.monotonic() + 5
+    while len(b.heartbeat()) < SHARDS and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert b.held == set(range(SHARDS))
+
+    # a finds out on its next heartbeat, and starts over without any shards
+    assert a.heartbeat() == set()
+
+
+def test_reused_pid_is_not_terminated(db, workers):
+    _, b = workers
+    with get_engine().connect() as bystander:
+        pid, started = bystander.execute(
+            text("SELECT pid, backend_start FROM pg_stat_activity WHERE pid = pg_backend_pid()")
+        ).one()
+        # A worker that went silent long ago, on a backend whose PID is now the bystander's
+        db.execute(
+            text(
+                "INSERT INTO dispatcher_workers "
+                "(worker_id, backend_pid, backend_start, shard_count, heartbeat_at) "
+                "VALUES ('gone', :pid, :started - interval '1 day', 0, now() - interval '1 hour')"
+            ),
+            {"pid": pid, "started": started},
+        )
+        db.commit()
+
+        b.heartbeat()
+
+        assert bystander.execute(text("SELECT pg_backend_pid()")).scalar() == pid
+    gone = text("SELECT count(*) FROM dispatcher_workers WHERE worker_id = 'gone'")
+    assert db.execute(gone).scalar() == 0
@@ -0,0 +1,206 @@
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import text
+
+from app import models
+from app.core.config import get_settings
+from app.core.db import get_session
+from app.services import outbox, webhooks
+
+# A public address, so deliveries pass the address check without DNS
+RECEIVER = "https://93.184.216.34/hook"
+
+CURRENT_TXID_SQL = text("SELECT pg_current_xact_id()::text::bigint")
+
+
+@pytest.fixture
+def subscription(db, workspace):
+    subscription = models.WebhookSubscription(
+        workspace_id=workspace.id, url=RECEIVER, secret=webhooks.new_secret()
+    )
+    db.add(subscription)
+    db.commit()
+    return subscription
+
+
+@pytest.fixture
+def other_db(db):
+    session = get_session()
+    yield session
+    session.rollback()
+    session.close()
+
+
+def publish(db, workspace, name: str) -> None:
+    outbox.publish(db, workspace.id, "test.event", uuid.uuid4(), {"name": name})
+
+
+def names(events: list[models.OutboxEvent]) -> list[str]:
+    return [event.payload["name"] for event in events]
+
+
+def receiver(status: int, received: list) -> httpx.Client:
+    def respond(request: httpx.Request) -> httpx.Response:
+        received.append(names_in(request))
+        return httpx.Response(status, text="receiver internals")
+
+    return httpx.Client(transport=httpx.MockTransport(respond))
+
+
+def names_in(request: httpx.Request) -> list[str]:
+    return [event["data"]["name"] for event in json.loads(request.content)["events"]]
+
+
+def deliver(db, client: httpx.Client, subscription: models.WebhookSubscription) -> None:
+    """One delivery round, with the subscription due now whatever its backoff."""
+    db.query(models.WebhookSubscription).filter_by(id=subscription.id).update(
+        {"next_attempt_at": None}
+    )
+    db.commit()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        webhooks.deliver_due(db, client, pool)
+    db.refresh(subscription)
+
+
+def test_events_wait_for_earlier_transactions(db, other_db, workspace, subscription):
+    # The first transaction takes its txid before the second, but only inserts
+    # its event after the second has committed one
+    first_txid = db.execute(CURRENT_TXID_SQL).scalar()
+    publish(other_db, workspace, "second")
+    other_db.commit()
+    publish(db, workspace, "first")
+    db.flush()
+
+    # Delivering "second" now would move the cursor past "first" before it commits
+    below = outbox.visible_txid(other_db)
+    assert below <= first_txid
+    assert outbox.read_after(other_db, subscription, 10, below) == []
+    other_db.commit()
+
+    db.commit()
+    below = outbox.visible_txid(other_db)
+    events = outbox.read_after(other_db, subscription, 10, below)
+    assert names(events) == ["first", "second"]
+    assert events[0].id > events[1].id  # Ordered by transaction, not insert
+
+
+def test_delivery_advances_cursor(db, workspace, subscription):
+    publish(db, workspace, "a")
+    publish(db, workspace, "b")
+    db.commit()
+
+    received = []
+    deliver(db, receiver(200, received), subscription)
+    assert received == [["a", "b"]]
+    assert subscription.attempts == 0
+    assert subscription.leased_by is None
+
+    deliver(db, receiver(200, received), subscription)
+    assert received == [["a", "b"]]
+
+
+def test_expired_lease_is_taken_over(db, workspace, subscription):
+    publish(db, workspace, "a")
+    db.commit()
+    below = outbox.visible_txid(db)
+
+    def claim(lease_id: str) -> bool:
+        claimed = webhooks.claim_due(db, 100, below, lease_id)
+        db.commit()
+        return subscription.id in {s.id for s in claimed}
+
+    assert claim("first")
+    assert not claim("second")
+
+    db.query(models.WebhookSubscription).filter_by(id=subscription.id).update(
+        {"leased_until": datetime.now(timezone.utc) - timedelta(seconds=1)}
+    )
+    db.commit()
+    assert claim("second")
+
+    # The first worker's late result is dropped rather than moving the cursor
+    db.refresh(subscription)
+    cursor = (subscription.cursor_txid, subscription.cursor_event_id)
+    late = webhooks.Batch(
+        subscription_id=subscription.id,
+        lease_id="first",
+        url=RECEIVER,
+        secret=subscription.secret,
+        cursor=cursor,
+        first_event_id=1,
+        last_event=(below, 1),
+        event_count=1,
+        body=b"{}",
+    )
+    webhooks.record_result(db, late, None)
+    db.commit()
+    db.refresh(subscription)
+    assert subscription.leased_by == "second"
+    assert (subscription.cursor_txid, subscription.cursor_event_id) == cursor
+
+
+def test_dead_letter_after_max_attempts(db, workspace, subscription, monkeypatch):
+    monkeypatch.setattr(get_settings(), "webhook_max_attempts", 3)
+    publish(db, workspace, "a")
+    publish(db, workspace, "b")
+    db.commit()
+
+    received = []
+    for attempt in (1, 2):
+        deliver(db, receiver(500, received), subscription)
+        assert subscription.attempts == attempt
+        assert subscription.next_attempt_at > datetime.now(timezone.utc)
+        assert subscription.last_error == "HTTP 500"  # Never the receiver's body
+
+    deliver(db, receiver(500, received), subscription)
+    assert received == [["a", "b"]] * 3
+    assert subscription.attempts == 0
+    dead = db.query(models.WebhookDeadLetter).filter_by(subscription_id=subscription.id).one()
+    assert dead.event_count == 2
+    assert dead.error == "HTTP 500"
+
+    # Later events aren't held back behind the dead batch, and it can be replayed
+    publish(db, workspace, "c")
+    db.commit()
+    deliver(db, receiver(200, received), subscription)
+    assert received[-1] == ["c"]
+
+    first = db.get(models.OutboxEvent, dead.first_event_id)
+    webhooks.replay_from(db, subscription, first)
+    deliver(db, receiver(200, received), subscription)
+    assert received[-1] == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://127.0.0.1/hook",
+        "http://localhost:8000/hook",
+        "http://10.0.0.5/hook",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/hook",
+        "http://[::ffff:192.168.0.1]/hook",
+        "http://0.0.0.0/hook",
+    ],
+)
+def test_internal_addresses_are_blocked(url):
+    assert webhooks.blocked_reason(url)
+
+    received = []
+    error = webhooks.post(receiver(200, received), url, "secret", b"{}")
+    assert error.startswith("Blocked")
+    assert received == []
+
+
+def test_redirects_are_not_followed():
+    def respond(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(302, headers={"Location": "http://127.0.0.1/"})
+
+    client = httpx.Client(transport=httpx.MockTransport(respond))
+    assert webhooks.blocked_reason(RECEIVER) is None
+    assert webhooks.post(client, RECEIVER, "secret", b"{}") == "HTTP 302"
@@ -174,13 +174,14 @@ export default function SequenceDetailPage({
   };
 
   const handleRewrite = async () => {
-    if (!rewriteData.text) return;
+    if (!workspace || !rewriteData.text) return;
 
     setRewriteData((prev) => ({ ...prev, loading: true }));
 
     try {
       const result = await fetchWithAuth(() =>
         api.rewriteText({
+          workspace_id: workspace.id,
           text: rewriteData.text,
           tone: rewriteData.tone,
           purpose: rewriteData.purpose,
@@ -52,6 +52,8 @@ class ApiClient {
     const response = await fetch(`${this.baseUrl}${endpoint}`, {
       ...options,
       headers,
+      // Carries the API's read-your-writes cookie across origins
+      credentials: "include",
     });
 
     if (!response.ok) {
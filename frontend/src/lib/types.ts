@@ -147,6 +147,7 @@ export interface SendTestEmailRequest {
 
 // ============ AI Types ============
 export interface RewriteRequest {
+  workspace_id: string;
   text: string;
   tone?: "friendly" | "professional" | "punchy";
   purpose?: "cold_outreach" | "follow_up";